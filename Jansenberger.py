@@ -7,7 +7,6 @@ App for recording experimental data with the NGIMU, at the Institute Jansenberge
 
 # Import the required standard Python packages, ...
 import numpy as np
-import yaml
 import sys
 import shutil
 import time
@@ -18,35 +17,34 @@ import re
 
 # ..., the Qt-packages, ...
 from PyQt5 import QtWidgets, uic, QtCore, QtGui
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from PyQt5.QtCore import Qt, QTimer
 import pyqtgraph as pg
 #from pyqtgraph.Qt import QtGui, QtCore
-import guidata
-from guidata.dataset.dataitems import ChoiceItem, FloatItem, DirectoryItem, ColorItem
+from guidata.dataset.dataitems import ChoiceItem, FloatItem, DirectoryItem, ColorItem, StringItem
 from guidata.dataset.datatypes import DataSet, BeginGroup, EndGroup
 
-# ... and the module for the interface with the NGIMU
+# ... and the modules for the interface with the NGIMU, and for the performance-HUD
 import ngimu
-
-
-
-def get_subjects():
-    """ Initial setup, who does the recording and who is the subject"""
-    
-    subject_file = 'subjects.txt'
-    experimentor_file = 'experimentors.txt'
-    
-    with open(subject_file, 'r') as fh:
-        subjects = fh.readlines()
-    for ii in range(len(subjects)):
-        subjects[ii] = subjects[ii][:-1]
-    
-    with open(experimentor_file, 'r') as fh:
-        experimentors = fh.readlines()
-    for ii in range(len(experimentors)):
-        experimentors[ii] = experimentors[ii][:-1]
-    
-    return (subjects, experimentors)
+import sources
+import analysis
+import config
+import events
+import crossings
+import filters
+import orientation
+import recording
+import registry
+import repetitions
+import resample
+import signals
+import spectrum
+from perf_hud import PerfStats, PerfOverlay
+
+# Variables of the displayed channels (see "signals.NAMES"); the columns are
+# looked up by name, so that every source with these columns can be displayed
+CHANNELS = {'acc': ['ax', 'ay', 'az'],
+            'gyr': ['gx', 'gy', 'gz'],
+            'orientation': ['q0', 'qx', 'qy', 'qz']}
 
 
 class DefaultParameters(DataSet):
@@ -61,6 +59,7 @@ class DefaultParameters(DataSet):
     _bg = BeginGroup("Time View")
     acc_limit = FloatItem("Limit [Accelerometer]", default=0.5, min=0, max=3, step=0.01, slider=True)                             
     gyr_limit = FloatItem("Limit [Gyroscope]", default=300, min=100, max=1000, step=1, slider=True)                             
+    ang_limit = FloatItem("Limit [Orientation]", default=90, min=10, max=180, step=1, slider=True)
     init_channel = ChoiceItem("Initial Channel", [(16, "acc"), (32, "gyr")], radio=True)
     _eg = EndGroup("Time View")
 
@@ -70,28 +69,48 @@ class DefaultParameters(DataSet):
     color_bottom  = ColorItem("Bottom", default="#00aa00")
     upper_thresh = FloatItem("Upper Threshold", default=0.7, min=0, max=2, step=0.01, slider=True)                             
     lower_thresh = FloatItem("Lower Threshold", default=0.3, min=0.1, max=1, step=0.01, slider=True)                             
+    light_signals = StringItem("Signals (separated by ';')", default='abs(lowpass(ax, 5))')
     _ecolor = EndGroup("Colors")
 
+    _brec = BeginGroup("Recording")
+    fsync_interval = FloatItem("Sync to disk every [s]", default=5, min=1, max=60, step=1, slider=True)
+    codec = ChoiceItem("Compression", [('none', 'none'), ('zlib', 'zlib'), ('lzma', 'lzma')], radio=True)
+    _erec = EndGroup("Recording")
+
+    _bfilt = BeginGroup("Filter")
+    filter = ChoiceItem("Filter", [(name, name) for name in filters.FILTER_TYPES], default='lowpass')
+    filter_cutoff = FloatItem("Cutoff frequency [Hz]", default=5, min=0.1, max=50, step=0.1, slider=True)
+    filter_window = FloatItem("RMS-window [s]", default=0.2, min=0.02, max=2, step=0.02, slider=True)
+    sample_rate = FloatItem("Sample rate [Hz]", default=100, min=1, max=1000, step=1)
+    _efilt = EndGroup("Filter")
+
+    _breps = BeginGroup("Repetitions")
+    rep_channel = ChoiceItem("Channel", [(name, name) for name in recording.COLUMNS[1:]], default='Accelerometer Z (g)')
+    rep_min_amplitude = FloatItem("Minimum amplitude", default=0.05, min=0, max=500, step=0.01)
+    _ereps = EndGroup("Repetitions")
+
+    _bspec = BeginGroup("Spectrum")
+    spectrum_signal = StringItem("Signal", default='norm(gx, gy, gz)')
+    spectrum_bands = StringItem("Bands [Hz] (e.g. '3-7; 7-12')", default='0.5-3; 3-7; 7-12')
+    spectrum_segment = FloatItem("Segment length [s]", default=2.56, min=0.5, max=20, step=0.01)
+    _espec = EndGroup("Spectrum")
+
 
     opening_view = ChoiceItem("Initial View", [(16, 'Time-View'), (32, "xy-View"), (64, 'TrafficLight-View')], radio=True)
     
     
-class Subjects(DataSet):
-    """ Select Experimentor and Subject """
-    
-    sub, exp = get_subjects()
-    
-    _Experimentor = ChoiceItem("Experimentors", exp)
-    _Subject = ChoiceItem("Subjects",sub )
-    
-    
 class MainWindow(QtWidgets.QMainWindow):
     """Class for the Time-View and the xy-View"""
 
-    signal = pyqtSignal()
     
     def __init__(self, sensor, *args, **kwargs):
-        """ Initialization Routines """
+        """ Initialization Routines
+
+        Parameters
+        ----------
+        sensor : sources.Source
+                Source of the data (NGIMU- or MetaWear-sensor, or replay of a recording)
+        """
 
         super(MainWindow, self).__init__(*args, **kwargs)
 
@@ -111,27 +130,27 @@ class MainWindow(QtWidgets.QMainWindow):
                   ph.plot(pen='r', label='y'),
                   ph.plot(pen='g', label='z') ]
         
-        self.comboBox.addItems(['Accelerometer', 'Gyroscope'])
+        self.comboBox.addItems(['Accelerometer', 'Gyroscope', 'Orientation'])
         self.logging = False
 
-        # Change the language settings
-        with open('lang.yaml', 'r') as fh:
-            self.lang_dict = yaml.load(fh, Loader=yaml.FullLoader)
-
-        self.exitButton.setText( self.lang_dict['Exit'] )
-        self.logButton.setText( self.lang_dict['Start_Log'] )
-        self.actionTime_View.setText( self.lang_dict['Time_View'] )
-        self.actionxy_View.setText( self.lang_dict['xy_View'] )
-        self.actionTrafficLight_View.setText( self.lang_dict['TrafficLight_View'] )
-        self.actionLimits.setText( self.lang_dict['Limits'] )
-        self.menuLanguage.setTitle( self.lang_dict['Language'] )
-        self.menuMyViews.setTitle( self.lang_dict['View'] )
-        self.menuSettings.setTitle( self.lang_dict['Settings'] )
-        self.statusBar().showMessage( self.lang_dict['Status'] )
-
-        # Load the default settings
-        with open('settings.yaml', 'r') as fh:
-            self.defaults = yaml.load(fh, Loader=yaml.FullLoader)
+        # The language settings are kept in memory; a change of language is
+        # applied right away (see "apply_language")
+        self.lang_dict = config.Config('lang.yaml')
+        self.lang_dict.subscribe(self.apply_language)
+
+        # Performance-HUD: hidden by default, toggled with "Ctrl+P"
+        self.perf = PerfStats()
+        self.hud = PerfOverlay(self.perf, parent=self.stackedWidget)
+        self.actionPerformance = QtWidgets.QAction(self.lang_dict['Performance'], self)
+        self.menuMyViews.insertAction(self.actionExit, self.actionPerformance)
+        self.actionSpectrum_View = QtWidgets.QAction(self.lang_dict['Spectrum_View'], self)
+        self.menuMyViews.insertAction(self.actionPerformance, self.actionSpectrum_View)
+        self.graphWidget.viewport().installEventFilter(self)
+
+        # Load the default settings; changes are applied while the acquisition
+        # keeps running (see "apply_settings")
+        self.defaults = config.Config('settings.yaml')
+        self.defaults.subscribe(self.apply_settings)
 
         self.lower_thresh = self.defaults['lower_thresh']
         self.upper_thresh = self.defaults['upper_thresh']
@@ -143,6 +162,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self.actionTime_View.triggered.connect( self.show_timeView )
         self.actionxy_View.triggered.connect( self.show_xyView )
         self.actionTrafficLight_View.triggered.connect( self.show_trafficlightView )
+        self.actionSpectrum_View.triggered.connect( self.show_spectrumView )
+        self.actionPerformance.triggered.connect( self.hud.toggle )
         self.exitButton.clicked.connect( self.save_and_close )
         self.actionen.triggered.connect( self.change_lang_to_eng )
         self.actionde.triggered.connect( self.change_lang_to_de )
@@ -154,6 +175,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self.actionTime_View.setShortcut("Ctrl+1")
         self.actionxy_View.setShortcut("Ctrl+2")
         self.actionTrafficLight_View.setShortcut("Ctrl+3")
+        self.actionSpectrum_View.setShortcut("Ctrl+4")
+        self.actionPerformance.setShortcut("Ctrl+P")
         self.actionExit.setShortcut("Ctrl+x")
         
         # Sensor data
@@ -164,14 +187,18 @@ class MainWindow(QtWidgets.QMainWindow):
         self.actionChannels.setEnabled(False)
         self.setWindowTitle('Subject: ' + self.sensor.subject)
         
-        # Create the TrafficLight
-        self.light = TrafficLight(mainWin=self)
-        self.stackedWidget.addWidget( self.light )
-        self.signal.connect( self.light._trigger_refresh )
+        # Online analysis: repetitions, TrafficLights, and spectrum
+        self.repLabel = QtWidgets.QLabel()
+        self.statusBar().addPermanentWidget(self.repLabel)
+        self.lights = None
+        self.spectrumPanel = None
+        self.setup_analysis(set(self.defaults))
+        self.apply_language()
         
         self.stackedWidget.setCurrentIndex(0)
 
         self.changeChannel(0)
+        self.sensor.start()
         
         # Timer for updating the display
         self.timer = QtCore.QTimer()
@@ -179,6 +206,141 @@ class MainWindow(QtWidgets.QMainWindow):
         self.timer.start(10)                  
         
         
+    def eventFilter(self, obj, event):
+        """Count the repaints of the plot, for the performance-HUD"""
+
+        if event.type() == QtCore.QEvent.Paint:
+            self.perf.frame()
+        return False
+
+
+    def setup_analysis(self, changed):
+        """(Re-)Create the parts of the online analysis that depend on the changed settings
+
+        Parameters
+        ----------
+        changed : set
+                Names of the changed settings
+        """
+        
+        rate = self.defaults['sample_rate']
+        
+        if changed & {'sample_rate', 'rep_channel', 'rep_min_amplitude'}:
+            # Online repetition counter, on the channel selected in the settings
+            self.reps = repetitions.RepetitionCounter(rate=rate,
+                                        min_amplitude=self.defaults['rep_min_amplitude'])
+            if self.defaults['rep_channel'] in self.sensor.columns:
+                self.rep_column = list(self.sensor.columns).index(self.defaults['rep_channel'])
+            else:
+                self.rep_column = None
+            self.show_repetitions()
+        
+        if 'sample_rate' in changed:
+            # Gaps in the stream are interpolated, so that the filters get continuous data
+            quat_columns = [ii for (ii, name) in enumerate(self.sensor.columns) if name == 'Quat 0']
+            self.resampler = resample.Resampler(rate=rate,
+                                        quat_columns=quat_columns, fill='interpolate')
+        
+        if changed & {'sample_rate', 'light_signals'}:
+            # Create the TrafficLights: one for each signal in the settings
+            try:
+                self.light_signals = signals.parse_signals(self.defaults['light_signals'],
+                                        self.sensor.columns, rate=rate)
+            except ValueError as error:
+                print(error)
+                self.light_signals = []
+            lights = LightGrid(mainWin=self, titles=[signal.text for signal in self.light_signals])
+            self.replace_view(self.lights, lights)
+            self.lights = lights
+            
+            # Changes of the lights are logged as threshold-crossings, in the event-file
+            # (their channels follow the sensor-columns)
+            if hasattr(self, 'crossings'):
+                self.log_crossings(self.crossings.stop())
+            self.crossings = crossings.CrossingDetector(self.lower_thresh, self.upper_thresh,
+                                        n_signals=len(self.light_signals),
+                                        first_channel=len(self.sensor.columns))
+        
+        if changed & {'sample_rate', 'spectrum_signal', 'spectrum_bands', 'spectrum_segment'}:
+            # Spectrum of the signal selected in the settings, with the power in the
+            # selected frequency bands
+            try:
+                self.spectrum_signal = signals.Expression(self.defaults['spectrum_signal'],
+                                        self.sensor.columns, rate=rate)
+                bands = spectrum.parse_bands(self.defaults['spectrum_bands'])
+            except ValueError as error:
+                print(error)
+                self.spectrum_signal, bands = None, []
+            self.spectrum = spectrum.WelchSpectrum(rate,
+                                        segment=int(round(self.defaults['spectrum_segment'] * rate)))
+            panel = SpectrumPanel(self.spectrum, bands)
+            self.replace_view(self.spectrumPanel, panel)
+            self.spectrumPanel = panel
+            
+            
+    def replace_view(self, old, new):
+        """Put the widget "new" in place of "old" into the stackedWidget"""
+        
+        if old is None:
+            self.stackedWidget.addWidget(new)
+            return
+        index = self.stackedWidget.indexOf(old)
+        is_current = self.stackedWidget.currentWidget() is old
+        self.stackedWidget.removeWidget(old)
+        self.stackedWidget.insertWidget(index, new)
+        if is_current:
+            self.stackedWidget.setCurrentWidget(new)
+        old.deleteLater()
+        
+        
+    def apply_settings(self, changed):
+        """Apply changed settings, without interrupting the acquisition
+
+        Parameters
+        ----------
+        changed : set
+                Names of the changed settings
+        """
+        
+        if changed & {'accLim', 'gyrLim', 'angLim'}:
+            self.apply_limits()
+            
+        if changed & {'lower_thresh', 'upper_thresh'}:
+            self.lower_thresh = self.defaults['lower_thresh']
+            self.upper_thresh = self.defaults['upper_thresh']
+            self.lights.refresh()
+            self.log_crossings(self.crossings.set_thresholds(self.lower_thresh, self.upper_thresh))
+            
+        if changed & {'topColor', 'middleColor', 'bottomColor'}:
+            self.lights.repaint_lights()
+            
+        if changed & {'filter', 'filter_cutoff', 'filter_window', 'sample_rate'}:
+            self.filter = filters.from_settings(self.defaults, n_channels=3)
+            
+        # Directory, compression, and sync-interval are used by the next recording
+        self.setup_analysis(changed)
+        print(f'Settings applied: {", ".join(sorted(changed))}')
+        
+        
+    def apply_language(self, changed=None):
+        """Set the texts of the menus, buttons, and status-bar in the current language"""
+        
+        self.exitButton.setText( self.lang_dict['Exit'] )
+        self.logButton.setText( self.lang_dict['Stop_Log' if self.logging else 'Start_Log'] )
+        self.actionTime_View.setText( self.lang_dict['Time_View'] )
+        self.actionxy_View.setText( self.lang_dict['xy_View'] )
+        self.actionTrafficLight_View.setText( self.lang_dict['TrafficLight_View'] )
+        self.actionSpectrum_View.setText( self.lang_dict['Spectrum_View'] )
+        self.actionPerformance.setText( self.lang_dict['Performance'] )
+        self.actionLimits.setText( self.lang_dict['Limits'] )
+        self.menuLanguage.setTitle( self.lang_dict['Language'] )
+        self.menuMyViews.setTitle( self.lang_dict['View'] )
+        self.menuSettings.setTitle( self.lang_dict['Settings'] )
+        if not self.logging:
+            self.statusBar().showMessage( self.lang_dict['Status'] )
+        self.show_repetitions()
+        
+        
     def show_help(self):
         """Show the Help-file"""
         
@@ -201,19 +363,32 @@ class MainWindow(QtWidgets.QMainWindow):
             defaults = {
             'accLim': e.acc_limit,
             'gyrLim': e.gyr_limit,
+            'angLim': e.ang_limit,
             'dataDir': e.data_dir,
             'topColor': e.color_top,
             'middleColor': e.color_middle,
             'bottomColor': e.color_bottom,
             'upper_thresh': e.upper_thresh,
             'lower_thresh': e.lower_thresh,
+            'light_signals': e.light_signals,
             'init_channel': e.init_channel,
-            'opening_view': e.opening_view
+            'opening_view': e.opening_view,
+            'fsync_interval': e.fsync_interval,
+            'codec': e.codec,
+            'filter': e.filter,
+            'filter_cutoff': e.filter_cutoff,
+            'filter_window': e.filter_window,
+            'sample_rate': e.sample_rate,
+            'rep_channel': e.rep_channel,
+            'rep_min_amplitude': e.rep_min_amplitude,
+            'spectrum_signal': e.spectrum_signal,
+            'spectrum_bands': e.spectrum_bands,
+            'spectrum_segment': e.spectrum_segment
             }
-            settings_file = 'settings.yaml'
-            with open(settings_file, 'w') as fh:
-                yaml.dump(defaults, fh)
-            print(f'New settings saved to {settings_file}')
+            # The new settings are applied right away, and saved for the next start
+            self.defaults.update(defaults)
+            self.defaults.save()
+            print(f'New settings saved to {self.defaults.filename}')
             print(e)
             # e.view()
     
@@ -222,14 +397,15 @@ class MainWindow(QtWidgets.QMainWindow):
     def save_and_close(self):
         """ Saves logging stream and closes the program """
 
-        if hasattr(self, 'fh_out'):
-            if not self.fh_out.closed:
-                if self.sensor.store_ptr > 0:
-                    np.savetxt(self.fh_out, self.sensor.store_data, delimiter=',')
-                self.fh_out.close()
-                print(f'Recorded data written to: {self.fh_out.name}')
+        if hasattr(self, 'recorder'):
+            if not self.recorder.closed:
+                self.recorder.close()
+                self.log_crossings(self.crossings.stop())
+                self.events.close()
+                print(f'Recorded data written to: {self.recorder.name}')
             
         # Close the application            
+        self.sensor.close()
         self.close()
         
 
@@ -248,33 +424,50 @@ class MainWindow(QtWidgets.QMainWindow):
             
             data_dir = self.defaults['dataDir']
             subject = self.sensor.subject
-            out_file = os.path.join( data_dir, date_time + '_' + subject.split(',')[0] + '.dat' )
+            out_file = os.path.join( data_dir, date_time + '_' + subject.split(',')[0] + recording.EXTENSION )
             self.statusBar().showMessage( 'Recording ' + out_file )
             
+            # Nominal sample rate, from the timetags of the incoming packets
+            if self.perf.dt_timetag > 0:
+                sample_rate = 1 / self.perf.dt_timetag
+            else:
+                sample_rate = 0.
+
+            # The header is written when the file is created, and the disk-I/O
+            # runs in a separate thread
             try:
-                self.fh_out = open(out_file, 'wb')
-            except:
+                self.recorder = recording.open_recorder(out_file, self.sensor.columns,
+                                        block_size=self.sensor.store_size,
+                                        warn=self.statusBar().showMessage,
+                                        subject=self.sensor.subject,
+                                        experimentor=self.sensor.experimentor,
+                                        date=date,
+                                        sample_rate=sample_rate,
+                                        fsync_interval=self.defaults['fsync_interval'],
+                                        codec=self.defaults['codec'])
+            except OSError:
                 print(f'Could not open {out_file}. Please check if the default directory in SETTINGS.YAML is correct!')
                 exit()
-                
-            # Write a header
-            self.fh_out.write(f'Subject: {self.sensor.subject}\n'.encode())
-            self.fh_out.write(f'Experimentor: {self.sensor.experimentor}\n'.encode())
-            self.fh_out.write(f'Date: {date}\n'.encode())
-            #self.fh_out.write(f'Sample rate: '.encode())
-            
-            self.fh_out.write(b'Time (s),'+\
-                              b'Gyroscope X (deg/s),Gyroscope Y (deg/s),Gyroscope Z (deg/s),'+\
-                              b'Accelerometer X (g),Accelerometer Y (g),Accelerometer Z (g),'+\
-                              b'Magnetometer X (uT),Magnetometer Y (uT),Magnetometer Z (uT),'+\
-                              b'Barometer (hPa),'+\
-                              b'Quat 0, Quat X, Quat Y, Quat Z\n')
+            
+            # The repetitions and threshold-crossings are detected per recording,
+            # and stored next to it
+            self.event_signals = [signal.text for signal in self.light_signals]
+            self.events = events.EventWriter(events.events_file(out_file),
+                                        channels=list(self.sensor.columns) + self.event_signals)
+            self.reps.reset()
+            self.crossings.reset()
+            self.show_repetitions()
+            
+            # Summary of the session, as in the batch-analysis
+            self.summary = analysis.SessionSummary(self.sensor.columns,
+                                    rate=self.defaults['sample_rate'], **self.defaults)
                 
         else:
-            if self.sensor.store_ptr > 0:
-                np.savetxt(self.fh_out, self.sensor.store_data, delimiter=',')
-            self.fh_out.close()
-            print(f'Recorded data written to: {self.fh_out.name}')
+            self.recorder.close()
+            self.log_crossings(self.crossings.stop())
+            self.events.close()
+            self.print_summary()
+            print(f'Recorded data written to: {self.recorder.name}')
 
             self.logging = False
             self.logButton.setText( self.lang_dict['Start_Log'] )
@@ -282,19 +475,49 @@ class MainWindow(QtWidgets.QMainWindow):
             self.statusBar().showMessage( self.lang_dict['Status'] )
             
 
+    def log_crossings(self, records):
+        """Write threshold-crossings to the event-file of the recording
+
+        Crossings of signals that have been changed during the recording are
+        not logged, since the event-file has no channels for them.
+        """
+        
+        if self.logging and [signal.text for signal in self.light_signals] == self.event_signals:
+            self.events.write_records(records)
+            
+            
     def changeChannel(self, i):
         """ Choose what data to display """
         
         selected = self.comboBox.itemText(i)
         if i == 0:
             self.sensor.channel = 'acc'
-            new_val = self.defaults['accLim']
         elif i == 1:
             self.sensor.channel = 'gyr'
-            new_val = self.defaults['gyrLim']
+        elif i == 2:
+            # Angles relative to the orientation at the selection of the channel
+            self.sensor.channel = 'orientation'
+            self.q_ref = None
         else:
             print('No sensor selected...')
             
+        try:
+            self.channel_columns = signals.find_columns(self.sensor.columns,
+                                        CHANNELS[self.sensor.channel])
+        except ValueError as error:
+            print(f'{selected} is not available: {error}')
+            self.channel_columns = None
+            
+        # The displayed signals are filtered; a new channel starts with a new filter-state
+        self.filter = filters.from_settings(self.defaults, n_channels=3)
+        self.apply_limits()
+        
+        
+    def apply_limits(self):
+        """Range of the display, from the limit of the selected channel in the settings"""
+        
+        limits = {'acc': 'accLim', 'gyr': 'gyrLim', 'orientation': 'angLim'}
+        new_val = self.defaults[limits[self.sensor.channel]]
         if self.view == 'timeView':
             self.graphWidget.setYRange(-new_val, new_val)
         elif self.view == 'xyView':
@@ -304,53 +527,106 @@ class MainWindow(QtWidgets.QMainWindow):
     def update_view(self):
         """Update the data in the streaming plot"""
         
-        # Get the data from the NGIMU
-        #new_data = self.sensor.get_data(self.sensor.channel)
-        new_data = self.sensor.get_data('dat_quat')
-
-        # If the sensor times out, take the last received datapoint
-        if not new_data:
-            print('still running!')
-            new_data = self.sensor.show_data[:,-1]
-            dummy_data = True
-        elif len(new_data) != 15:
-            print('new data have the wrong shape!')
-            new_data = self.sensor.show_data[:,-1]
-            dummy_data = True
-        else:
-            dummy_data = False
+        start = time.perf_counter()
+
+        # Get all the data that arrived since the last update
+        timestamps, new_data = self.sensor.read()
+        if len(timestamps) == 0:
+            self.perf.update(time.perf_counter() - start)
+            return
+        for timetag in timestamps:
+            self.perf.packet(timetag, self.sensor.decode_time)
             
-                    
+        # The samples are recorded as they arrive
+        if self.logging:
+            self.recorder.extend(np.column_stack((timestamps, new_data)))
+            self.summary.update(timestamps, new_data)
+            
+        # Display and online analysis work on a uniform timebase
+        timestamps, new_data = self.resampler.process(timestamps, new_data)
+        if len(timestamps) == 0:
+            self.perf.update(time.perf_counter() - start)
+            return
             
         # Update the 'data' for the plot, and put them into the corresponding plot-lines
-        if dummy_data:
-            self.sensor.show_data = np.hstack((self.sensor.show_data[:,1:], np.c_[new_data]))
-        else:
-            if self.sensor.channel == 'acc':
-                self.sensor.show_data = np.hstack((self.sensor.show_data[:,1:], np.c_[new_data[4:7]]))
-            elif self.sensor.channel == 'gyr':
-                self.sensor.show_data = np.hstack((self.sensor.show_data[:,1:], np.c_[new_data[1:4]]))
-            else:
-                print(f'Do not know channel {self.channel}')
-        
-        if self.view == 'timeView':
-            for curve, data in zip(self.sensor.curves, self.sensor.show_data):
-                curve.setData(data)
-        elif self.view == 'xyView':
-            self.sensor.curves[0].setData(self.sensor.show_data[self.channel_nrs[0]], self.sensor.show_data[self.channel_nrs[1]])
+        # (the columns of the selected channel are found by name, see "changeChannel")
+        if self.channel_columns is not None:
+            selected = new_data[:, self.channel_columns]
+            if self.sensor.channel == 'orientation':
+                if self.q_ref is None:
+                    self.q_ref = selected[0]
+                selected = orientation.to_euler(orientation.relative(self.q_ref, selected))
+            selected = self.filter.process(selected)
+            
+            # Shift the display-buffer in place, by the number of new samples
+            show_data = self.sensor.show_data
+            n = min(len(selected), show_data.shape[1])
+            show_data[:, :-n] = show_data[:, n:]
+            show_data[:, -n:] = selected[-n:].T
+            
+            if self.view == 'timeView':
+                for curve, data in zip(self.sensor.curves, self.sensor.show_data):
+                    curve.setData(data)
+            elif self.view == 'xyView':
+                self.sensor.curves[0].setData(self.sensor.show_data[self.channel_nrs[0]], self.sensor.show_data[self.channel_nrs[1]])
+            
+        if self.rep_column is not None:
+            new_reps = self.reps.process(timestamps, new_data[:, self.rep_column])
+            for (t, amplitude, duration) in new_reps:
+                if self.logging:
+                    self.events.write(t, 'repetition', self.rep_column, amplitude, duration)
+            if new_reps:
+                self.show_repetitions()
             
+        # The lights show the latest value of their signals; they are only
+        # repainted when their state changes. While recording, all crossings
+        # of the block are logged, with interpolated times.
+        if self.light_signals:
+            values = np.column_stack([np.abs(signal.evaluate(new_data))
+                                      for signal in self.light_signals])
+            self.lights.set_values(values[-1])
+            if self.logging:
+                self.log_crossings(self.crossings.process(timestamps, values))
+                
+        # The spectrum only transforms the segments completed by the new samples,
+        # and is only redrawn when it changes, and when it is visible
+        if self.spectrum_signal is not None:
+            n_new = self.spectrum.process(self.spectrum_signal.evaluate(new_data))
+            if n_new and self.view == 'spectrumView':
+                self.spectrumPanel.refresh()
+
         if self.logging:
-            if not dummy_data:
-                self.sensor.store_data[self.sensor.store_ptr,:] = new_data
-                self.sensor.store_ptr += 1
+            self.perf.backlog = self.recorder.backlog
+        else:
+            self.perf.backlog = 0
+        self.perf.update(time.perf_counter() - start)
 
-        if self.sensor.store_ptr == len(self.sensor.store_data):
-            np.savetxt(self.fh_out, self.sensor.store_data, delimiter=',')
-            self.sensor.store_ptr = 0
             
-        if self.view == 'trafficlightView':
-            self.signal.emit()
-
+    def show_repetitions(self):
+        """Show the number of repetitions, and amplitude and duration of the last one"""
+        
+        text = f'{self.lang_dict["Repetitions"]}: {self.reps.count}'
+        if self.reps.last is not None:
+            t, amplitude, duration = self.reps.last
+            text += f'  ({amplitude:.2f}, {duration:.1f} s)'
+        self.repLabel.setText(text)
+        
+            
+    def print_summary(self):
+        """Print the summary of the recorded session"""
+        
+        print('Session summary:')
+        for name, value in self.summary.result().items():
+            if value is not None:
+                print(f'    {name:22s}: {value:.6g}')
+                
+        # Zones of the traffic lights, from the logged crossings
+        records, header = events.read_events(self.events.name)
+        for channel, values in crossings.zone_summary(records, header['kinds']).items():
+            print(f'    {header["channels"][channel]}:')
+            for name, value in values.items():
+                print(f'        {name:18s}: {value:.6g}')
+        
             
     def set_Limits(self):
         """Get a new value for the y-limit, and apply it to the existing graph"""
@@ -397,25 +673,29 @@ class MainWindow(QtWidgets.QMainWindow):
     
         dlg = EnterText(title='Select lower/upper threshold (e.g. "0.4; 0.9"):')
         if dlg.exec_():
-            thresholds = re.split('[ ;].', dlg.valueEdit.text().split(': ') )
-    
+            thresholds = [float(value) for value in re.split('[ ;]+', dlg.valueEdit.text().strip())]
         else:
             print('No change')
+            return
             
-        self.lower_thresh = thresholds[0]     
-        self.upper_thresh = thresholds[1]     
+        # Applied through the settings (see "apply_settings"), but not saved
+        self.defaults.update({'lower_thresh': thresholds[0], 'upper_thresh': thresholds[1]})
             
        
     def change_lang_to_de(self):
         """Change to German menu"""
-        shutil.copy('lang_de.yaml', 'lang.yaml')
-        self.close()
+        self.change_language('lang_de.yaml')
 
 
     def change_lang_to_eng(self):
         """Change to an English menu"""
-        shutil.copy('lang_en.yaml', 'lang.yaml')
-        self.close()
+        self.change_language('lang_en.yaml')
+        
+        
+    def change_language(self, lang_file):
+        """Apply the texts of "lang_file" right away, and keep them for the next start"""
+        shutil.copy(lang_file, 'lang.yaml')
+        self.lang_dict.load()
 
 
     def show_timeView(self):
@@ -459,6 +739,16 @@ class MainWindow(QtWidgets.QMainWindow):
         self.stackedWidget.setCurrentIndex(1)
         
         self.actionChannels.setEnabled(False)
+        
+        
+    def show_spectrumView(self):
+        """Shows the power spectrum, and the power in the frequency bands"""
+        
+        self.view = 'spectrumView'
+        self.stackedWidget.setCurrentWidget(self.spectrumPanel)
+        self.spectrumPanel.refresh()
+        
+        self.actionChannels.setEnabled(False)
             
                     
 class TrafficLight(QtWidgets.QWidget):
@@ -472,9 +762,21 @@ class TrafficLight(QtWidgets.QWidget):
          QtWidgets.QSizePolicy.MinimumExpanding
          )
         
-        
-        mainWin.signal.connect(self._trigger_refresh)
         self.mainWin = mainWin
+        self.value = None       # light that is on: 0 (top), 1 (middle), 2 (bottom)
+        self.signal = 0.
+
+        
+    def set_value(self, signal):
+        """Select the light for the new signal value; repaint only if it changes"""
+        
+        self.signal = signal
+        value = crossings.zone_of(np.abs(signal), self.mainWin.lower_thresh,
+                                  self.mainWin.upper_thresh)
+            
+        if value != self.value:
+            self.value = value
+            self.update()
 
         
     def sizeHint(self):
@@ -482,6 +784,7 @@ class TrafficLight(QtWidgets.QWidget):
 
      
     def paintEvent(self, e):
+        self.mainWin.perf.frame()
         painter = QtGui.QPainter(self)
         
         padding = 5
@@ -509,17 +812,8 @@ class TrafficLight(QtWidgets.QWidget):
         
         painter.drawRect(*top_left, *box)
         
-        # Get current state.
-        
-        signal = self.mainWin.sensor.show_data[0,-1]
-        
-        if np.abs(signal) > self.mainWin.upper_thresh:
-            value = 2
-        elif np.abs(signal) < self.mainWin.lower_thresh:
-            value = 0
-        else:
-            value = 1
-            
+        # Current state (see "set_value")
+        value = self.value
         
         # Draw the lights.
         colors = [QtGui.QColor(self.mainWin.defaults['topColor']),
@@ -547,11 +841,213 @@ class TrafficLight(QtWidgets.QWidget):
             
         painter.end()
         
-    def _trigger_refresh(self):
-         self.update()
+
+class LightGrid(QtWidgets.QWidget):
+    """Several TrafficLights in a grid, each with the expression of its signal"""
+
+    def __init__(self, mainWin, titles, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        layout = QtWidgets.QGridLayout()
+        self.setLayout(layout)
+        
+        n_columns = int(np.ceil(np.sqrt(len(titles))))
+        self.lights = []
+        for ii, title in enumerate(titles):
+            light = TrafficLight(mainWin=mainWin)
+            light.setToolTip(title)
+            row, column = divmod(ii, max(n_columns, 1))
+            layout.addWidget(light, 2*row, column)
+            layout.addWidget(QtWidgets.QLabel(title, alignment=Qt.AlignCenter), 2*row + 1, column)
+            self.lights.append(light)
+            
+            
+    def set_values(self, values):
+        """Latest value of each signal"""
+        for light, value in zip(self.lights, values):
+            light.set_value(value)
+            
+            
+    def refresh(self):
+        """Re-evaluate the states (e.g. after a change of the thresholds)"""
+        for light in self.lights:
+            light.set_value(light.signal)
+            
+            
+    def repaint_lights(self):
+        """Repaint all lights (e.g. after a change of the colors)"""
+        for light in self.lights:
+            light.update()
 
         
 
+class SpectrumPanel(QtWidgets.QWidget):
+    """Power spectrum of the live signal, and bar-graph of the band powers"""
+
+    def __init__(self, spectrum, bands, *args, **kwargs):
+        """
+        Parameters
+        ----------
+        spectrum : spectrum.WelchSpectrum
+        bands : list of tuples
+                (f_low, f_high) [Hz]
+        """
+        
+        super().__init__(*args, **kwargs)
+        self.spectrum = spectrum
+        self.bands = bands
+        
+        layout = QtWidgets.QVBoxLayout()
+        self.setLayout(layout)
+        
+        self.psdPlot = pg.PlotWidget(labels={'bottom': 'Frequency [Hz]', 'left': 'PSD'})
+        self.psdPlot.setLogMode(y=True)
+        self.psdCurve = self.psdPlot.plot(pen='y')
+        self.peakLabel = QtWidgets.QLabel(alignment=Qt.AlignCenter)
+        
+        self.bandPlot = pg.PlotWidget(labels={'left': 'Power'})
+        self.bandPlot.getAxis('bottom').setTicks([[(ii, f'{low:g}-{high:g} Hz')
+                                        for ii, (low, high) in enumerate(bands)]])
+        self.bars = pg.BarGraphItem(x=np.arange(len(bands)), height=np.zeros(len(bands)),
+                                    width=0.6, brush='g')
+        self.bandPlot.addItem(self.bars)
+        
+        layout.addWidget(self.psdPlot, stretch=2)
+        layout.addWidget(self.peakLabel)
+        layout.addWidget(self.bandPlot, stretch=1)
+        
+        
+    def refresh(self):
+        """Draw the current spectrum"""
+        
+        psd = self.spectrum.psd
+        if psd is None:
+            return
+        freqs = self.spectrum.freqs
+        
+        # Without the DC-component, which cannot be shown on a log-scale
+        self.psdCurve.setData(freqs[1:], np.maximum(psd[1:, 0], 1e-12))
+        peak = spectrum.peak_frequency(freqs, psd, f_min=freqs[1])[0]
+        self.peakLabel.setText(f'Peak: {peak:.2f} Hz')
+        if self.bands:
+            self.bars.setOpts(height=spectrum.band_power(freqs, psd, self.bands)[:, 0])
+            
+            
+class NameList(QtCore.QAbstractListModel):
+    """Names from the registry that match a search-text, loaded page by page"""
+
+    page_size = 100
+    
+    def __init__(self, subjects, kind, *args, **kwargs):
+        """
+        Parameters
+        ----------
+        subjects : registry.SubjectRegistry
+        kind : string
+                'subject' or 'experimentor'
+        """
+        
+        super().__init__(*args, **kwargs)
+        self.subjects = subjects
+        self.kind = kind
+        self.text = ''
+        self.names = []
+        self.complete = False
+        
+        
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.names)
+    
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            return self.names[index.row()]
+        return None
+    
+    
+    def canFetchMore(self, parent):
+        return not parent.isValid() and not self.complete
+    
+    
+    def fetchMore(self, parent):
+        """Load the next page, when the view scrolls to the end"""
+        
+        page = self.subjects.search(self.kind, self.text, limit=self.page_size,
+                                    offset=len(self.names))
+        self.complete = len(page) < self.page_size
+        if page:
+            self.beginInsertRows(QtCore.QModelIndex(), len(self.names), len(self.names) + len(page) - 1)
+            self.names.extend(page)
+            self.endInsertRows()
+            
+            
+    def set_text(self, text):
+        """New search-text: start again with the first page"""
+        
+        self.beginResetModel()
+        self.text = text
+        self.names = []
+        self.complete = False
+        self.endResetModel()
+        self.fetchMore(QtCore.QModelIndex())
+        
+        
+class SubjectDialog(QtWidgets.QDialog):
+    """Select experimentor and subject, with incremental search"""
+
+    def __init__(self, subjects, *args, **kwargs):
+        """
+        Parameters
+        ----------
+        subjects : registry.SubjectRegistry
+        """
+        
+        super().__init__(*args, **kwargs)
+        self.setWindowTitle('Select Experimentor and Subject')
+        
+        layout = QtWidgets.QGridLayout()
+        self.lists = {}
+        for column, (kind, title) in enumerate([('experimentor', 'Experimentors'),
+                                                ('subject', 'Subjects')]):
+            model = NameList(subjects, kind, parent=self)
+            view = QtWidgets.QListView()
+            view.setModel(model)
+            view.setUniformItemSizes(True)
+            view.doubleClicked.connect(self.accept)
+            search = QtWidgets.QLineEdit()
+            search.setPlaceholderText('Search...')
+            search.textChanged.connect(lambda text, model=model, view=view: self.search(model, view, text))
+            
+            layout.addWidget(QtWidgets.QLabel(title), 0, column)
+            layout.addWidget(search, 1, column)
+            layout.addWidget(view, 2, column)
+            self.lists[kind] = view
+            self.search(model, view, '')
+        
+        self.buttonBox = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok |
+                                                    QtWidgets.QDialogButtonBox.Cancel)
+        self.buttonBox.accepted.connect(self.accept)
+        self.buttonBox.rejected.connect(self.reject)
+        layout.addWidget(self.buttonBox, 3, 0, 1, 2)
+        self.setMinimumWidth(500)
+        self.setLayout(layout)
+        
+        
+    def search(self, model, view, text):
+        """Show the names that match the text, with the first one selected"""
+        
+        model.set_text(text)
+        if model.rowCount() > 0:
+            view.setCurrentIndex(model.index(0))
+            
+            
+    def selected(self, kind):
+        """Selected name ('subject' or 'experimentor'), or None"""
+        
+        index = self.lists[kind].currentIndex()
+        return index.data() if index.isValid() else None
+    
+    
 class EnterText(QtWidgets.QDialog):
     """Dialog for entering values"""
 
@@ -577,19 +1073,23 @@ class EnterText(QtWidgets.QDialog):
 
             
 def main():
-    # Establish the UDP connection
-    # Note that those numbers can change - this has yet to be automated, so that we can select the sensor!
-    sensor = ngimu.Sensor(debug_flag=False)
-    if sensor.address[0] == -1:
-        print('No sensor, so the program has been terminated.')
-        return
+    if '--replay' in sys.argv:
+        # Play back a previous recording, instead of using the sensor
+        sensor = sources.ReplaySource(sys.argv[sys.argv.index('--replay') + 1], loop=True)
+    else:
+        # Establish the UDP connection
+        # Note that those numbers can change - this has yet to be automated, so that we can select the sensor!
+        ngimu_sensor = ngimu.Sensor(debug_flag=False)
+        if ngimu_sensor.address[0] == -1:
+            print('No sensor, so the program has been terminated.')
+            return
+        sensor = sources.NGIMUSource(ngimu_sensor)
 
     # Initialize the sensor.show_data
     num_data = 800      # for the display
     save_data = 100     # to save in blocks
     sensor.show_data = np.zeros( (3, num_data) )
-    sensor.store_data = np.zeros( (save_data, 15) )
-    sensor.store_ptr = 0
+    sensor.store_size = save_data
     sensor.channel = 'acc'
 
     app = QtWidgets.QApplication(sys.argv)
@@ -606,15 +1106,20 @@ def main():
     time.sleep(2)
     QTimer.singleShot(500, splash.close)
     
-    _app = guidata.qapplication()
-                    
-    sub, exp = get_subjects()
-    
-    e = Subjects()
-    e.edit()
+    # The registry is only re-imported when "subjects.txt" or "experimentors.txt"
+    # have changed, and the dialog loads the names page by page
+    subjects = registry.SubjectRegistry()
+    subjects.sync()
+    dlg = SubjectDialog(subjects)
+    accepted = dlg.exec_()
+    subject, experimentor = dlg.selected('subject'), dlg.selected('experimentor')
+    subjects.close()
+    if not accepted or subject is None or experimentor is None:
+        print('No subject selected, so the program has been terminated.')
+        return
     
-    sensor.subject = sub[e._Subject]
-    sensor.experimentor = exp[e._Experimentor]
+    sensor.subject = subject
+    sensor.experimentor = experimentor
 
     tv_win = MainWindow(sensor=sensor)
     tv_win.show()
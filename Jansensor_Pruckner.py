@@ -9,17 +9,72 @@ ver.: 1.0
 import os
 import sys
 import time
-import re
 import numpy as np
-import pandas as pd
 import datetime
 
 import pyqtgraph as pg
 
 from pymetawear.discover import select_device
 from pymetawear.client import MetaWearClient
+from metawear_adapter import FakeMetaWearClient
+from buffers import AlignedBuffer
+from sources import MetaWearSource
+import recording
+from fusion import Madgwick
+import orientation
 from PyQt5 import QtWidgets, QtGui, QtCore, QtMultimedia
 
+# The sensor-callbacks only queue the samples (see "sources.MetaWearSource");
+# the displays are updated in batches, by a GUI-timer with this interval [ms]
+FRAME_INTERVAL = 33
+
+
+# Columns of the fused orientation
+ORIENTATION_COLUMNS = ['Heading (deg)', 'Pitch (deg)', 'Roll (deg)']
+
+
+def start_recording(window, outfile, columns, outfile2=None):
+    ''' Open the recordings of a window, in the selected directory
+    The data are written by background-threads, in the same format as by
+    Jansenberger (see "recording.open_recorder"). With "outfile2" and a
+    second device, its data, and the data of both devices on a common
+    timebase ("_aligned") are recorded as well.
+    '''
+    date = datetime.datetime.now().strftime('%c')
+    def open_recorder(name, columns):
+        filename = os.path.join(window.dirPath, name + recording.EXTENSION)
+        return recording.open_recorder(filename, columns, date=date)
+
+    window.recorder = open_recorder(outfile, columns)
+    if outfile2 is not None and window.source2 is not None:
+        window.recorder2 = open_recorder(outfile2, window.source2.columns)
+        window.recorderAligned = open_recorder(outfile + '_aligned',
+                                    ['{0} {1}'.format(name, device+1)
+                                     for device in range(2) for name in columns])
+
+
+def record(window, batch, batch2=None):
+    ''' Record new samples (time, values) of a window
+    With a second device, both are also combined on a common timebase
+    '''
+    if window.recorder is not None:
+        window.recorder.extend(batch)
+    if batch2 is not None:
+        rows = np.vstack((window.aligned.add(0, batch), window.aligned.add(1, batch2)))
+        if window.recorder2 is not None:
+            window.recorder2.extend(batch2)
+            window.recorderAligned.extend(rows)
+
+
+def stop_recording(window):
+    ''' Write the remaining data, and close the recordings of a window '''
+    for name in ['recorder', 'recorder2', 'recorderAligned']:
+        recorder = getattr(window, name, None)
+        if recorder is not None:
+            recorder.close()
+            print('\nData saved to ', recorder.name)
+            setattr(window, name, None)
+
 
 class MainWindow(QtWidgets.QMainWindow):
 
@@ -73,6 +128,7 @@ class MainWindow(QtWidgets.QMainWindow):
     
     def flagChanged(self, flag):
         ''' Setting the central widget whenever the flag changes '''
+        stop_recording(self.centralWidget())    # the previous display is deleted
         if flag == self.lightFlag:
             self.lightWin = trafficLight()
             self.setCentralWidget(self.lightWin)
@@ -143,6 +199,7 @@ class MainWindow(QtWidgets.QMainWindow):
             time.sleep(3.0)
             print('Unsubscribed from notifications...')
             device1.disconnect()
+            stop_recording(self.centralWidget())
             print('\nWindow closed')
         elif box.clickedButton() == buttonN:
             event.ignore()
@@ -157,11 +214,10 @@ class trafficLight(QtWidgets.QWidget):
         # flag for swapping lightcolors
         self.swapFlag = False
         
-        # Define a buffer to save the data
-        row = 7500  # sample_rate (25 Hz) x time (5 min)
-        col = 3     # 3 signals from accelerometer or 3 from gyroscope
-        self.buffer = np.nan * np.ones((row, col))
-        self.ii = 0
+        self.source = None  # MetaWear-module, selected when the streaming starts
+        
+        # With "Daten speichern", the data are recorded while they stream
+        self.recorder = None
         
         # Create name for the outfile by defining the current date and time
         self.outfileAcc = datetime.datetime.now().strftime("%b%d%Y_%H-%M-%S_Acc")
@@ -312,19 +368,11 @@ class trafficLight(QtWidgets.QWidget):
     def stopStreaming(self):
         ''' Stop data streaming after 'Stop' is clicked '''
         self.timerStop()
-        device1.accelerometer.notifications(None)
-        device1.gyroscope.notifications(None)
+        self.source.stop()
         time.sleep(3.0)
+        self.timerEvent()       # process the remaining samples
         print('Unsubscribed from notifications...')
-        if self.check_save.isChecked():
-            self.df = self.df[pd.notnull(self.df['X-data'])]  # Remove empty rows
-            os.chdir(self.dirPath)
-            if self.sensor == 'Accelerometer':
-                self.df.to_csv(self.outfileAcc, sep='\t')
-            else:
-                self.df.to_csv(self.outfileGyr, sep='\t')
-            
-            print('\nData saved to ', self.dirPath)
+        stop_recording(self)
 
     def connect_and_start(self):
         """ Connects the signals, and starts the timer
@@ -335,51 +383,43 @@ class trafficLight(QtWidgets.QWidget):
         self.time = QtCore.QTime(0, 0, 0)
         
         self.timer.timeout.connect(self.timerEvent)
-        self.timer.start(200)    
+        self.timer.start(FRAME_INTERVAL)
+        
+        if self.sensor == 'Accelerometer':
+            self.source = MetaWearSource(device1, 'accelerometer')
+            outfile = self.outfileAcc
+        else:
+            self.source = MetaWearSource(device1, 'gyroscope')
+            outfile = self.outfileGyr
+        if self.check_save.isChecked():
+            start_recording(self, outfile, self.source.columns)
+        self.source.start()
         
     def timerEvent(self):
         """ Every few msec, check the signal, and set the color of the
         rectangle accordingly. 
         the 'update' calls the 'paintEvent'
         """
-        def stream_data(data):
-            # take the signal from a sensor
-            line = str(data)
-            values = re.split('[:,}]', line)
-        
-            x_data = float(values[4]) * 1000  # converted into mG
-            y_data = float(values[6]) * 1000
-            z_data = float(values[8]) * 1000
-            
-            self.current = np.hstack((x_data,y_data,z_data))
-            self.buffer[self.ii] = self.current
-            self.df = pd.DataFrame(self.buffer)
-            self.df.columns = ['X-data', 'Y-data', 'Z-data']
-            self.ii += 1
-            
-            if self.cbox.currentText() == 'X':
-                mySignal = x_data 
-            elif self.cbox.currentText() == 'Y':
-                mySignal = y_data
-            else:
-                mySignal = z_data
-            
-            if mySignal > self.upperThreshold:
-                if self.colorNr is not 0:
-                    self.colorNr = 0
-                    self.update()
-            elif mySignal > self.lowerThreshold:
-                if self.colorNr is not 1:
-                    self.colorNr = 1
-                    self.update()
-            else:
-                if self.colorNr is not 2:
-                    self.colorNr = 2
-                    self.update()
-        if self.sensor == 'Accelerometer':
-            device1.accelerometer.notifications(stream_data)
+        timestamps, values = self.source.read()
+        if len(timestamps) == 0:
+            return
+        record(self, np.column_stack((timestamps, values)))
+        
+        new_data = values * 1000    # converted into mG
+        
+        # The latest sample determines the color
+        column = {'X': 0, 'Y': 1}.get(self.cbox.currentText(), 2)
+        mySignal = new_data[-1, column]
+        
+        if mySignal > self.upperThreshold:
+            colorNr = 0
+        elif mySignal > self.lowerThreshold:
+            colorNr = 1
         else:
-            device1.gyroscope.notifications(stream_data)
+            colorNr = 2
+        if colorNr != self.colorNr:
+            self.colorNr = colorNr
+            self.update()
     
     def timerStop(self):
         ''' Stop the timer when trafficLight should be stopped '''
@@ -392,17 +432,21 @@ class linePlotWindow(pg.GraphicsWindow):
         super(linePlotWindow, self).__init__()
         self.initUI()
         
-        # Define a buffer to save the data
-        row = 135000  # sample_rate (50 Hz) x time (45 min)
-        col = 3     # 3 signals from accelerometer and 3 from gyroscope
-        self.buffer = np.nan * np.ones((row, col))
-        self.ii = 0
+        self.source = None  # MetaWear-module, selected when the streaming starts
+        self.source2 = None # the same module of the second device
+        
+        # With "Daten speichern", the data are recorded while they stream
+        self.recorder = self.recorder2 = self.recorderAligned = None
+        
+        # With 2 devices, their data are also combined on a common timebase
+        self.aligned = AlignedBuffer(2, 3, rate=50, store=False)
         
-        # Define a second buffer if 2 devices selected
-        row = 135000  # sample_rate (50 Hz) x time (45 min)
-        col = 3     # 3 signals from accelerometer and 3 from gyroscope
-        self.buffer2 = np.nan * np.ones((row, col))
-        self.jj = 0
+        # For the orientation, accelerometer and gyroscope are streamed together
+        self.fusionSources = []
+        
+        # The plot is updated by a GUI-timer, once per frame
+        self.timer = QtCore.QTimer()
+        self.timer.timeout.connect(self.updatePlot)
         
         # Create name for the outfile by defining the current date and time
         self.outfileAcc = datetime.datetime.now().strftime("%b%d%Y_%H-%M-%S_Acc")
@@ -410,6 +454,7 @@ class linePlotWindow(pg.GraphicsWindow):
         
         self.outfileAcc2 = datetime.datetime.now().strftime("%b%d%Y_%H-%M-%S_Acc2")
         self.outfileGyr2 = datetime.datetime.now().strftime("%b%d%Y_%H-%M-%S_Gyr2")
+        self.outfileOri = datetime.datetime.now().strftime("%b%d%Y_%H-%M-%S_Ori")
         
     def initUI(self):
         ''' Define display style '''
@@ -430,7 +475,7 @@ class linePlotWindow(pg.GraphicsWindow):
         self.check.stateChanged.connect(self.checked)
           
         self.cbox = QtWidgets.QComboBox()
-        self.cbox.addItems(['bitte waehlen', 'Accelerometer', 'Gyroscope'])
+        self.cbox.addItems(['bitte waehlen', 'Accelerometer', 'Gyroscope', 'Orientierung'])
         self.layout.addWidget(self.cbox, 2,2)
         self.cbox.currentIndexChanged.connect(self.selectionChange)
         
@@ -485,6 +530,11 @@ class linePlotWindow(pg.GraphicsWindow):
             self.layout.addWidget(self.btn, 1,0)
             self.btn.clicked.connect(self.startGyroStreaming)
             self.btn.clicked.connect(self.btn.deleteLater)
+        elif self.sensor == 'Orientierung':
+            self.btn = QtGui.QPushButton('Start')
+            self.layout.addWidget(self.btn, 1,0)
+            self.btn.clicked.connect(self.startOrientationStreaming)
+            self.btn.clicked.connect(self.btn.deleteLater)
         else:
             print('No sensor selected...')
     
@@ -506,68 +556,109 @@ class linePlotWindow(pg.GraphicsWindow):
         ''' stream data from accelerometer '''
         # Subscribe to notifications to get the data (until callback=None)
         device1.accelerometer.set_settings(data_rate=50)
-        device1.accelerometer.notifications(self.streamingData1)
-        
+        self.source = MetaWearSource(device1, 'accelerometer')
         if deviceFlag == True:
             device2.accelerometer.set_settings(data_rate=50)
-            device2.accelerometer.notifications(self.streamingData2)
+            self.source2 = MetaWearSource(device2, 'accelerometer')
+        if self.check.isChecked():
+            start_recording(self, self.outfileAcc, self.source.columns, self.outfileAcc2)
             
+        self.source.start()
+        if self.source2 is not None:
+            self.source2.start()
+        self.timer.start(FRAME_INTERVAL)
         self.p1.setLabel('left','Beschleunigung in g')
         self.p1.setTitle('Beschleunigungsmessung')
         
     def startGyroStreaming(self):
         ''' stream data from gyroscope '''
-        device1.gyroscope.notifications(self.streamingData)
+        self.source = MetaWearSource(device1, 'gyroscope')
+        if self.check.isChecked():
+            start_recording(self, self.outfileGyr, self.source.columns)
+        self.source.start()
+        self.timer.start(FRAME_INTERVAL)
         self.p1.setLabel('left','Winkelgeschwindigkeit  in °/s')
         self.p1.setTitle('Winkelgeschwindigkeitsmessung')
         
+    def startOrientationStreaming(self):
+        ''' stream accelerometer and gyroscope, and fuse them to the orientation
+        With 2 devices, the orientation of device 2 relative to device 1 (the
+        joint angles) is shown
+        '''
+        devices = [device1, device2] if deviceFlag == True else [device1]
+        self.fusionSources = []
+        for device in devices:
+            device.accelerometer.set_settings(data_rate=50)
+            device.gyroscope.set_settings(data_rate=50)
+            self.fusionSources.append(MetaWearSource(device, 'accelerometer'))
+            self.fusionSources.append(MetaWearSource(device, 'gyroscope'))
+        self.source = self.fusionSources[0]
+        
+        # acc and gyr of all devices on a common timebase, fused together
+        self.fusionStreams = AlignedBuffer(len(self.fusionSources), 3, rate=50, store=False)
+        self.fusion = Madgwick(rate=50, n_devices=len(devices))
+        
+        # The orientation-angles are recorded
+        if self.check.isChecked():
+            start_recording(self, self.outfileOri, ORIENTATION_COLUMNS)
+        for source in self.fusionSources:
+            source.start()
+        
+        self.timer.start(FRAME_INTERVAL)
+        self.p1.setLabel('left','Winkel in °')
+        self.p1.setTitle('Orientierung (Heading, Pitch, Roll)')
+        
+    def readOrientation(self):
+        ''' Orientation-angles from the new samples: time, heading, pitch, roll '''
+        rows = np.vstack([self.fusionStreams.add(ii, np.column_stack(source.read()))
+                          for ii, source in enumerate(self.fusionSources)])
+        n_devices = self.fusion.n_devices
+        values = rows[:, 1:].reshape((len(rows), n_devices, 2, 3))  # acc, gyr per device
+        quats = self.fusion.process(values[:, :, 0], values[:, :, 1])
+        if n_devices == 2:
+            quats = orientation.relative(quats[:, 0], quats[:, 1])
+        else:
+            quats = quats[:, 0]
+        return np.column_stack((rows[:, 0], orientation.to_euler(quats)))
+        
     def stopStreaming(self):
         ''' Stop data streaming after 'Stop' is clicked '''
-        device1.accelerometer.notifications(None)
-        device1.gyroscope.notifications(None)
-        if deviceFlag == True:
-            device2.accelerometer.notifications(None)
+        self.source.stop()
+        if self.source2 is not None:
+            self.source2.stop()
+        for source in self.fusionSources:
+            source.stop()
         time.sleep(3.0)
+        self.timer.stop()
+        self.updatePlot()       # process the remaining samples
         print('Unsubscribed from notifications...')
-        if self.check.isChecked():
-            self.df = self.df[pd.notnull(self.df['X-data'])]  # Remove empty rows
-            os.chdir(self.dirPath)
-            if self.sensor == 'Accelerometer':
-                self.df.to_csv(self.outfileAcc, sep='\t')
-                if deviceFlag == True:
-                    self.df2 = self.df2[pd.notnull(self.df2['X-data'])]  # Remove empty rows
-                    self.df2.to_csv(self.outfileAcc2, sep='\t')
-            else:
-                self.df.to_csv(self.outfileGyr, sep='\t')
-            
-            print('\nData saved to ', self.dirPath)
+        stop_recording(self)
             
-    def streamingData1(self, data):
+    def updatePlot(self):
         ''' Plot sensor data in realtime
-        Each time this function is called, the data display is updated
-        '''        
-        self.Xmx[:-1] = self.Xmx[1:]          # shift data in the temporal mean 1 sample left
-        self.Xmy[:-1] = self.Xmy[1:]
-        self.Xmz[:-1] = self.Xmz[1:]
-        
-        line = str(data)
-        values = re.split('[:,}]', line)      # split the string to get the values
-        
-        x_data = float(values[4])
-        y_data = float(values[6])
-        z_data = float(values[8])
+        Called by the timer: all samples received since the last call are
+        stored, and the display is updated once
+        '''
+        if self.fusionSources:
+            batch = self.readOrientation()              # epoch, heading, pitch, roll
+        else:
+            batch = np.column_stack(self.source.read())     # epoch, x, y, z
+        if self.source2 is not None:
+            record(self, batch, np.column_stack(self.source2.read()))
+        else:
+            record(self, batch)
         
-        self.current = np.hstack((x_data,y_data,z_data))
-        self.buffer[self.ii] = self.current
-        self.df = pd.DataFrame(self.buffer)
-        self.df.columns = ['X-data', 'Y-data', 'Z-data']
-        self.ii += 1
+        n = len(batch)
+        if n == 0:
+            return
         
-        self.Xmx[-1] = x_data               # vector containing the instantaneous values      
-        self.Xmy[-1] = y_data
-        self.Xmz[-1] = z_data
+        # shift data in the temporal mean n samples left, and add the new ones
+        shown = min(n, self.windowWidth)
+        for window, column in zip((self.Xmx, self.Xmy, self.Xmz), (1, 2, 3)):
+            window[:-shown] = window[shown:]
+            window[-shown:] = batch[-shown:, column]
         
-        self.ptr += 1                              # update x position for displaying the curve
+        self.ptr += n                              # update x position for displaying the curve
         
         self.curveX.setData(self.Xmx)              # set the curve with this data
         self.curveX.setPos(self.ptr, 0)            # set x position in the graph to 0
@@ -575,25 +666,6 @@ class linePlotWindow(pg.GraphicsWindow):
         self.curveY.setPos(self.ptr, 0)
         self.curveZ.setData(self.Xmz)
         self.curveZ.setPos(self.ptr, 0)
-        
-        QtWidgets.QApplication.processEvents()    # process the plot
-        
-    def streamingData2(self, data):
-        ''' Plot sensor data in realtime
-        Each time this function is called, the data display is updated
-        '''        
-        line = str(data)
-        values = re.split('[:,}]', line)      # split the string to get the values
-        
-        x_data = float(values[4])
-        y_data = float(values[6])
-        z_data = float(values[8])
-        
-        self.current2 = np.hstack((x_data,y_data,z_data))
-        self.buffer2[self.jj] = self.current2
-        self.df2 = pd.DataFrame(self.buffer2)
-        self.df2.columns = ['X-data', 'Y-data', 'Z-data']
-        self.jj += 1
 
 
 class gridWindow(pg.GraphicsWindow):
@@ -602,11 +674,14 @@ class gridWindow(pg.GraphicsWindow):
         super(gridWindow, self).__init__()
         self.initUI()
         
-        # Define a buffer to save the data
-        row = 7500  # sample_rate (25 Hz) x time (5 min)
-        col = 3     # 3 signals from accelerometer or 3 from gyroscope
-        self.buffer = np.nan * np.ones((row, col))
-        self.ii = 0
+        self.source = None  # MetaWear-module, selected when the streaming starts
+        
+        # With "Daten speichern", the data are recorded while they stream
+        self.recorder = None
+        
+        # The plot is updated by a GUI-timer, once per frame
+        self.timer = QtCore.QTimer()
+        self.timer.timeout.connect(self.updatePlot)
         
         # Create name for the outfile by defining the current date and time
         self.outfileAcc = datetime.datetime.now().strftime("%b%d%Y_%H-%M-%S_Acc")
@@ -705,55 +780,52 @@ class gridWindow(pg.GraphicsWindow):
         ''' stream data from accelerometer '''
         # Subscribe to notifications to get the data (until callback=None)
         device1.accelerometer.set_settings(data_rate=12.5)
-        device1.accelerometer.notifications(self.streamingData)
+        self.source = MetaWearSource(device1, 'accelerometer')
+        if self.check.isChecked():
+            start_recording(self, self.outfileAcc, self.source.columns)
+        self.source.start()
+        self.timer.start(FRAME_INTERVAL)
         self.p1.setTitle('Beschleunigungsmessung')
         
     def startGyroStreaming(self):
         ''' stream data from gyroscope '''
-        device1.gyroscope.notifications(self.streamingData)
+        self.source = MetaWearSource(device1, 'gyroscope')
+        if self.check.isChecked():
+            start_recording(self, self.outfileGyr, self.source.columns)
+        self.source.start()
+        self.timer.start(FRAME_INTERVAL)
         self.p1.setTitle('Winkelgeschwindigkeitsmessung')
         
     def stopStreaming(self):
         ''' Stop data streaming after 'Stop' is clicked '''
-        device1.accelerometer.notifications(None)
-        device1.gyroscope.notifications(None)
+        self.source.stop()
         time.sleep(3.0)
+        self.timer.stop()
+        self.updatePlot()       # process the remaining samples
         print('Unsubscribed from notifications...')
-        if self.check.isChecked():
-            self.df = self.df[pd.notnull(self.df['X-data'])]  # Remove empty rows
-            os.chdir(self.dirPath)
-            if self.sensor == 'Accelerometer':
-                self.df.to_csv(self.outfileAcc, sep='\t')
-            else:
-                self.df.to_csv(self.outfileGyr, sep='\t')
-            
-            print('\nData saved to ', self.dirPath)
+        stop_recording(self)
         
 #        self.p1.clear() # clear the plot for the next run
         
-    def streamingData(self, data):
+    def updatePlot(self):
         ''' Plot sensor data in realtime
-        Each time this function is called, the data display is updated
-        '''        
-        self.Xmx[:-1] = self.Xmx[1:]                    # shift data in the temporal mean 1 sample left
-        self.Xmy[:-1] = self.Xmy[1:]
-                
-        line = str(data)
-        values = re.split('[:,}]', line)      # split the string to get the values
-        
-        x_data = float(values[4])
-        y_data = float(values[6])
-        z_data = float(values[8])
-        
-        self.current = np.hstack((x_data,y_data,z_data))
-        self.buffer[self.ii] = self.current
-        self.df = pd.DataFrame(self.buffer)
-        self.df.columns = ['X-data', 'Y-data', 'Z-data']
-        self.ii += 1
+        Called by the timer: all samples received since the last call are
+        stored, and the display is updated once
+        '''
+        batch = np.column_stack(self.source.read())     # epoch, x, y, z
+        n = len(batch)
+        if n == 0:
+            return
+        record(self, batch)
+        
+        # shift data in the temporal mean n samples left, and add the new ones
+        shown = min(n, self.windowWidth)
+        self.Xmx[:-shown] = self.Xmx[shown:]
+        self.Xmy[:-shown] = self.Xmy[shown:]
         
         '''Convert data into mG'''
-        self.Xmx[-1] = x_data * 1000              # vector containing the instantaneous values      
-        self.Xmy[-1] = y_data * 1000
+        self.Xmx[-shown:] = batch[-shown:, 1] * 1000    # vector containing the instantaneous values      
+        self.Xmy[-shown:] = batch[-shown:, 2] * 1000
         
         self.graph.setData(self.Xmx, self.Xmy, symbol='o', symbolBrush='r', symbolSize=20)
         # add lines for positive and negative x/y-limits
@@ -762,8 +834,6 @@ class gridWindow(pg.GraphicsWindow):
 #        self.p1.addLine(x=self.yLim, pen='c')
 #        self.p1.addLine(x=-self.yLim, pen='c')
         
-        QtWidgets.QApplication.processEvents()    # process the plot
-        
 
 class storeWindow(QtWidgets.QWidget):
     ''' Class to only save the data (no visualization) '''
@@ -772,17 +842,14 @@ class storeWindow(QtWidgets.QWidget):
         super(storeWindow, self).__init__()
         self.initUI()
         
-        # Define a buffer to save the data
-        row = 7500  # sample_rate (25 Hz) x time (5 min)
-        col = 3     # 3 signals from accelerometer or 3 from gyroscope
-        self.buffer = np.nan * np.ones((row, col))
-        self.ii = 0
+        self.source = None  # MetaWear-module, selected when the streaming starts
+        self.source2 = None # the same module of the second device
+        self.recorder = self.recorder2 = self.recorderAligned = None
         
-        # Define a second buffer for the case that 2 devices are selected
-        row = 135000  # sample_rate (50 Hz) x time (45 min)
-        col = 3     # 3 signals from accelerometer and 3 from gyroscope
-        self.buffer2 = np.nan * np.ones((row, col))
-        self.jj = 0
+        # A GUI-timer records the samples, and combines the data of 2 devices
+        # on a common timebase
+        self.timer = QtCore.QTimer()
+        self.timer.timeout.connect(self.updateBuffers)
         
         # Create name for the outfile by defining the current date and time
         self.outfileAcc = datetime.datetime.now().strftime("%b%d%Y_%H-%M-%S_Acc")
@@ -841,83 +908,66 @@ class storeWindow(QtWidgets.QWidget):
         device1.accelerometer.set_settings(data_rate=50)
         # high_frequency_stream has to be true for streaming multiple devices
         device1.accelerometer.high_frequency_stream = True
-        device1.accelerometer.notifications(self.streamingData1)
+        self.source = MetaWearSource(device1, 'accelerometer')
         
         if deviceFlag == True:
             device2.accelerometer.set_settings(data_rate=50)
             device2.accelerometer.high_frequency_stream = True
-            device2.accelerometer.notifications(self.streamingData2)
+            self.source2 = MetaWearSource(device2, 'accelerometer')
+        
+        self.aligned = AlignedBuffer(2, 3, rate=50, store=False)
+        start_recording(self, self.outfileAcc, self.source.columns, self.outfileAcc2)
+        self.source.start()
+        if self.source2 is not None:
+            self.source2.start()
+        self.timer.start(FRAME_INTERVAL)
         
     def startGyroStreaming(self):
         ''' stream data from gyroscope '''
-        device1.gyroscope.notifications(self.streamingData1)
+        self.source = MetaWearSource(device1, 'gyroscope')
         device1.gyroscope.high_frequency_stream = True
         
         if deviceFlag == True:
-            device2.gyroscope.notifications(self.streamingData2)
+            self.source2 = MetaWearSource(device2, 'gyroscope')
             device2.gyroscope.high_frequency_stream = True
         
+        self.aligned = AlignedBuffer(2, 3, rate=25, store=False)    # gyroscope-rate, set in __main__
+        start_recording(self, self.outfileGyr, self.source.columns, self.outfileGyr2)
+        self.source.start()
+        if self.source2 is not None:
+            self.source2.start()
+        self.timer.start(FRAME_INTERVAL)
+        
     def stopStreaming(self):
         ''' Stop data streaming after 'Stop' is clicked '''
-        device1.accelerometer.notifications(None)
-        device1.gyroscope.notifications(None)
-        if deviceFlag == True:
-            device2.accelerometer.notifications(None)
-            device2.gyroscope.notifications(None)
+        self.source.stop()
+        if self.source2 is not None:
+            self.source2.stop()
         time.sleep(3.0)
+        self.timer.stop()
+        self.updateBuffers()    # record the remaining samples
         print('Unsubscribed from notifications...')
-        self.df = self.df[pd.notnull(self.df['X-data'])]  # Remove empty rows
-        os.chdir(self.dirPath)
-        if self.sensor == 'Accelerometer':
-            self.df.to_csv(self.outfileAcc, sep='\t')
-            if deviceFlag == True:
-                self.df2 = self.df2[pd.notnull(self.df2['X-data'])]
-                self.df2.to_csv(self.outfileAcc2, sep='\t')
-        else:
-            self.df.to_csv(self.outfileGyr, sep='\t')
-            if deviceFlag == True:
-                self.df2 = self.df2[pd.notnull(self.df2['X-data'])]
-                self.df2.to_csv(self.outfileGyr2, sep='\t')
+        stop_recording(self)
             
-        print('\nData saved to ', self.dirPath)
-            
-    def streamingData1(self, data):
-        ''' Get sensor data and save it to a buffer '''
-        line = str(data)
-        values = re.split('[:,}]', line)  # split the string to get the values
-        
-        x_data = float(values[4])
-        y_data = float(values[6])
-        z_data = float(values[8])
-        
-        self.current = np.hstack((x_data,y_data,z_data))
-        self.buffer[self.ii] = self.current
-        self.df = pd.DataFrame(self.buffer)
-        self.df.columns = ['X-data', 'Y-data', 'Z-data']
-        self.ii += 1
-        
-    def streamingData2(self, data):
-        ''' Get the data from the second device and 
-        save it to another buffer
-        '''        
-        line = str(data)
-        values = re.split('[:,}]', line)  # split the string to get the values
-        
-        x_data = float(values[4])
-        y_data = float(values[6])
-        z_data = float(values[8])
-        
-        self.current2 = np.hstack((x_data,y_data,z_data))
-        self.buffer2[self.jj] = self.current2
-        self.df2 = pd.DataFrame(self.buffer2)
-        self.df2.columns = ['X-data', 'Y-data', 'Z-data']
-        self.jj += 1
+    def updateBuffers(self):
+        ''' Called by the timer: record the new samples '''
+        batch = np.column_stack(self.source.read())     # epoch, x, y, z
+        if self.source2 is not None:
+            record(self, batch, np.column_stack(self.source2.read()))
+        else:
+            record(self, batch)
          
 
 if __name__ == '__main__':
+    # With "--fake", simulated sensors are used instead of the hardware
+    fake = '--fake' in sys.argv
+    
     # Set a LE Bluetooth device1 with given MAC address as client
-    address1 = select_device()
-    device1 = MetaWearClient(str(address1), debug=True)
+    if fake:
+        device1 = FakeMetaWearClient()
+    else:
+        address1 = select_device()
+        device1 = MetaWearClient(str(address1), debug=True)
     
     ''' Set accelerometer settings to preset values
     Possible settings are:
@@ -941,8 +991,11 @@ if __name__ == '__main__':
     query_device = input('Add another device (y/n)? ')
     if query_device == 'y':
         deviceFlag = True
-        address2 = select_device()
-        device2 = MetaWearClient(str(address2), debug=True) 
+        if fake:
+            device2 = FakeMetaWearClient()
+        else:
+            address2 = select_device()
+            device2 = MetaWearClient(str(address2), debug=True) 
         device2.accelerometer.set_settings(data_rate=12.5)
         device2.accelerometer.set_settings(data_range=4.0)
         device2.gyroscope.set_settings(data_rate=25)
@@ -1,69 +1,117 @@
 """
 This is a demonstration of how to stream data with the NGIMU
 Note that you may have to disable the firewall on the computer to see the sensor!
+
+All bound UDP-ports are watched with a "selectors"-loop. On every tick of the
+display timer, every socket is drained completely, and the "/sensors" and
+"/quaternion" data are stored in separate ring-buffers. The plot is then
+updated once, so the display keeps up with the full sample rate of the sensor.
+
+Usage:
+    python Plotting_NGIMU.py [acc|gyr|mag|quat]
 """
 
 # author:   Thomas Haslwanter
 # date:     Dec-2019
 
 from pyqtgraph.Qt import QtGui, QtCore
-import numpy as np
 import pyqtgraph as pg
 import sys
-import osc_decoder
 import socket
+import selectors
+
+import ngimu
+from buffers import RingBuffer
+
+
+# Note that those numbers can change - this has yet to be automated, so that we can select the sensor!
+UDP_PORTS = [9000, 8016]
+NUM_DATA = 800          # samples displayed
+
+# Columns of the OSC-messages: gyr (3), acc (3), mag (3), bar | quaternion (4)
+ADDRESSES = {'/sensors': 10, '/quaternion': 4}
+SELECTIONS = {'gyr': ('/sensors', slice(0, 3)),
+              'acc': ('/sensors', slice(3, 6)),
+              'mag': ('/sensors', slice(6, 9)),
+              'quat': ('/quaternion', slice(1, 4))}   # only the quaternion-vector
+
+
+def open_sockets(ports):
+    """Bind non-blocking UDP-sockets to the ports, and register them for reading"""
+
+    selector = selectors.DefaultSelector()
+    for port in ports:
+        udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        udp_socket.bind(("", port))
+        udp_socket.setblocking(False)
+        selector.register(udp_socket, selectors.EVENT_READ)
+    return selector
+
+
+def drain(selector, buffers, packetsize=2048):
+    """Read all waiting datagrams from all ready sockets
 
-def update(selection='quat'):
+    Parameters
+    ----------
+    selector : selectors.BaseSelector
+    buffers : dictionary
+            {address: RingBuffer}; messages with other addresses are ignored
+    packetsize : integer
+
+    Returns
+    -------
+    n_packets : integer
+            Number of datagrams read
+    """
+
+    rows = {address: [] for address in buffers}
+    n_packets = 0
+    for key, mask in selector.select(timeout=0):
+        while True:
+            try:
+                UDP_data, addr = key.fileobj.recvfrom(packetsize)
+            except OSError:
+                # empty, or reset by the network; the other sockets are still read
+                break
+            n_packets += 1
+            for message in ngimu.decode(UDP_data):
+                if message[1] in rows:
+                    rows[message[1]].append(message[2:])
+
+    # One (vectorized) update per buffer
+    for address, new_rows in rows.items():
+        if new_rows:
+            buffers[address].extend(new_rows)
+    return n_packets
+
+
+def update():
     """Update the data in the streaming plot"""
-    global curve, data, ph, udp_sockets, quat
-    
-    # Get the data from the NGIMU
-    try:
-        UDP_data, addr = udp_socket.recvfrom(2048)
-    except socket.error:
-        pass
-    else:
-        for message in osc_decoder.decode(UDP_data):
-            print(message)
-            if selection == 'acc':
-                if message[1] == '/sensor':
-                    new_data = message[5:8]                   
-            else:
-                # Extract the quaternion
-                if message[1] == '/quaternion':
-                    # For the moment, only show the quaternion-vector
-                    new_data = message[2:]                   
-                
-    # Update the 'data' for the plot, and put them into the corresponding plot-lines
-    # select: acc / gyr / mag / quat
-    selection = 'acc'
-    
-    if selection == 'quat':
-        data = np.vstack((data[1:,:], new_data))
-    elif selection == 'acc':
-        data = np.vstack((data[1:,:], new_data))
-    
-    curve[0].setData(data[:,0])
-    curve[1].setData(data[:,1])
-    curve[2].setData(data[:,2])
+
+    if drain(selector, buffers) == 0:
+        return
+
+    address, columns = SELECTIONS[selection]
+    data = buffers[address].view()[:, columns]
+    for ii, curve in enumerate(curves):
+        curve.setData(data[:, ii])
 
 
 if __name__=='__main__':
-    # Establish the UDP connection
-    # Note that those numbers can change - this has yet to be automated, so that we can select the sensor!
-    udp_ports = [9000, 8016]
-    udp_sockets = [socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for _ in range(len(udp_ports))]
-    
-    for (index, udp_socket) in enumerate(udp_sockets):
-        udp_socket.bind(("", udp_ports[index]))
-        # index = index + 1
-        udp_socket.setblocking(False)
+    # select: acc / gyr / mag / quat
+    selection = sys.argv[1] if len(sys.argv) > 1 else 'acc'
+    if selection not in SELECTIONS:
+        raise TypeError(f'Do not know selection type {selection}')
+
+    # Establish the UDP connections, and the buffers for the data
+    selector = open_sockets(UDP_PORTS)
+    buffers = {address: RingBuffer(NUM_DATA, n_columns)
+               for address, n_columns in ADDRESSES.items()}
 
     # Set up the PyQtGraph GUI
     app = QtGui.QApplication([])
     win = pg.GraphicsLayoutWidget(show=True, title='NGIMU')
 
-    num_data = 800
     win.resize(1000, 600)
     win.setWindowTitle('Data Viewer')
 
@@ -72,12 +120,9 @@ if __name__=='__main__':
 
     ph = win.addPlot(title='Streaming Plot')
     ph.enableAutoRange('xy', True)
-    curve = [ ph.plot(pen='y', label='x'),
-              ph.plot(pen='r', label='y'),
-              ph.plot(pen='g', label='z') ]
-    
-    # Initial values
-    data = np.zeros( (num_data, 3) ) 
+    curves = [ ph.plot(pen='y', label='x'),
+               ph.plot(pen='r', label='y'),
+               ph.plot(pen='g', label='z') ]
 
     # Timer for updating the display
     timer = QtCore.QTimer()
@@ -86,4 +131,3 @@ if __name__=='__main__':
 
     # Eventloop
     QtGui.QApplication.instance().exec_()
-
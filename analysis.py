@@ -0,0 +1,295 @@
+"""
+Summaries of recording sessions, live or as batch-analysis of a directory
+
+"SessionSummary" collects the summary values of a session from blocks of
+samples. The same class is used on the live data (updated with every new
+batch) and on the recordings (one block with all samples):
+
+    - duration and number of samples
+    - range of motion: ranges of heading, pitch, and roll (relative to the
+      starting orientation), and maximum helical angle
+    - peak angular velocity
+    - number of repetitions (see "repetitions.py")
+    - time above the upper threshold of the traffic light, and time below the
+      lower threshold
+
+"analyze_directory" runs the analysis for all recordings of the
+data-directory, in a pool of processes. The results are cached in the
+catalog-database (see "catalog.py"), keyed by the hash of the file and the
+analysis-parameters, so only new or changed recordings are analyzed again.
+The result is one summary table.
+
+Usage:
+    python analysis.py [<data-directory>] [<summary-file>]
+"""
+
+#   author: Thomas Haslwanter
+#   date:   Oct-2026
+
+import sys
+import csv
+import json
+import time
+import concurrent.futures
+import yaml
+import numpy as np
+
+import loader
+import catalog
+import orientation
+import repetitions
+
+
+VERSION = 1         # increase when the analysis changes, to invalidate the cache
+SUMMARY_FILE = 'summary.csv'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis (
+    hash TEXT,
+    parameters TEXT,
+    result TEXT,
+    PRIMARY KEY (hash, parameters)
+);
+"""
+
+FIELDS = ['duration', 'n_samples', 'rom_heading', 'rom_pitch', 'rom_roll',
+          'rom_helical', 'peak_angular_velocity', 'repetitions',
+          'time_above', 'time_below']
+
+
+def parameters(settings):
+    """Analysis-parameters from the settings (see "settings.yaml")"""
+
+    return {'upper_thresh': settings.get('upper_thresh', 0.7),
+            'lower_thresh': settings.get('lower_thresh', 0.3),
+            'threshold_channel': settings.get('threshold_channel', 'Accelerometer X (g)'),
+            'rep_channel': settings.get('rep_channel', 'Accelerometer Z (g)'),
+            'rep_min_amplitude': settings.get('rep_min_amplitude', 0.05),
+            'version': VERSION}
+
+
+class SessionSummary():
+    """Summary values of a session, updated block by block"""
+
+    def __init__(self, columns, rate=None, **kwargs):
+        """
+        Parameters
+        ----------
+        columns : list of strings
+                Names of the data-columns (without the time)
+        rate : float
+                Sample rate [Hz]; needed for the repetition-counter. Default:
+                determined from the timestamps of the first block
+        kwargs : analysis-parameters (see "parameters")
+        """
+
+        self.columns = list(columns)
+        self.rate = rate
+        self.parameters = parameters(kwargs)
+
+        def find(name):
+            """Index of the column "name", or None"""
+            return self.columns.index(name) if name in self.columns else None
+
+        self.gyr_column = find('Gyroscope X (deg/s)')
+        self.quat_column = find('Quat 0')
+        self.threshold_column = find(self.parameters['threshold_channel'])
+        self.rep_column = find(self.parameters['rep_channel'])
+
+        self.n_samples = 0
+        self.t_first = self.t_last = None
+        self.q_ref = None
+        self.angle_min = np.full(3, np.inf)
+        self.angle_max = np.full(3, -np.inf)
+        self.helical_max = 0.
+        self.peak_angular_velocity = 0.
+        self.time_above = self.time_below = 0.
+        self.counter = None
+
+
+    def update(self, timestamps, data):
+        """Add a block of samples
+
+        Parameters
+        ----------
+        timestamps : ndarray, shape (n,)
+                [s]
+        data : ndarray, shape (n, len(columns))
+        """
+
+        n = len(timestamps)
+        if n == 0:
+            return
+        timestamps = np.asarray(timestamps, dtype=float)
+        data = np.asarray(data, dtype=float)
+
+        # Each sample counts until the next one; the intervals of this block
+        # start with the last sample of the previous block
+        previous = timestamps[0] if self.t_last is None else self.t_last
+        intervals = np.diff(timestamps, prepend=previous)
+        if self.t_first is None:
+            self.t_first = timestamps[0]
+        self.t_last = timestamps[-1]
+        self.n_samples += n
+
+        if self.gyr_column is not None:
+            speed = np.linalg.norm(data[:, self.gyr_column:self.gyr_column + 3], axis=1)
+            self.peak_angular_velocity = max(self.peak_angular_velocity, np.nanmax(speed))
+
+        if self.quat_column is not None:
+            quats = data[:, self.quat_column:self.quat_column + 4]
+            if self.q_ref is None:
+                self.q_ref = quats[0]
+            relative = orientation.relative(self.q_ref, quats)
+            angles = orientation.to_euler(relative)
+            self.angle_min = np.fmin(self.angle_min, np.nanmin(angles, axis=0))
+            self.angle_max = np.fmax(self.angle_max, np.nanmax(angles, axis=0))
+            self.helical_max = max(self.helical_max,
+                                   np.nanmax(orientation.to_helical(relative)[0]))
+
+        if self.threshold_column is not None:
+            signal = np.abs(data[:, self.threshold_column])
+            self.time_above += np.sum(intervals[signal > self.parameters['upper_thresh']])
+            self.time_below += np.sum(intervals[signal < self.parameters['lower_thresh']])
+
+        if self.rep_column is not None:
+            if self.counter is None:
+                if self.rate is None and n > 1:
+                    self.rate = 1 / np.median(np.diff(timestamps))
+                if self.rate is not None:
+                    self.counter = repetitions.RepetitionCounter(
+                        self.rate, min_amplitude=self.parameters['rep_min_amplitude'])
+            if self.counter is not None:
+                self.counter.process(timestamps, data[:, self.rep_column])
+
+
+    def result(self):
+        """Summary values (see FIELDS); values that are not available are None"""
+
+        def value(x):
+            return None if x is None or not np.isfinite(x) else float(x)
+
+        has_angles = self.q_ref is not None
+        rom = self.angle_max - self.angle_min
+        return {'duration': value(None if self.t_first is None else self.t_last - self.t_first),
+                'n_samples': self.n_samples,
+                'rom_heading': value(rom[0]) if has_angles else None,
+                'rom_pitch': value(rom[1]) if has_angles else None,
+                'rom_roll': value(rom[2]) if has_angles else None,
+                'rom_helical': value(self.helical_max) if has_angles else None,
+                'peak_angular_velocity': value(self.peak_angular_velocity)
+                                         if self.gyr_column is not None else None,
+                'repetitions': self.counter.count if self.counter is not None else None,
+                'time_above': value(self.time_above) if self.threshold_column is not None else None,
+                'time_below': value(self.time_below) if self.threshold_column is not None else None}
+
+
+def analyze(data, header, **kwargs):
+    """Summary of a recording
+
+    Parameters
+    ----------
+    data : ndarray, shape (n, n_columns)
+            With the time in the first column
+    header : dictionary
+            Needs "columns"
+    kwargs : analysis-parameters (see "parameters")
+
+    Returns
+    -------
+    summary : dictionary
+            see "SessionSummary.result"
+    """
+
+    summary = SessionSummary(header['columns'][1:], **kwargs)
+    summary.update(data[:, 0], data[:, 1:])
+    return summary.result()
+
+
+def analyze_file(path, params):
+    """Worker of the process-pool: summary of one recording (None on errors)"""
+
+    try:
+        data, header = loader.load(path)
+        return analyze(data, header, **params)
+    except (OSError, ValueError, KeyError) as error:
+        print(f'Could not analyze {path}: {error}')
+        return None
+
+
+def analyze_directory(data_dir=None, settings=None, n_workers=None):
+    """Summaries of all recordings in the data-directory
+
+    Parameters
+    ----------
+    data_dir : string
+            Default: "dataDir" from "settings.yaml"
+    settings : dictionary
+            Analysis-parameters; Default: "settings.yaml"
+    n_workers : integer
+            Number of processes. Default: number of CPUs
+
+    Returns
+    -------
+    rows : list of dictionaries
+            path, subject, experimentor, date, and the FIELDS of each session,
+            sorted by date
+    n_analyzed : integer
+            Number of recordings that had to be (re-)analyzed
+    """
+
+    if settings is None:
+        with open('settings.yaml', 'r') as fh:
+            settings = yaml.load(fh, Loader=yaml.FullLoader)
+    params = parameters(settings)
+    key = json.dumps(params, sort_keys=True)
+
+    # The catalog provides the file-hashes, and holds the cached results
+    cat = catalog.Catalog(data_dir)
+    cat.scan()
+    cat.db.executescript(SCHEMA)
+    sessions = cat.sessions()
+    cached = {row['hash']: json.loads(row['result']) for row in
+              cat.db.execute('SELECT hash, result FROM analysis WHERE parameters = ?', (key,))}
+
+    todo = [session for session in sessions if session['hash'] not in cached]
+    if todo:
+        with concurrent.futures.ProcessPoolExecutor(n_workers) as pool:
+            results = pool.map(analyze_file, [session['path'] for session in todo],
+                               [params] * len(todo))
+            for session, result in zip(todo, results):
+                if result is not None:
+                    cached[session['hash']] = result
+                    cat.db.execute('INSERT OR REPLACE INTO analysis VALUES (?,?,?)',
+                                   (session['hash'], key, json.dumps(result)))
+        cat.db.commit()
+    cat.close()
+
+    rows = []
+    for session in sessions:
+        if session['hash'] in cached:
+            row = {name: session[name] for name in ['path', 'subject', 'experimentor', 'date']}
+            row.update(cached[session['hash']])
+            rows.append(row)
+    return (rows, len(todo))
+
+
+def write_summary(rows, out_file):
+    """Write the summaries as one table (comma-separated)"""
+
+    names = ['path', 'subject', 'experimentor', 'date'] + FIELDS
+    with open(out_file, 'w', newline='') as fh:
+        writer = csv.DictWriter(fh, fieldnames=names)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+if __name__ == '__main__':
+    # Analyze the data-directory (or the directory given on the command line)
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else None
+    start = time.perf_counter()
+    rows, n_analyzed = analyze_directory(data_dir)
+    out_file = sys.argv[2] if len(sys.argv) > 2 else SUMMARY_FILE
+    write_summary(rows, out_file)
+    print(f'{len(rows)} sessions ({n_analyzed} analyzed) in '
+          f'{time.perf_counter() - start:.1f} s, summary written to {out_file}')
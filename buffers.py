@@ -0,0 +1,365 @@
+"""
+Buffers for streaming sensor data
+
+"ChunkedBuffer" grows in fixed-size chunks, so that appending never copies the
+data collected so far, and neither the sample rate nor the duration of a
+session have to be known in advance. To keep the memory bounded in long
+sessions, old chunks can be spilled to a temporary file.
+
+"SampleQueue" hands single samples from a sensor-callback (which runs in a
+thread of the sensor-library) to the GUI-thread, where they are collected in
+batches by a timer.
+
+"RingBuffer" keeps the most recent rows, e.g. for a scrolling display.
+
+"AlignedBuffer" combines the samples of several sensors, each with its own
+timestamps, into one table on a common timebase.
+"""
+
+#   author: Thomas Haslwanter
+#   date:   Oct-2026
+
+import os
+import tempfile
+import collections
+import numpy as np
+
+
+class ChunkedBuffer():
+    """Append-only buffer of rows, growing in chunks"""
+
+    def __init__(self, n_columns, chunk_size=4096, max_chunks=64, spill_dir=None,
+                 dtype=np.float64):
+        """
+        Parameters
+        ----------
+        n_columns : integer
+                Number of values per row
+        chunk_size : integer
+                Number of rows per chunk
+        max_chunks : integer
+                Maximum number of full chunks kept in memory. Older chunks are
+                written to a temporary file. "None" keeps everything in memory.
+        spill_dir : string
+                Directory for the temporary file. Default: the system's
+                temp-directory
+        dtype : numpy dtype
+        """
+
+        self.n_columns = n_columns
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.spill_dir = spill_dir
+        self.dtype = np.dtype(dtype)
+
+        self.spill_file = None
+        self.clear()
+
+
+    def clear(self):
+        """Remove all data"""
+
+        self.close()
+        self.chunks = []            # full chunks in memory
+        self.n_spilled = 0          # rows in the spill-file
+        self.chunk = np.empty((self.chunk_size, self.n_columns), dtype=self.dtype)
+        self.ptr = 0
+
+
+    def append(self, row):
+        """Add one row"""
+
+        self.chunk[self.ptr] = row
+        self.ptr += 1
+        if self.ptr == self.chunk_size:
+            self._next_chunk()
+
+
+    def extend(self, rows):
+        """Add several rows, shape (n, n_columns)"""
+
+        rows = np.asarray(rows)
+        start = 0
+        while start < len(rows):
+            n = min(len(rows) - start, self.chunk_size - self.ptr)
+            self.chunk[self.ptr:self.ptr + n] = rows[start:start + n]
+            self.ptr += n
+            start += n
+            if self.ptr == self.chunk_size:
+                self._next_chunk()
+
+
+    def __len__(self):
+        return self.n_spilled + len(self.chunks) * self.chunk_size + self.ptr
+
+
+    def to_array(self):
+        """All rows as one contiguous array
+
+        Without spilling, the chunks are copied once into a new array. If data
+        have been spilled, the remaining chunks are appended to the spill-file,
+        and a memory-map of that file is returned (valid until "close").
+        """
+
+        parts = self.chunks + [self.chunk[:self.ptr]]
+        if self.spill_file is None:
+            return np.vstack(parts)
+
+        for part in parts:
+            self._spill(part)
+        self.chunks = []
+        self.ptr = 0
+        self.spill_file.flush()
+        if self.n_spilled == 0:
+            return np.zeros((0, self.n_columns), dtype=self.dtype)
+        return np.memmap(self.spill_file.name, dtype=self.dtype, mode='r',
+                         shape=(self.n_spilled, self.n_columns))
+
+
+    def close(self):
+        """Delete the spill-file (if any)"""
+
+        if self.spill_file is not None:
+            self.spill_file.close()
+            try:
+                os.remove(self.spill_file.name)
+            except OSError:
+                pass    # e.g. still memory-mapped under Windows
+            self.spill_file = None
+
+
+    def __del__(self):
+        self.close()
+
+
+    def _next_chunk(self):
+        """Store the full chunk, and start a new one"""
+
+        self.chunks.append(self.chunk)
+        self.chunk = np.empty((self.chunk_size, self.n_columns), dtype=self.dtype)
+        self.ptr = 0
+
+        if self.max_chunks is not None and len(self.chunks) > self.max_chunks:
+            self._spill(self.chunks.pop(0))
+
+
+    def _spill(self, rows):
+        """Append rows to the spill-file"""
+
+        if self.spill_file is None:
+            self.spill_file = tempfile.NamedTemporaryFile(suffix='.buf',
+                                    dir=self.spill_dir, delete=False)
+        self.spill_file.write(np.ascontiguousarray(rows).tobytes())
+        self.n_spilled += len(rows)
+
+
+class SampleQueue():
+    """Handoff of samples from a sensor-thread to the GUI-thread
+
+    "put" and "drain" only use "append" and "popleft" of a
+    "collections.deque", which are atomic. No lock is needed, and the sensor-
+    callback never waits for the GUI.
+    """
+
+    def __init__(self, n_columns, maxlen=None):
+        """
+        Parameters
+        ----------
+        n_columns : integer
+                Number of values per sample
+        maxlen : integer
+                If the GUI falls more than "maxlen" samples behind, the oldest
+                samples are discarded. "None" keeps all samples.
+        """
+
+        self.n_columns = n_columns
+        self.samples = collections.deque(maxlen=maxlen)
+
+
+    def put(self, sample):
+        """Add one sample (called from the sensor-thread)
+
+        The values are copied, so a preallocated row can be re-used.
+        """
+
+        self.samples.append(tuple(sample))
+
+
+    def drain(self):
+        """All samples received so far, as array with shape (n, n_columns)"""
+
+        n = len(self.samples)
+        popleft = self.samples.popleft
+        rows = [popleft() for ii in range(n)]
+        return np.array(rows, dtype=np.float64).reshape((n, self.n_columns))
+
+
+    def __len__(self):
+        return len(self.samples)
+
+
+class RingBuffer():
+    """Fixed number of the most recent rows
+
+    Every row is stored twice, at "ptr" and at "ptr+n_rows". The rows in
+    chronological order are then always the contiguous slice
+    [ptr:ptr+n_rows], so "view" needs neither copying nor "np.roll".
+    """
+
+    def __init__(self, n_rows, n_columns, dtype=np.float64):
+        """
+        Parameters
+        ----------
+        n_rows : integer
+                Number of rows kept
+        n_columns : integer
+        dtype : numpy dtype
+        """
+
+        self.n_rows = n_rows
+        self.data = np.zeros((2 * n_rows, n_columns), dtype=dtype)
+        self.ptr = 0
+        self.n_total = 0        # number of rows received so far
+
+
+    def extend(self, rows):
+        """Add rows, shape (n, n_columns)"""
+
+        rows = np.asarray(rows)
+        if len(rows) > self.n_rows:
+            self.n_total += len(rows) - self.n_rows
+            rows = rows[-self.n_rows:]
+
+        n = len(rows)
+        first = min(n, self.n_rows - self.ptr)  # rows until the end of the ring
+        for start, stop, ptr in [(0, first, self.ptr), (first, n, 0)]:
+            self.data[ptr:ptr + stop - start] = rows[start:stop]
+            self.data[ptr + self.n_rows:ptr + self.n_rows + stop - start] = rows[start:stop]
+
+        self.ptr = (self.ptr + n) % self.n_rows
+        self.n_total += n
+
+
+    def view(self):
+        """The rows in chronological order (without copying)"""
+        return self.data[self.ptr:self.ptr + self.n_rows]
+
+
+class AlignedBuffer():
+    """Samples of several devices, interpolated onto a common timebase
+
+    The devices deliver their samples independently, in batches of
+    (time, values). Whenever all devices have delivered data beyond the next
+    point of the common timebase, the new data are linearly interpolated
+    onto it, and appended to one table with the columns
+    (time, values device 0, values device 1, ...).
+
+    The common timebase starts at the first time covered by all devices, and
+    ends at the last time covered by all devices.
+    """
+
+    def __init__(self, n_devices, n_columns, rate, store=True, **kwargs):
+        """
+        Parameters
+        ----------
+        n_devices : integer
+        n_columns : integer
+                Number of values per device and sample (without the time)
+        rate : float
+                Sample rate of the common timebase [Hz]
+        store : boolean
+                Keep the aligned rows. If "False", they are only returned by
+                "add" (e.g. to be recorded).
+        kwargs : parameters of the "ChunkedBuffer" that holds the result
+        """
+
+        self.n_devices = n_devices
+        self.n_columns = n_columns
+        self.rate = rate
+        self.store = store
+        self.kwargs = kwargs
+
+        self.buffer = None
+        self.clear()
+
+
+    def clear(self):
+        """Remove all data"""
+
+        if self.buffer is not None:
+            self.buffer.close()
+        self.buffer = ChunkedBuffer(1 + self.n_devices * self.n_columns, **self.kwargs)
+        # received samples that are still needed for the interpolation
+        self.pending = [np.zeros((0, 1 + self.n_columns)) for ii in range(self.n_devices)]
+        self.t0 = None          # start of the common timebase
+        self.n_aligned = 0      # number of rows on the common timebase
+
+
+    def add(self, device, batch):
+        """Add samples from one device
+
+        Parameters
+        ----------
+        device : integer
+                Number of the device (0, 1, ...)
+        batch : ndarray, shape (n, 1+n_columns)
+                Time [s] and values
+
+        Returns
+        -------
+        aligned : ndarray, shape (m, 1+n_devices*n_columns)
+                The rows that could be added to the common timebase
+        """
+
+        if len(batch) > 0:
+            self.pending[device] = np.vstack((self.pending[device], batch))
+        return self._align()
+
+
+    def _align(self):
+        """Interpolate the pending samples, as far as all devices allow"""
+
+        empty = np.zeros((0, 1 + self.n_devices * self.n_columns))
+        if min(len(pending) for pending in self.pending) == 0:
+            return empty
+
+        if self.t0 is None:
+            self.t0 = max(pending[0, 0] for pending in self.pending)
+        t_stop = min(pending[-1, 0] for pending in self.pending)
+
+        # Grid-points are calculated from t0, to avoid accumulating errors
+        n_stop = int(np.floor((t_stop - self.t0) * self.rate + 1e-6)) + 1
+        if n_stop <= self.n_aligned:
+            return empty
+        t = self.t0 + np.arange(self.n_aligned, n_stop) / self.rate
+        self.n_aligned = n_stop
+        t_next = self.t0 + n_stop / self.rate
+
+        rows = np.empty((len(t), 1 + self.n_devices * self.n_columns))
+        rows[:, 0] = t
+        for ii, pending in enumerate(self.pending):
+            for jj in range(self.n_columns):
+                rows[:, 1 + ii * self.n_columns + jj] = np.interp(
+                        t, pending[:, 0], pending[:, 1 + jj])
+
+            # Keep the last sample before the next grid-point, and all later ones
+            first = max(np.searchsorted(pending[:, 0], t_next, side='right') - 1, 0)
+            self.pending[ii] = pending[first:]
+
+        if self.store:
+            self.buffer.extend(rows)
+        return rows
+
+
+    def __len__(self):
+        return len(self.buffer)
+
+
+    def to_array(self):
+        """All aligned rows (see "ChunkedBuffer.to_array")"""
+        return self.buffer.to_array()
+
+
+    def close(self):
+        """Delete the spill-file of the result (if any)"""
+        self.buffer.close()
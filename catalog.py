@@ -0,0 +1,287 @@
+"""
+SQLite catalog of the recordings in the data-directory
+
+The catalog stores for each recording the subject, experimentor, date,
+duration, number of samples, file-hash, and per-channel statistics. Rescans
+only read files that are new, or whose size or modification time has changed,
+and remove the entries of deleted files. By default only the headers are read;
+the channel statistics are computed when they are first requested. ".dat"-files
+next to a binary recording with the same name are CSV-exports of that session
+(see "recording.export_csv"), and are not cataloged a second time.
+
+Example:
+    cat = Catalog()
+    cat.scan()
+    sessions = cat.sessions(subject='Mustermann, Max', start='2026-10-01')
+"""
+
+#   author: Thomas Haslwanter
+#   date:   Oct-2026
+
+import os
+import re
+import sys
+import time
+import sqlite3
+import hashlib
+import datetime
+import yaml
+import numpy as np
+
+import loader
+import recording
+
+
+DB_FILE = 'catalog.sqlite'
+EXTENSIONS = ('.dat', recording.EXTENSION)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    path TEXT PRIMARY KEY,
+    subject TEXT,
+    experimentor TEXT,
+    date TEXT,
+    duration REAL,
+    n_samples INTEGER,
+    size INTEGER,
+    mtime INTEGER,
+    hash TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_subject ON sessions (subject, date);
+CREATE INDEX IF NOT EXISTS idx_experimentor ON sessions (experimentor, date);
+CREATE INDEX IF NOT EXISTS idx_date ON sessions (date);
+CREATE INDEX IF NOT EXISTS idx_hash ON sessions (hash);
+CREATE TABLE IF NOT EXISTS channels (
+    path TEXT,
+    channel TEXT,
+    mean REAL,
+    std REAL,
+    min REAL,
+    max REAL,
+    PRIMARY KEY (path, channel)
+);
+"""
+
+
+def file_hash(filename, chunk_size=2**20):
+    """SHA1-hash of the file content"""
+
+    sha = hashlib.sha1()
+    with open(filename, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def session_date(filename, header):
+    """Date of the recording, as 'YYYY-mm-dd HH:MM:SS'
+
+    Taken from the file name ("YYYYmmdd_HH-MM-SS_<surname>"), or - if that
+    does not work - from the modification time of the file.
+    """
+
+    match = re.match(r'(\d{8}_\d{2}-\d{2}-\d{2})', os.path.basename(filename))
+    if match:
+        date = datetime.datetime.strptime(match.group(1), '%Y%m%d_%H-%M-%S')
+    else:
+        date = datetime.datetime.fromtimestamp(os.path.getmtime(filename))
+    return date.strftime('%Y-%m-%d %H:%M:%S')
+
+
+class Catalog():
+    """Incremental, indexed catalog of the recordings"""
+
+    def __init__(self, data_dir=None, db_file=None):
+        """
+        Parameters
+        ----------
+        data_dir : string
+                Directory with the recordings. Default: "dataDir" from
+                "settings.yaml"
+        db_file : string
+                SQLite-database. Default: "catalog.sqlite" in the data_dir
+        """
+
+        if data_dir is None:
+            with open('settings.yaml', 'r') as fh:
+                data_dir = yaml.load(fh, Loader=yaml.FullLoader)['dataDir']
+        if db_file is None:
+            db_file = os.path.join(data_dir, DB_FILE)
+
+        self.data_dir = data_dir
+        self.db = sqlite3.connect(db_file)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+
+    def close(self):
+        """Close the database"""
+        self.db.close()
+
+
+    def scan(self, with_stats=False):
+        """Bring the catalog up to date with the data-directory
+
+        Parameters
+        ----------
+        with_stats : boolean
+                If "True", the data of new recordings are read right away, to
+                determine the channel statistics (and, for ".dat"-files, number
+                of samples and duration). Otherwise only the headers are read,
+                and the statistics are computed on demand (see "channel_stats").
+
+        Returns
+        -------
+        (n_added, n_removed) : number of (re-)cataloged and of deleted entries
+        """
+
+        known = {row['path']: (row['size'], row['mtime']) for row in
+                 self.db.execute('SELECT path, size, mtime FROM sessions')}
+
+        n_added = 0
+        found = set()
+        with os.scandir(self.data_dir) as entries:
+            entries = [entry for entry in entries
+                       if entry.is_file() and entry.name.endswith(EXTENSIONS)]
+        sessions = {os.path.splitext(entry.path)[0] for entry in entries
+                    if entry.name.endswith(recording.EXTENSION)}
+        for entry in entries:
+            # CSV-exports of binary recordings are the same session
+            if entry.name.endswith('.dat') and os.path.splitext(entry.path)[0] in sessions:
+                continue
+            found.add(entry.path)
+            stat = entry.stat()
+            if known.get(entry.path) == (stat.st_size, stat.st_mtime_ns):
+                continue
+            try:
+                self._add(entry.path, stat, with_stats)
+                n_added += 1
+            except (OSError, ValueError) as error:
+                print(f'Could not catalog {entry.path}: {error}')
+
+        removed = [(path,) for path in known if path not in found]
+        self.db.executemany('DELETE FROM sessions WHERE path = ?', removed)
+        self.db.executemany('DELETE FROM channels WHERE path = ?', removed)
+        self.db.commit()
+
+        return (n_added, len(removed))
+
+
+    def _add(self, path, stat, with_stats):
+        """Catalog one recording"""
+
+        # For binary recordings, the block-index gives number of samples and duration
+        duration, n_samples = None, None
+        if path.endswith(recording.EXTENSION):
+            reader = recording.RecordingReader(path)
+            header = reader.header
+            n_samples = reader.n_rows
+            if len(reader.blocks) > 0 and header.get('time_column') is not None:
+                duration = float(reader.blocks['t_last'].max() - reader.blocks['t_first'].min())
+        else:
+            header = loader.read_dat_header(path)
+
+        self.db.execute('INSERT OR REPLACE INTO sessions VALUES (?,?,?,?,?,?,?,?,?)',
+                        (path, header.get('subject'), header.get('experimentor'),
+                         session_date(path, header), duration, n_samples,
+                         stat.st_size, stat.st_mtime_ns, file_hash(path)))
+
+        self.db.execute('DELETE FROM channels WHERE path = ?', (path,))
+        if with_stats:
+            self._add_stats(path)
+
+
+    def _add_stats(self, path):
+        """Read the data of a recording, and store the channel statistics
+        (and number of samples and duration)"""
+
+        data, header = loader.load(path, use_cache=False)
+        if len(data) > 1 and header['columns'][0].startswith('Time'):
+            self.db.execute('UPDATE sessions SET n_samples = ?, duration = ? WHERE path = ?',
+                            (len(data), float(data[-1, 0] - data[0, 0]), path))
+        else:
+            self.db.execute('UPDATE sessions SET n_samples = ? WHERE path = ?', (len(data), path))
+
+        if len(data) > 0:
+            stats = zip(header['columns'], np.nanmean(data, axis=0),
+                        np.nanstd(data, axis=0), np.nanmin(data, axis=0),
+                        np.nanmax(data, axis=0))
+            self.db.executemany('INSERT OR REPLACE INTO channels VALUES (?,?,?,?,?,?)',
+                                [(path, name, float(mean), float(std), float(lo), float(hi))
+                                 for (name, mean, std, lo, hi) in stats])
+
+
+    def sessions(self, subject=None, experimentor=None, start=None, stop=None):
+        """Find recordings
+
+        Parameters
+        ----------
+        subject : string
+        experimentor : string
+        start : string
+                Earliest date, e.g. '2026-10-01'
+        stop : string
+                Latest date (inclusive), e.g. '2026-10-31'
+
+        Returns
+        -------
+        sessions : list of dictionaries
+                path, subject, experimentor, date, duration, n_samples, ...,
+                sorted by date
+        """
+
+        conditions, values = [], []
+        if subject is not None:
+            conditions.append('subject = ?')
+            values.append(subject)
+        if experimentor is not None:
+            conditions.append('experimentor = ?')
+            values.append(experimentor)
+        if start is not None:
+            conditions.append('date >= ?')
+            values.append(start)
+        if stop is not None:
+            # dates are stored with the time, so compare with the following day
+            conditions.append('date < ?')
+            values.append(stop + '~')
+
+        query = 'SELECT * FROM sessions'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY date'
+        return [dict(row) for row in self.db.execute(query, values)]
+
+
+    def channel_stats(self, path):
+        """Channel statistics of one recording; computed when first requested
+
+        Returns
+        -------
+        stats : dictionary
+                {channel: {'mean', 'std', 'min', 'max'}}
+        """
+
+        rows = self.db.execute('SELECT * FROM channels WHERE path = ?', (path,)).fetchall()
+        if not rows:
+            self._add_stats(path)
+            self.db.commit()
+            rows = self.db.execute('SELECT * FROM channels WHERE path = ?', (path,)).fetchall()
+        return {row['channel']: {'mean': row['mean'], 'std': row['std'],
+                                 'min': row['min'], 'max': row['max']}
+                for row in rows}
+
+
+if __name__ == '__main__':
+    # Update the catalog of the data-directory (or of the directory given on
+    # the command line), and list the sessions
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else None
+    cat = Catalog(data_dir)
+
+    start = time.perf_counter()
+    n_added, n_removed = cat.scan()
+    print(f'{n_added} recordings added, {n_removed} removed, in {time.perf_counter() - start:.2f} s')
+
+    for session in cat.sessions():
+        print(f'{session["date"]}  {session["subject"] or "":25s}  '
+              f'{session["experimentor"] or "":25s}  {session["path"]}')
+    cat.close()
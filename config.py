@@ -0,0 +1,118 @@
+"""
+Settings and translations, held in memory, with change-notifications
+
+"Config" keeps the content of a YAML-file (e.g. "settings.yaml", or
+"lang.yaml") as a read-only mapping. Changes go through "update" (or "load",
+to read a file again), which informs the subscribers about the keys whose
+values have changed. The viewer uses this to re-apply labels, limits, colors,
+thresholds, and the online analysis, while the acquisition keeps running.
+
+Example:
+    settings = Config('settings.yaml')
+    settings.subscribe(lambda changed: print(changed), keys=['upper_thresh'])
+    settings.update({'upper_thresh': 0.8})      # prints {'upper_thresh'}
+"""
+
+#   author: Thomas Haslwanter
+#   date:   Oct-2026
+
+import sys
+import collections.abc
+import yaml
+
+
+class Config(collections.abc.Mapping):
+    """Content of a YAML-file, with change-notifications"""
+
+    def __init__(self, filename=None, values=None):
+        """
+        Parameters
+        ----------
+        filename : string
+                YAML-file; it is read right away
+        values : dictionary
+                Initial values (instead of, or in addition to the file)
+        """
+
+        self.filename = filename
+        self.values = {}
+        self.subscribers = []
+        if filename is not None:
+            self.values.update(self._read(filename))
+        if values is not None:
+            self.values.update(values)
+
+
+    @staticmethod
+    def _read(filename):
+        with open(filename, 'r') as fh:
+            return yaml.load(fh, Loader=yaml.FullLoader) or {}
+
+
+    def __getitem__(self, key):
+        return self.values[key]
+
+
+    def __iter__(self):
+        return iter(self.values)
+
+
+    def __len__(self):
+        return len(self.values)
+
+
+    def subscribe(self, callback, keys=None):
+        """Call "callback(changed)" after changes
+
+        Parameters
+        ----------
+        callback : function
+                Gets the set of the changed keys
+        keys : list of strings
+                Only changes of these keys are reported; Default: all keys
+        """
+
+        self.subscribers.append((callback, None if keys is None else set(keys)))
+
+
+    def update(self, values):
+        """Change values, and inform the subscribers
+
+        Returns
+        -------
+        changed : set
+                Keys whose values have changed
+        """
+
+        changed = {key for key, value in values.items()
+                   if key not in self.values or self.values[key] != value}
+        self.values.update(values)
+        if changed:
+            for callback, keys in self.subscribers:
+                if keys is None:
+                    callback(changed)
+                elif changed & keys:
+                    callback(changed & keys)
+        return changed
+
+
+    def load(self, filename=None):
+        """Read the YAML-file (again), and apply the changes (see "update")"""
+
+        if filename is not None:
+            self.filename = filename
+        return self.update(self._read(self.filename))
+
+
+    def save(self, filename=None):
+        """Write the values to the YAML-file"""
+
+        with open(filename or self.filename, 'w') as fh:
+            yaml.dump(self.values, fh)
+
+
+if __name__ == '__main__':
+    # Show a configuration-file: config.py [<file>]
+    config = Config(sys.argv[1] if len(sys.argv) > 1 else 'settings.yaml')
+    for key, value in config.items():
+        print(f'{key:20s}: {value}')
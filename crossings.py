@@ -0,0 +1,211 @@
+"""
+Threshold-crossings of the traffic-light signals
+
+The traffic lights divide each signal into three zones: below the lower
+threshold, between the thresholds, and above the upper threshold. Every
+change of zone is a crossing (see CROSSINGS). "CrossingDetector" finds them
+on whole blocks of samples, for all signals at once, and interpolates the
+time of each crossing linearly between the two samples on either side of the
+threshold. The results are event-records (see "events.py"), which are stored
+in the event-file next to the recording:
+
+    - 'zone' : zone at the start of a recording, or after a change of the
+      thresholds (no crossing)
+    - 'lower_rising', 'lower_falling', 'upper_rising', 'upper_falling'
+    - 'stop' : end of the recording
+
+The "value" of each record is the zone after the event. The time spent in
+each zone, and the number of excursions above/below the thresholds, follow
+from these events alone (see "zone_summary"), without reading the samples.
+
+Example:
+    detector = CrossingDetector(lower=0.3, upper=0.7, n_signals=2)
+    writer.write_records(detector.process(timestamps, np.abs(signals)))
+"""
+
+#   author: Thomas Haslwanter
+#   date:   Oct-2026
+
+import sys
+import numpy as np
+
+import events
+
+
+ZONES = ['below', 'between', 'above']
+CROSSINGS = ['lower_rising', 'lower_falling', 'upper_rising', 'upper_falling']
+ZONE_AFTER = np.array([1, 0, 2, 1])     # zone after each kind of crossing
+KIND_NUMBERS = np.array([events.KINDS.index(name) for name in CROSSINGS])
+
+
+def zone_of(signal, lower, upper):
+    """Zone (index into ZONES) of each value"""
+    signal = np.asarray(signal)
+    return (signal > lower).astype(int) + (signal > upper)
+
+
+class CrossingDetector():
+    """Threshold-crossings of one or more signals, block by block"""
+
+    def __init__(self, lower, upper, n_signals=1, first_channel=0):
+        """
+        Parameters
+        ----------
+        lower, upper : float
+                Thresholds
+        n_signals : integer
+                Number of signals (columns of the blocks)
+        first_channel : integer
+                Channel-number of the first signal, in the event-file
+        """
+
+        self.thresholds = np.array([lower, upper], dtype=float)
+        self.n_signals = n_signals
+        self.channels = first_channel + np.arange(n_signals)
+        self.reset()
+
+
+    def reset(self):
+        """Start again; the next sample gives the starting zones"""
+        self.last = None        # last sample (time, values) of the previous block
+
+
+    def _records(self, time, kinds, channels, zones):
+        """Event-records; "kinds" are indices into "events.KINDS" """
+
+        records = np.zeros(len(time), dtype=events.EVENT_DTYPE)
+        records['time'] = time
+        records['kind'] = kinds
+        records['channel'] = channels
+        records['value'] = zones
+        return records
+
+
+    def _zones(self, kind='zone'):
+        """The current zone of each signal, as records of the given kind"""
+
+        if self.last is None:
+            return np.zeros(0, dtype=events.EVENT_DTYPE)
+        t, values = self.last
+        return self._records(np.full(self.n_signals, t), events.KINDS.index(kind),
+                             self.channels, zone_of(values, *self.thresholds))
+
+
+    def process(self, timestamps, signals):
+        """Crossings in a block of samples
+
+        Parameters
+        ----------
+        timestamps : ndarray, shape (n,)
+                [s], increasing (e.g. from "resample.Resampler")
+        signals : ndarray, shape (n, n_signals) or (n,)
+                Compared with the thresholds as they are (take the absolute
+                value beforehand, as the traffic lights do)
+
+        Returns
+        -------
+        records : ndarray, dtype events.EVENT_DTYPE
+                Sorted by time; with the starting zones for the first block
+        """
+
+        timestamps = np.asarray(timestamps, dtype=float)
+        signals = np.asarray(signals, dtype=float).reshape((len(timestamps), self.n_signals))
+        if len(timestamps) == 0:
+            return np.zeros(0, dtype=events.EVENT_DTYPE)
+
+        if self.last is None:
+            self.last = (timestamps[0], signals[0])
+            start = self._zones()
+        else:
+            start = np.zeros(0, dtype=events.EVENT_DTYPE)
+
+        # The intervals start with the last sample of the previous block
+        t = np.concatenate(([self.last[0]], timestamps))
+        x = np.vstack((self.last[1], signals))
+        self.last = (t[-1], x[-1].copy())
+
+        # Crossings: the side of a threshold changes between two samples
+        above = x[:, :, np.newaxis] > self.thresholds         # (n+1, n_signals, 2)
+        sample, signal, threshold = np.nonzero(above[1:] != above[:-1])
+        rising = above[sample + 1, signal, threshold]
+
+        x0, x1 = x[sample, signal], x[sample + 1, signal]
+        fraction = (self.thresholds[threshold] - x0) / (x1 - x0)
+        time = t[sample] + fraction * (t[sample + 1] - t[sample])
+
+        kind = 2 * threshold + np.where(rising, 0, 1)
+        records = self._records(time, KIND_NUMBERS[kind], self.channels[signal],
+                                ZONE_AFTER[kind])
+        records = records[np.argsort(records['time'], kind='stable')]
+        return np.concatenate((start, records))
+
+
+    def set_thresholds(self, lower, upper):
+        """New thresholds; returns the new zones (as 'zone'-records)"""
+
+        self.thresholds = np.array([lower, upper], dtype=float)
+        return self._zones()
+
+
+    def stop(self):
+        """End of the recording; returns the final zones (as 'stop'-records)"""
+        return self._zones('stop')
+
+
+def detect_crossings(timestamps, signals, lower, upper):
+    """Crossings of a complete recording (see "CrossingDetector.process"),
+    including the 'stop'-records"""
+
+    n_signals = np.reshape(signals, (len(timestamps), -1)).shape[1]
+    detector = CrossingDetector(lower, upper, n_signals)
+    records = detector.process(timestamps, signals)
+    return np.concatenate((records, detector.stop()))
+
+
+def zone_summary(records, kinds=events.KINDS):
+    """Time in each zone, and number of excursions, from the event-records
+
+    Parameters
+    ----------
+    records : ndarray, dtype events.EVENT_DTYPE
+            E.g. from "events.read_events"; other kinds of events are ignored
+    kinds : list of strings
+            Names of the event-kinds (from the header of the event-file)
+
+    Returns
+    -------
+    summary : dictionary
+            For each channel with crossing-events: 'time_below',
+            'time_between', 'time_above' [s], 'excursions_below' and
+            'excursions_above'. Without a 'stop'-record (e.g. an interrupted
+            recording), the times end with the last crossing.
+    """
+
+    names = ['zone', 'stop'] + CROSSINGS
+    numbers = [kinds.index(name) for name in names if name in kinds]
+    records = records[np.isin(records['kind'], numbers)]
+
+    summary = {}
+    for channel in np.unique(records['channel']):
+        selected = records[records['channel'] == channel]
+        selected = selected[np.argsort(selected['time'], kind='stable')]
+        zones = selected['value'].astype(int)
+        times = np.bincount(zones[:-1], weights=np.diff(selected['time']), minlength=3)
+        counts = {name: np.count_nonzero(selected['kind'] == kinds.index(name))
+                  if name in kinds else 0 for name in CROSSINGS}
+        summary[int(channel)] = {'time_below': times[0],
+                                 'time_between': times[1],
+                                 'time_above': times[2],
+                                 'excursions_below': counts['lower_falling'],
+                                 'excursions_above': counts['upper_rising']}
+    return summary
+
+
+if __name__ == '__main__':
+    # Zone-times of the recordings given on the command line, from their event-files
+    for in_file in sys.argv[1:]:
+        records, header = events.read_events(events.events_file(in_file))
+        print(in_file)
+        for channel, values in zone_summary(records, header['kinds']).items():
+            print(f'    {header["channels"][channel]:25s} ' +
+                  ', '.join(f'{name} {value:.6g}' for name, value in values.items()))
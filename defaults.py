@@ -5,6 +5,7 @@ Jansenberger
 """
 
 import yaml
+import recording
 from guidata.dataset.datatypes import (DataSet, BeginTabGroup, EndTabGroup,
                                        BeginGroup, EndGroup, ObjectItem)
 from guidata.dataset.dataitems import (FloatItem, IntItem, BoolItem, ChoiceItem,
@@ -28,6 +29,7 @@ class DefaultParameters(DataSet):
     _bg = BeginGroup("Time View")
     acc_limit = FloatItem("Limit [Accelerometer]", default=0.5, min=0, max=3, step=0.01, slider=True)                             
     gyr_limit = FloatItem("Limit [Gyroscope]", default=300, min=100, max=1000, step=1, slider=True)                             
+    ang_limit = FloatItem("Limit [Orientation]", default=90, min=10, max=180, step=1, slider=True)
     init_channel = ChoiceItem("Initial Channel", [(16, "acc"), (32, "gyr")], radio=True)
     _eg = EndGroup("Time View")
 
@@ -37,8 +39,32 @@ class DefaultParameters(DataSet):
     color_bottom  = ColorItem("Bottom", default="#00aa00")
     upper_thresh = FloatItem("Upper Threshold", default=0.7, min=0, max=2, step=0.01, slider=True)                             
     lower_thresh = FloatItem("Lower Threshold", default=0.3, min=0.1, max=1, step=0.01, slider=True)                             
+    light_signals = StringItem("Signals (separated by ';')", default='abs(lowpass(ax, 5))')
     _ecolor = EndGroup("Colors")
 
+    _brec = BeginGroup("Recording")
+    fsync_interval = FloatItem("Sync to disk every [s]", default=5, min=1, max=60, step=1, slider=True)
+    codec = ChoiceItem("Compression", [('none', 'none'), ('zlib', 'zlib'), ('lzma', 'lzma')], radio=True)
+    _erec = EndGroup("Recording")
+
+    _bfilt = BeginGroup("Filter")
+    filter = ChoiceItem("Filter", [(name, name) for name in ['none', 'lowpass', 'highpass', 'rms', 'envelope']], default='lowpass')
+    filter_cutoff = FloatItem("Cutoff frequency [Hz]", default=5, min=0.1, max=50, step=0.1, slider=True)
+    filter_window = FloatItem("RMS-window [s]", default=0.2, min=0.02, max=2, step=0.02, slider=True)
+    sample_rate = FloatItem("Sample rate [Hz]", default=100, min=1, max=1000, step=1)
+    _efilt = EndGroup("Filter")
+
+    _breps = BeginGroup("Repetitions")
+    rep_channel = ChoiceItem("Channel", [(name, name) for name in recording.COLUMNS[1:]], default='Accelerometer Z (g)')
+    rep_min_amplitude = FloatItem("Minimum amplitude", default=0.05, min=0, max=500, step=0.01)
+    _ereps = EndGroup("Repetitions")
+
+    _bspec = BeginGroup("Spectrum")
+    spectrum_signal = StringItem("Signal", default='norm(gx, gy, gz)')
+    spectrum_bands = StringItem("Bands [Hz] (e.g. '3-7; 7-12')", default='0.5-3; 3-7; 7-12')
+    spectrum_segment = FloatItem("Segment length [s]", default=2.56, min=0.5, max=20, step=0.01)
+    _espec = EndGroup("Spectrum")
+
 
     opening_view = ChoiceItem("Initial View", [(16, 'Time-View'), (32, "xy-View"), (64, 'TrafficLight-View')], radio=True)
     
@@ -53,14 +79,27 @@ if __name__ == "__main__":
         defaults = {
         'accLim': e.acc_limit,
         'gyrLim': e.gyr_limit,
+        'angLim': e.ang_limit,
         'dataDir': e.data_dir,
         'topColor': e.color_top,
         'middleColor': e.color_middle,
         'bottomColor': e.color_bottom,
         'upper_thresh': e.upper_thresh,
         'lower_thresh': e.lower_thresh,
+        'light_signals': e.light_signals,
         'init_channel': e.init_channel,
-        'opening_view': e.opening_view
+        'opening_view': e.opening_view,
+        'fsync_interval': e.fsync_interval,
+        'codec': e.codec,
+        'filter': e.filter,
+        'filter_cutoff': e.filter_cutoff,
+        'filter_window': e.filter_window,
+        'sample_rate': e.sample_rate,
+        'rep_channel': e.rep_channel,
+        'rep_min_amplitude': e.rep_min_amplitude,
+        'spectrum_signal': e.spectrum_signal,
+        'spectrum_bands': e.spectrum_bands,
+        'spectrum_segment': e.spectrum_segment
         }
         settings_file = 'settings.yaml'
         with open(settings_file, 'w') as fh:
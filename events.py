@@ -0,0 +1,141 @@
+"""
+Event-streams, stored next to a recording
+
+Events (e.g. detected repetitions, or threshold-crossings) are written to
+"<recording>.jevt", as fixed-size binary records (see EVENT_DTYPE) after a
+short JSON-header:
+
+    - magic "JEVT", followed by the format version (uint16)
+    - header-length (uint32), followed by a UTF-8 encoded JSON-header with the
+      names of the event-kinds and of the channels
+    - the event-records
+
+Each record is written with a single call, and flushed right away. A record
+that is incomplete (because the recording was interrupted) is ignored when
+reading.
+"""
+
+#   author: Thomas Haslwanter
+#   date:   Oct-2026
+
+import os
+import sys
+import json
+import struct
+import numpy as np
+
+
+MAGIC = b'JEVT'
+VERSION = 1
+EXTENSION = '.jevt'
+EVENT_DTYPE = np.dtype([('time', '<f8'),        # [s], same timebase as the recording
+                        ('kind', '<u2'),        # index into KINDS
+                        ('channel', '<u2'),     # index into the channel-names
+                        ('value', '<f4'),       # e.g. amplitude
+                        ('duration', '<f4')])   # [s]
+KINDS = ['repetition', 'zone', 'lower_rising', 'lower_falling',
+         'upper_rising', 'upper_falling', 'stop']     # see "crossings.py"
+
+
+def events_file(recording):
+    """Name of the event-file belonging to a recording"""
+    return os.path.splitext(recording)[0] + EXTENSION
+
+
+class EventWriter():
+    """Append events to an event-file"""
+
+    def __init__(self, filename, channels=(), kinds=KINDS):
+        """Creates the file, and writes the header
+
+        Parameters
+        ----------
+        filename : string
+                Name of the event-file (see "events_file")
+        channels : list of strings
+                Channel names
+        kinds : list of strings
+                Names of the event-kinds
+        """
+
+        self.kinds = list(kinds)
+        self.channels = list(channels)
+        self.n_events = 0
+
+        self.fh = open(filename, 'wb')
+        self.name = self.fh.name
+        header = json.dumps({'kinds': self.kinds, 'channels': self.channels}).encode()
+        self.fh.write(MAGIC + struct.pack('<H', VERSION))
+        self.fh.write(struct.pack('<I', len(header)) + header)
+        self.fh.flush()
+
+
+    def write(self, time, kind, channel=0, value=0., duration=0.):
+        """Append one event
+
+        Parameters
+        ----------
+        time : float
+        kind : string
+                One of the kinds of the header
+        channel : integer or string
+        value : float
+        duration : float
+        """
+
+        if isinstance(channel, str):
+            channel = self.channels.index(channel)
+        record = np.array([(time, self.kinds.index(kind), channel, value, duration)],
+                          dtype=EVENT_DTYPE)
+        self.write_records(record)
+
+
+    def write_records(self, records):
+        """Append several events at once (ndarray with dtype EVENT_DTYPE)"""
+
+        self.fh.write(np.asarray(records, dtype=EVENT_DTYPE).tobytes())
+        self.fh.flush()
+        self.n_events += len(records)
+
+
+    def close(self):
+        self.fh.close()
+
+
+    @property
+    def closed(self):
+        return self.fh.closed
+
+
+def read_events(filename):
+    """Read an event-file
+
+    Returns
+    -------
+    events : ndarray, dtype EVENT_DTYPE
+    header : dictionary
+            'kinds' and 'channels'
+    """
+
+    with open(filename, 'rb') as fh:
+        if fh.read(len(MAGIC)) != MAGIC:
+            raise IOError(f'{filename} is not an event-file')
+        version, = struct.unpack('<H', fh.read(2))
+        length, = struct.unpack('<I', fh.read(4))
+        header = json.loads(fh.read(length).decode())
+        content = fh.read()
+
+    n_events = len(content) // EVENT_DTYPE.itemsize
+    events = np.frombuffer(content[:n_events * EVENT_DTYPE.itemsize], dtype=EVENT_DTYPE)
+    return (events, header)
+
+
+if __name__ == '__main__':
+    # List the events of the recordings given on the command line
+    for in_file in sys.argv[1:]:
+        events, header = read_events(events_file(in_file))
+        print(f'{in_file}: {len(events)} events')
+        for event in events:
+            print(f'{event["time"]:14.3f}  {header["kinds"][event["kind"]]:12s} '
+                  f'{header["channels"][event["channel"]] if header["channels"] else "":25s} '
+                  f'{event["value"]:8.3f}  {event["duration"]:6.2f} s')
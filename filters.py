@@ -0,0 +1,304 @@
+"""
+Streaming filters for the live display, and for offline analysis
+
+Each filter processes blocks of samples, shape (n_samples, n_channels), and
+keeps its state between the calls. Filtering a recording in one call, or
+sample block by sample block as it arrives, gives the same result:
+
+    lp = lowpass(cutoff=5, rate=100, n_channels=3)
+    filtered = lp.process(new_data)
+
+Available filters:
+    - lowpass, highpass : 2nd order Butterworth (the highpass removes gravity)
+    - MovingRMS : root-mean-square over a sliding window
+    - Envelope : rectification, followed by a lowpass
+    - FilterChain : several filters in series
+
+The recursive (IIR) filters are evaluated block-wise: within a block of L
+samples, the output is a matrix product of the input with the (L x L)
+impulse-response matrix of the filter, plus the response to the filter state
+at the start of the block. This keeps the work in numpy, also for the short
+blocks of the live display.
+"""
+
+#   author: Thomas Haslwanter
+#   date:   Oct-2026
+
+import sys
+import time
+import numpy as np
+
+
+FILTER_TYPES = ['none', 'lowpass', 'highpass', 'rms', 'envelope']
+
+
+class Biquad():
+    """Stateful second-order IIR filter
+
+    y[k] = b0*x[k] + b1*x[k-1] + b2*x[k-2] - a1*y[k-1] - a2*y[k-2]
+    """
+
+    def __init__(self, b, a, n_channels, block_size=64):
+        """
+        Parameters
+        ----------
+        b : array, shape (3,)
+                Numerator coefficients
+        a : array, shape (3,)
+                Denominator coefficients (normalized to a[0]=1, if necessary)
+        n_channels : integer
+        block_size : integer
+                Size of the matrices used for the block-wise evaluation
+        """
+
+        b = np.asarray(b, dtype=float) / a[0]
+        a = np.asarray(a, dtype=float) / a[0]
+        self.b, self.a = b, a
+        self.n_channels = n_channels
+        self.block_size = block_size
+
+        # Response to the input, and to the four state-variables
+        # (x[-1], x[-2], y[-1], y[-2]), for one block
+        impulse = np.zeros(block_size)
+        impulse[0] = 1
+        h = self._simulate(impulse, np.zeros(4))
+        index = np.arange(block_size)
+        lag = index[:, np.newaxis] - index[np.newaxis, :]
+        self.H = np.where(lag >= 0, h[np.clip(lag, 0, None)], 0.)
+        self.S = np.column_stack([self._simulate(np.zeros(block_size), state)
+                                  for state in np.eye(4)])
+
+        self.reset()
+
+
+    def _simulate(self, x, state):
+        """Sample-by-sample evaluation (only used for the set-up)"""
+
+        b, a = self.b, self.a
+        x1, x2, y1, y2 = state
+        y = np.zeros(len(x))
+        for k in range(len(x)):
+            y[k] = b[0]*x[k] + b[1]*x1 + b[2]*x2 - a[1]*y1 - a[2]*y2
+            x2, x1 = x1, x[k]
+            y2, y1 = y1, y[k]
+        return y
+
+
+    def reset(self):
+        """Clear the filter state"""
+        self.state = np.zeros((4, self.n_channels))  # x[-1], x[-2], y[-1], y[-2]
+
+
+    def process(self, data):
+        """Filter a block of samples, shape (n_samples, n_channels)"""
+
+        data = np.asarray(data, dtype=float)
+        out = np.empty_like(data)
+        for start in range(0, len(data), self.block_size):
+            x = data[start:start + self.block_size]
+            n = len(x)
+            y = self.H[:n, :n] @ x + self.S[:n] @ self.state
+            out[start:start + n] = y
+
+            # New state
+            if n >= 2:
+                self.state = np.vstack((x[-1], x[-2], y[-1], y[-2]))
+            else:
+                self.state = np.vstack((x[-1], self.state[0], y[-1], self.state[2]))
+        return out
+
+
+def _butterworth(cutoff, rate):
+    """Intermediate values of the 2nd-order Butterworth-design (bilinear transform)"""
+
+    if not 0 < cutoff < rate / 2:
+        raise ValueError(f'Cutoff frequency {cutoff} Hz must be below {rate/2} Hz')
+    omega = 2 * np.pi * cutoff / rate
+    alpha = np.sin(omega) / np.sqrt(2)      # Q = 1/sqrt(2)
+    return np.cos(omega), alpha
+
+
+def lowpass(cutoff, rate, n_channels):
+    """2nd order Butterworth lowpass-filter
+
+    Parameters
+    ----------
+    cutoff : float
+            Cutoff frequency [Hz]
+    rate : float
+            Sample rate [Hz]
+    n_channels : integer
+
+    Returns
+    -------
+    filter : Biquad
+    """
+
+    cos_w, alpha = _butterworth(cutoff, rate)
+    b = np.array([(1 - cos_w) / 2, 1 - cos_w, (1 - cos_w) / 2])
+    a = np.array([1 + alpha, -2 * cos_w, 1 - alpha])
+    return Biquad(b, a, n_channels)
+
+
+def highpass(cutoff, rate, n_channels):
+    """2nd order Butterworth highpass-filter, e.g. to remove gravity
+
+    Parameters: see "lowpass"
+    """
+
+    cos_w, alpha = _butterworth(cutoff, rate)
+    b = np.array([(1 + cos_w) / 2, -(1 + cos_w), (1 + cos_w) / 2])
+    a = np.array([1 + alpha, -2 * cos_w, 1 - alpha])
+    return Biquad(b, a, n_channels)
+
+
+class MovingRMS():
+    """Root-mean-square over the last "window" samples"""
+
+    def __init__(self, window, n_channels, block_size=4096):
+        """
+        Parameters
+        ----------
+        window : integer
+                Number of samples
+        n_channels : integer
+        block_size : integer
+                Long inputs are processed in blocks of this size, to limit
+                the rounding errors of the cumulative sums
+        """
+
+        self.window = max(int(window), 1)
+        self.n_channels = n_channels
+        self.block_size = block_size
+        self.reset()
+
+
+    def reset(self):
+        # squares of the last (window-1) samples; zeros at the start
+        self.history = np.zeros((self.window - 1, self.n_channels))
+
+
+    def process(self, data):
+        data = np.asarray(data, dtype=float)
+        out = np.empty_like(data)
+        for start in range(0, len(data), self.block_size):
+            x = data[start:start + self.block_size]
+            squares = np.vstack((self.history, x**2))
+            cumsum = np.cumsum(np.vstack((np.zeros(self.n_channels), squares)), axis=0)
+            mean = (cumsum[self.window:] - cumsum[:-self.window]) / self.window
+            out[start:start + len(x)] = np.sqrt(np.maximum(mean, 0))
+            self.history = squares[len(squares) - (self.window - 1):]
+        return out
+
+
+class Envelope():
+    """Envelope: rectified signal, smoothed with a lowpass-filter"""
+
+    def __init__(self, cutoff, rate, n_channels):
+        self.lowpass = lowpass(cutoff, rate, n_channels)
+
+    def reset(self):
+        self.lowpass.reset()
+
+    def process(self, data):
+        return self.lowpass.process(np.abs(data))
+
+
+class FilterChain():
+    """Filters in series (an empty chain passes the data unchanged)"""
+
+    def __init__(self, stages=()):
+        self.stages = list(stages)
+
+    def reset(self):
+        for stage in self.stages:
+            stage.reset()
+
+    def process(self, data):
+        for stage in self.stages:
+            data = stage.process(data)
+        return data
+
+
+def make_filter(kind, rate, n_channels, cutoff=5., window=0.2):
+    """Create a filter by name
+
+    Parameters
+    ----------
+    kind : string
+            One of FILTER_TYPES
+    rate : float
+            Sample rate [Hz]
+    n_channels : integer
+    cutoff : float
+            Cutoff frequency [Hz] of 'lowpass', 'highpass', and 'envelope'
+    window : float
+            Window [s] of 'rms'
+
+    Returns
+    -------
+    filter : object with "process" and "reset"
+    """
+
+    if kind == 'none':
+        return FilterChain()
+    elif kind == 'lowpass':
+        return lowpass(cutoff, rate, n_channels)
+    elif kind == 'highpass':
+        return highpass(cutoff, rate, n_channels)
+    elif kind == 'rms':
+        return MovingRMS(round(window * rate), n_channels)
+    elif kind == 'envelope':
+        return Envelope(cutoff, rate, n_channels)
+    else:
+        raise ValueError(f'Do not know filter type {kind}')
+
+
+def from_settings(settings, n_channels):
+    """Filter as specified in "settings.yaml"
+
+    Uses the keys 'filter', 'filter_cutoff', 'filter_window', and 'sample_rate'
+    """
+
+    return make_filter(settings.get('filter', 'none'),
+                       rate=settings.get('sample_rate', 100.),
+                       n_channels=n_channels,
+                       cutoff=settings.get('filter_cutoff', 5.),
+                       window=settings.get('filter_window', 0.2))
+
+
+def benchmark(rate=400., n_channels=3, duration=60., batch_size=4):
+    """Processing time per sample, for live batches and for offline blocks"""
+
+    data = np.random.randn(int(duration * rate), n_channels)
+    for kind in FILTER_TYPES[1:]:
+        stage = make_filter(kind, rate, n_channels)
+
+        start = time.perf_counter()
+        for ii in range(0, len(data), batch_size):
+            stage.process(data[ii:ii + batch_size])
+        live = (time.perf_counter() - start) / len(data)
+
+        stage.reset()
+        start = time.perf_counter()
+        stage.process(data)
+        offline = (time.perf_counter() - start) / len(data)
+
+        print(f'{kind:10s}: live {1e6*live:5.2f} us/sample, offline {1e6*offline:5.2f} us/sample')
+
+
+if __name__ == '__main__':
+    # Filter a recording offline (written to "<recording>_filtered.txt"), or
+    # show the processing times
+    if len(sys.argv) > 2:
+        import loader
+        kind, in_file = sys.argv[1:3]
+        data, header = loader.load(in_file)
+        rate = 1 / np.median(np.diff(data[:, 0]))
+        filtered = make_filter(kind, rate, data.shape[1] - 1).process(data[:, 1:])
+        out_file = in_file + '_filtered.txt'
+        np.savetxt(out_file, np.column_stack((data[:, 0], filtered)), delimiter=',',
+                   header=', '.join(header['columns']), comments='')
+        print(f'Filtered data written to {out_file}')
+    else:
+        benchmark()
@@ -0,0 +1,366 @@
+"""
+Sensor fusion: orientation quaternions from accelerometer, gyroscope, and
+(optionally) magnetometer data
+
+For sensors without onboard fusion (e.g. the MetaWear-sensors used in
+Jansensor_Pruckner), two standard filters are available:
+
+    - Madgwick : gradient-descent correction of the gyroscope-integration
+    - Mahony : proportional-integral feedback of the gravity- (and field-)error
+
+Both keep their state between calls, so the same object can be fed with the
+batches of the live display, or with a complete recording:
+
+    fuse = Madgwick(rate=50, n_devices=2)
+    quats = fuse.process(acc, gyr)      # (n, 2, 3) -> (n, 2, 4)
+
+The update of each time-step depends on the previous one, so the samples are
+processed in a loop. The arithmetic of one step is written such that it works
+both on plain Python floats (the fastest way for a few devices, one after the
+other), and on numpy arrays with one element per device (for many devices:
+one loop for all of them).
+
+Units: acceleration in any unit (only the direction is used), angular velocity
+in [deg/s], magnetic field in any unit. The quaternions ([q0, qx, qy, qz])
+describe the orientation of the sensor with respect to the space-fixed frame,
+as in "orientation.py".
+"""
+
+#   author: Thomas Haslwanter
+#   date:   Oct-2026
+
+import sys
+import time
+import numpy as np
+
+
+DEG = np.pi / 180
+EPS = 1e-12     # avoids a division by zero for vanishing vectors
+MIN_VECTORIZED = 16     # from this number of devices on, they are processed as arrays
+METHODS = ['madgwick', 'mahony']
+
+
+class Fusion():
+    """Base class: handling of the state, and of the data-shapes"""
+
+    n_state = 4     # quaternion; the Mahony-filter adds the integral error
+
+    def __init__(self, rate, n_devices=1):
+        """
+        Parameters
+        ----------
+        rate : float
+                Sample rate [Hz]
+        n_devices : integer
+                Number of sensors that are processed together
+        """
+
+        self.rate = rate
+        self.dt = 1. / rate
+        self.n_devices = n_devices
+        self.reset()
+
+
+    def reset(self):
+        """Forget the orientation: the next sample starts a new estimation"""
+        self.state = None   # (n_state, n_devices)
+
+
+    @property
+    def quaternion(self):
+        """Current orientation, shape (n_devices, 4)"""
+        return None if self.state is None else self.state[:4].T.copy()
+
+
+    def _initial_state(self, acc):
+        """Orientation that aligns the first accelerometer-sample with gravity"""
+
+        a = acc / (np.linalg.norm(acc, axis=1, keepdims=True) + EPS)
+        # half-way quaternion between the measured gravity and the z-axis
+        q = np.column_stack((1 + a[:, 2], a[:, 1], -a[:, 0], np.zeros(len(a))))
+        upside_down = q[:, 0] < 1e-6
+        q[upside_down] = [0, 1, 0, 0]
+        q /= np.linalg.norm(q, axis=1, keepdims=True)
+
+        state = np.zeros((self.n_state, self.n_devices))
+        state[:4] = q.T
+        return state
+
+
+    def process(self, acc, gyr, mag=None):
+        """Orientation for each sample
+
+        Parameters
+        ----------
+        acc : ndarray, shape (n, 3), or (n, n_devices, 3)
+        gyr : ndarray, same shape as acc
+                [deg/s]
+        mag : ndarray, same shape as acc, or None
+
+        Returns
+        -------
+        quats : ndarray, shape (n, 4), or (n, n_devices, 4)
+        """
+
+        acc = np.asarray(acc, dtype=float)
+        shape = acc.shape
+        n = len(acc)
+        acc = acc.reshape((n, self.n_devices, 3))
+        gyr = np.asarray(gyr, dtype=float).reshape((n, self.n_devices, 3)) * DEG
+        if mag is not None:
+            mag = np.asarray(mag, dtype=float).reshape((n, self.n_devices, 3))
+
+        if n == 0:
+            return np.zeros(shape[:-1] + (4,))
+        if self.state is None:
+            self.state = self._initial_state(acc[0])
+
+        if self.n_devices < MIN_VECTORIZED:
+            # Python floats, one device after the other
+            quats = np.empty((n, self.n_devices, 4))
+            for device in range(self.n_devices):
+                state = self.state[:, device].tolist()
+                mags = mag[:, device].tolist() if mag is not None else [None] * n
+                device_quats = []
+                for a, g, m in zip(acc[:, device].tolist(), gyr[:, device].tolist(), mags):
+                    state = self._step(state, a, g, m)
+                    device_quats.append(state[:4])
+                self.state[:, device] = state
+                quats[:, device] = device_quats
+        else:
+            # numpy arrays, with one element per device
+            state = list(self.state)
+            quats = np.empty((n, 4, self.n_devices))
+            for ii in range(n):
+                m = mag[ii].T if mag is not None else None
+                state = self._step(state, acc[ii].T, gyr[ii].T, m)
+                quats[ii] = state[:4]
+            self.state = np.array(state)
+            quats = quats.transpose((0, 2, 1))
+
+        return quats.reshape(shape[:-1] + (4,))
+
+
+    def _step(self, state, acc, gyr, mag):
+        """One time-step; all arguments are sequences of components"""
+        raise NotImplementedError
+
+
+class Madgwick(Fusion):
+    """Madgwick's gradient-descent orientation filter
+
+    Madgwick S.O.H. et al. (2011): Estimation of IMU and MARG orientation
+    using a gradient descent algorithm. IEEE Int Conf Rehabil Robot.
+    """
+
+    def __init__(self, rate, beta=0.1, n_devices=1):
+        """
+        Parameters
+        ----------
+        rate : float
+                Sample rate [Hz]
+        beta : float
+                Gain of the correction [rad/s]
+        n_devices : integer
+        """
+
+        self.beta = beta
+        super().__init__(rate, n_devices)
+
+
+    def _step(self, state, acc, gyr, mag):
+        q0, q1, q2, q3 = state
+        ax, ay, az = acc
+        gx, gy, gz = gyr
+
+        # Rate of change from the gyroscope
+        dq0 = 0.5 * (-q1*gx - q2*gy - q3*gz)
+        dq1 = 0.5 * (q0*gx + q2*gz - q3*gy)
+        dq2 = 0.5 * (q0*gy - q1*gz + q3*gx)
+        dq3 = 0.5 * (q0*gz + q1*gy - q2*gx)
+
+        # Gradient of the gravity-error: J_g^T * f_g
+        norm = (ax*ax + ay*ay + az*az + EPS) ** -0.5
+        ax, ay, az = ax*norm, ay*norm, az*norm
+        fx = 2*(q1*q3 - q0*q2) - ax
+        fy = 2*(q0*q1 + q2*q3) - ay
+        fz = 1 - 2*(q1*q1 + q2*q2) - az
+        s0 = -2*q2*fx + 2*q1*fy
+        s1 = 2*q3*fx + 2*q0*fy - 4*q1*fz
+        s2 = -2*q0*fx + 2*q3*fy - 4*q2*fz
+        s3 = 2*q1*fx + 2*q2*fy
+
+        if mag is not None:
+            # Gradient of the field-error: J_b^T * f_b, with the reference
+            # field b = (bx, 0, bz) from the current estimate
+            mx, my, mz = mag
+            norm = (mx*mx + my*my + mz*mz + EPS) ** -0.5
+            mx, my, mz = mx*norm, my*norm, mz*norm
+            hx = 2*(mx*(0.5 - q2*q2 - q3*q3) + my*(q1*q2 - q0*q3) + mz*(q1*q3 + q0*q2))
+            hy = 2*(mx*(q1*q2 + q0*q3) + my*(0.5 - q1*q1 - q3*q3) + mz*(q2*q3 - q0*q1))
+            bx = (hx*hx + hy*hy) ** 0.5
+            bz = 2*(mx*(q1*q3 - q0*q2) + my*(q2*q3 + q0*q1) + mz*(0.5 - q1*q1 - q2*q2))
+
+            fx = 2*bx*(0.5 - q2*q2 - q3*q3) + 2*bz*(q1*q3 - q0*q2) - mx
+            fy = 2*bx*(q1*q2 - q0*q3) + 2*bz*(q0*q1 + q2*q3) - my
+            fz = 2*bx*(q0*q2 + q1*q3) + 2*bz*(0.5 - q1*q1 - q2*q2) - mz
+            s0 = s0 - 2*bz*q2*fx + (-2*bx*q3 + 2*bz*q1)*fy + 2*bx*q2*fz
+            s1 = s1 + 2*bz*q3*fx + (2*bx*q2 + 2*bz*q0)*fy + (2*bx*q3 - 4*bz*q1)*fz
+            s2 = s2 + (-4*bx*q2 - 2*bz*q0)*fx + (2*bx*q1 + 2*bz*q3)*fy + (2*bx*q0 - 4*bz*q2)*fz
+            s3 = s3 + (-4*bx*q3 + 2*bz*q1)*fx + (-2*bx*q0 + 2*bz*q2)*fy + 2*bx*q1*fz
+
+        norm = self.beta * (s0*s0 + s1*s1 + s2*s2 + s3*s3 + EPS) ** -0.5
+        dt = self.dt
+        q0 = q0 + (dq0 - norm*s0) * dt
+        q1 = q1 + (dq1 - norm*s1) * dt
+        q2 = q2 + (dq2 - norm*s2) * dt
+        q3 = q3 + (dq3 - norm*s3) * dt
+
+        norm = (q0*q0 + q1*q1 + q2*q2 + q3*q3) ** -0.5
+        return [q0*norm, q1*norm, q2*norm, q3*norm]
+
+
+class Mahony(Fusion):
+    """Mahony's complementary filter, with proportional and integral feedback
+
+    Mahony R. et al. (2008): Nonlinear complementary filters on the special
+    orthogonal group. IEEE Trans Automat Contr 53(5).
+    """
+
+    n_state = 7     # quaternion, and integral of the error
+
+    def __init__(self, rate, kp=1., ki=0.3, n_devices=1):
+        """
+        Parameters
+        ----------
+        rate : float
+                Sample rate [Hz]
+        kp : float
+                Proportional gain
+        ki : float
+                Integral gain (compensates gyroscope-offsets)
+        n_devices : integer
+        """
+
+        self.kp = kp
+        self.ki = ki
+        super().__init__(rate, n_devices)
+
+
+    def _step(self, state, acc, gyr, mag):
+        q0, q1, q2, q3, ix, iy, iz = state
+        ax, ay, az = acc
+        gx, gy, gz = gyr
+
+        # Error between measured and estimated gravity (cross-product)
+        norm = (ax*ax + ay*ay + az*az + EPS) ** -0.5
+        ax, ay, az = ax*norm, ay*norm, az*norm
+        vx = 2*(q1*q3 - q0*q2)
+        vy = 2*(q0*q1 + q2*q3)
+        vz = 1 - 2*(q1*q1 + q2*q2)
+        ex = ay*vz - az*vy
+        ey = az*vx - ax*vz
+        ez = ax*vy - ay*vx
+
+        if mag is not None:
+            # Error between measured and estimated field direction
+            mx, my, mz = mag
+            norm = (mx*mx + my*my + mz*mz + EPS) ** -0.5
+            mx, my, mz = mx*norm, my*norm, mz*norm
+            hx = 2*(mx*(0.5 - q2*q2 - q3*q3) + my*(q1*q2 - q0*q3) + mz*(q1*q3 + q0*q2))
+            hy = 2*(mx*(q1*q2 + q0*q3) + my*(0.5 - q1*q1 - q3*q3) + mz*(q2*q3 - q0*q1))
+            bx = (hx*hx + hy*hy) ** 0.5
+            bz = 2*(mx*(q1*q3 - q0*q2) + my*(q2*q3 + q0*q1) + mz*(0.5 - q1*q1 - q2*q2))
+            wx = 2*bx*(0.5 - q2*q2 - q3*q3) + 2*bz*(q1*q3 - q0*q2)
+            wy = 2*bx*(q1*q2 - q0*q3) + 2*bz*(q0*q1 + q2*q3)
+            wz = 2*bx*(q0*q2 + q1*q3) + 2*bz*(0.5 - q1*q1 - q2*q2)
+            ex = ex + my*wz - mz*wy
+            ey = ey + mz*wx - mx*wz
+            ez = ez + mx*wy - my*wx
+
+        # PI-feedback
+        dt = self.dt
+        ix = ix + self.ki * ex * dt
+        iy = iy + self.ki * ey * dt
+        iz = iz + self.ki * ez * dt
+        gx = gx + self.kp * ex + ix
+        gy = gy + self.kp * ey + iy
+        gz = gz + self.kp * ez + iz
+
+        # Integration of the corrected angular velocity
+        q0, q1, q2, q3 = (q0 + 0.5*dt*(-q1*gx - q2*gy - q3*gz),
+                          q1 + 0.5*dt*(q0*gx + q2*gz - q3*gy),
+                          q2 + 0.5*dt*(q0*gy - q1*gz + q3*gx),
+                          q3 + 0.5*dt*(q0*gz + q1*gy - q2*gx))
+
+        norm = (q0*q0 + q1*q1 + q2*q2 + q3*q3) ** -0.5
+        return [q0*norm, q1*norm, q2*norm, q3*norm, ix, iy, iz]
+
+
+def make_fusion(method, rate, n_devices=1, **kwargs):
+    """Create a fusion-filter by name ('madgwick' or 'mahony')"""
+
+    if method == 'madgwick':
+        return Madgwick(rate, n_devices=n_devices, **kwargs)
+    elif method == 'mahony':
+        return Mahony(rate, n_devices=n_devices, **kwargs)
+    else:
+        raise ValueError(f'Do not know fusion method {method}')
+
+
+def fuse(acc, gyr, rate, mag=None, method='madgwick', **kwargs):
+    """Offline: orientation for a complete recording
+
+    Parameters
+    ----------
+    acc : ndarray, shape (n, 3), or (n, n_devices, 3)
+    gyr : ndarray, same shape as acc
+            [deg/s]
+    rate : float
+            Sample rate [Hz]
+    mag : ndarray, same shape as acc, or None
+    method : string
+            One of METHODS
+    kwargs : gains of the filter
+
+    Returns
+    -------
+    quats : ndarray, shape (n, 4), or (n, n_devices, 4)
+    """
+
+    n_devices = 1 if np.ndim(acc) == 2 else np.shape(acc)[1]
+    return make_fusion(method, rate, n_devices, **kwargs).process(acc, gyr, mag)
+
+
+def benchmark(rate=100., duration=60., device_numbers=(1, 4, 16)):
+    """Processing time per sample and device"""
+
+    n = int(duration * rate)
+    for method in METHODS:
+        for n_devices in device_numbers:
+            acc = np.random.randn(n, n_devices, 3) * 0.05 + [0, 0, 1]
+            gyr = np.random.randn(n, n_devices, 3)
+            fusion = make_fusion(method, rate, n_devices)
+            start = time.perf_counter()
+            fusion.process(acc, gyr)
+            elapsed = (time.perf_counter() - start) / (n * n_devices)
+            print(f'{method:9s}, {n_devices:2d} device(s): {1e6*elapsed:5.2f} us/sample')
+
+
+if __name__ == '__main__':
+    # Orientation of a recording (written to "<recording>_quat.txt"), or the processing times
+    if len(sys.argv) > 1:
+        import loader
+        data, header = loader.load(sys.argv[1])
+        columns = header['columns']
+        gyr = data[:, columns.index('Gyroscope X (deg/s)'):][:, :3]
+        acc = data[:, columns.index('Accelerometer X (g)'):][:, :3]
+        rate = 1 / np.median(np.diff(data[:, 0]))
+        method = sys.argv[2] if len(sys.argv) > 2 else 'madgwick'
+        quats = fuse(acc, gyr, rate, method=method)
+        out_file = sys.argv[1] + '_quat.txt'
+        np.savetxt(out_file, np.column_stack((data[:, 0], quats)), delimiter=',',
+                   header='Time (s), Quat 0, Quat X, Quat Y, Quat Z', comments='')
+        print(f'Orientation written to {out_file}')
+    else:
+        benchmark()
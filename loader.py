@@ -0,0 +1,181 @@
+"""
+Fast loading of Jansenberger recordings
+
+Handles both the text-format (".dat": "Subject:", "Experimentor:", and "Date:"
+lines, the column names, and comma-separated rows), and the binary recordings
+of "recording.py".
+
+The numbers of a text-recording are parsed in chunks, and the result is cached
+in a sidecar-file "<recording>.npy", together with the header-information in
+"<recording>.json". When the recording is opened again, the cached array is
+memory-mapped - as long as size and modification time of the recording still
+match the values stored in the ".json"-file.
+"""
+
+#   author: Thomas Haslwanter
+#   date:   Oct-2026
+
+import os
+import sys
+import json
+import time
+import warnings
+import numpy as np
+
+import recording
+
+
+CHUNK_SIZE = 2**24      # bytes parsed at once
+
+
+def read_dat_header(filename):
+    """Parse the header of a text-recording
+
+    Returns
+    -------
+    header : dictionary
+            The "Key: value"-lines (with lower-case keys, e.g. "subject"),
+            "columns" (list of the column names), and "_data_offset" (position
+            of the first data-row)
+    """
+
+    header = {}
+    with open(filename, 'rb') as fh:
+        while True:
+            line = fh.readline()
+            if not line:
+                raise IOError(f'{filename} has no data-header')
+            text = line.decode('utf-8', errors='replace').strip()
+
+            key, sep, value = text.partition(':')
+            if sep and ',' not in key:
+                header[key.lower()] = value.strip()
+            else:
+                # The last header-line contains the column names
+                header['columns'] = [name.strip() for name in text.split(',')]
+                header['_data_offset'] = fh.tell()
+                return header
+
+
+def parse_rows(fh, n_columns, chunk_size=CHUNK_SIZE):
+    """Parse comma-separated rows, in chunks
+
+    An incomplete last line (e.g. from an interrupted recording) is ignored.
+
+    Parameters
+    ----------
+    fh : file-handle
+            Opened in binary mode, and positioned at the first data-row
+    n_columns : integer
+    chunk_size : integer
+            Number of bytes parsed at once
+
+    Returns
+    -------
+    data : ndarray, shape (n_rows, n_columns)
+    """
+
+    chunks = []
+    rest = b''
+    while True:
+        block = fh.read(chunk_size)
+        if not block:
+            break
+        block = rest + block
+        end = block.rfind(b'\n') + 1
+        rest = block[end:]
+        if end > 0:
+            chunks.append(_parse_chunk(block[:end], n_columns))
+
+    if len(chunks) == 0:
+        return np.zeros((0, n_columns))
+    return np.vstack(chunks)
+
+
+def _parse_chunk(text, n_columns):
+    """Convert complete text-lines into an array"""
+
+    lines = text.count(b'\n')
+    flat = text.replace(b'\r', b'').replace(b'\n', b',').strip(b',')
+    # Depending on the numpy-version, unparsable text gives a warning or an error
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            values = np.fromstring(flat, sep=',')
+    except ValueError:
+        values = np.zeros(0)
+
+    if values.size != lines * n_columns:
+        # Irregular content: let the slower, but stricter parser deal with it
+        values = np.loadtxt(text.decode().splitlines(), delimiter=',', ndmin=2)
+    return values.reshape((-1, n_columns))
+
+
+def _cache_files(filename):
+    """Names of the sidecar-files"""
+    return (filename + '.npy', filename + '.json')
+
+
+def load(filename, use_cache=True):
+    """Load a Jansenberger recording
+
+    Parameters
+    ----------
+    filename : string
+            Text- (".dat") or binary (".jrec") recording
+    use_cache : boolean
+            Use/create the ".npy"-cache for text-recordings
+
+    Returns
+    -------
+    data : ndarray, shape (n_rows, n_columns)
+            For cached and for uncompressed binary recordings, this is
+            memory-mapped.
+    header : dictionary
+            subject, experimentor, date, columns, ...
+    """
+
+    with open(filename, 'rb') as fh:
+        is_binary = fh.read(len(recording.MAGIC)) == recording.MAGIC
+    if is_binary:
+        return recording.read_recording(filename)
+
+    stat = os.stat(filename)
+    cache_file, meta_file = _cache_files(filename)
+
+    if use_cache:
+        try:
+            with open(meta_file, 'r') as fh:
+                meta = json.load(fh)
+            if meta['size'] == stat.st_size and meta['mtime'] == stat.st_mtime_ns:
+                return (np.load(cache_file, mmap_mode='r'), meta['header'])
+        except (OSError, ValueError, KeyError):
+            pass
+
+    header = read_dat_header(filename)
+    with open(filename, 'rb') as fh:
+        fh.seek(header['_data_offset'])
+        data = parse_rows(fh, len(header['columns']))
+
+    if use_cache:
+        # Write to temporary files first, so that an interrupted write never
+        # leaves a valid-looking cache
+        try:
+            np.save(cache_file + '.tmp.npy', data)
+            os.replace(cache_file + '.tmp.npy', cache_file)
+            with open(meta_file + '.tmp', 'w') as fh:
+                json.dump({'size': stat.st_size, 'mtime': stat.st_mtime_ns,
+                           'header': header}, fh)
+            os.replace(meta_file + '.tmp', meta_file)
+        except OSError as error:
+            print(f'Could not cache {filename}: {error}')
+
+    return (data, header)
+
+
+if __name__ == '__main__':
+    # Load the recordings given on the command line, and show the loading times
+    for in_file in sys.argv[1:]:
+        start = time.perf_counter()
+        data, header = load(in_file)
+        print(f'{in_file}: {data.shape} in {1000*(time.perf_counter() - start):.1f} ms')
@@ -0,0 +1,160 @@
+"""
+Adapter for the samples of MetaWear-sensors (via "pymetawear")
+
+The notifications of pymetawear deliver each sample as a dictionary
+{'epoch': <time [ms]>, 'value': <CartesianFloat with x, y, z>}. "read_sample"
+copies these values directly into a preallocated row, without converting them
+to text and back.
+
+For testing and benchmarking without hardware, "FakeMetaWearClient" mimics
+the parts of "pymetawear.client.MetaWearClient" used by Jansensor_Pruckner.
+"""
+
+#   author: Thomas Haslwanter
+#   date:   Oct-2026
+
+import re
+import sys
+import time
+import threading
+import numpy as np
+
+
+def read_sample(data, row):
+    """Copy one MetaWear-sample into a row
+
+    Parameters
+    ----------
+    data : dictionary
+            Sample from a pymetawear-notification
+    row : ndarray, shape (4,)
+            Filled with epoch [s], x, y, z
+
+    Returns
+    -------
+    row : ndarray, shape (4,)
+    """
+
+    value = data['value']
+    row[0] = data['epoch'] / 1000
+    row[1] = value.x
+    row[2] = value.y
+    row[3] = value.z
+    return row
+
+
+def parse_text(data):
+    """Previous method: parse the text-representation of a sample (for comparison)"""
+
+    values = re.split('[:,}]', str(data))
+    return (float(values[4]), float(values[6]), float(values[8]))
+
+
+class CartesianFloat():
+    """Same fields and text-representation as mbientlab's CartesianFloat"""
+
+    __slots__ = ('x', 'y', 'z')
+
+    def __init__(self, x, y, z):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def __repr__(self):
+        return f'{{x : {self.x:.3f}, y : {self.y:.3f}, z : {self.z:.3f}}}'
+
+
+class FakeModule():
+    """Simulated accelerometer or gyroscope: sine-waves plus noise"""
+
+    def __init__(self, amplitude=1.):
+        self.amplitude = amplitude
+        self.data_rate = 25.
+        self.data_range = None
+        self.high_frequency_stream = False
+        self.callback = None
+        self.thread = None
+        self.t0 = time.time()
+        self.rng = np.random.default_rng()
+
+
+    def set_settings(self, data_rate=None, data_range=None):
+        if data_rate is not None:
+            self.data_rate = data_rate
+        if data_range is not None:
+            self.data_range = data_range
+
+
+    def notifications(self, callback=None):
+        """Start (or with "None", stop) the stream of samples"""
+
+        self.callback = callback
+        if callback is not None and self.thread is None:
+            self.t0 = time.time()
+            self.thread = threading.Thread(target=self._stream, daemon=True)
+            self.thread.start()
+
+
+    def sample(self, t):
+        """One sample at the time t [s], in the pymetawear-format"""
+
+        values = self.amplitude * (np.sin(2 * np.pi * np.array([0.5, 0.7, 0.3]) * t) +
+                                   0.02 * self.rng.standard_normal(3))
+        return {'epoch': int(1000 * t), 'value': CartesianFloat(*values.tolist())}
+
+
+    def _stream(self):
+        """Like the BLE-notifications: call the callback from a separate thread"""
+
+        n_samples = 0
+        while self.callback is not None:
+            t = self.t0 + n_samples / self.data_rate
+            delay = t - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            callback = self.callback
+            if callback is not None:
+                callback(self.sample(t))
+            n_samples += 1
+        self.thread = None
+
+
+class FakeMetaWearClient():
+    """Replacement for "pymetawear.client.MetaWearClient", without hardware"""
+
+    def __init__(self, address='00:00:00:00:00:00', debug=False):
+        self.address = address
+        self.accelerometer = FakeModule(amplitude=1.)
+        self.gyroscope = FakeModule(amplitude=100.)
+
+
+    def disconnect(self):
+        self.accelerometer.notifications(None)
+        self.gyroscope.notifications(None)
+
+
+def benchmark(n_samples=100000):
+    """Time per sample [us] for text-parsing and for "read_sample" """
+
+    module = FakeModule()
+    samples = [module.sample(ii / 50) for ii in range(n_samples)]
+    row = np.empty(4)
+
+    start = time.perf_counter()
+    for data in samples:
+        parse_text(data)
+    t_text = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for data in samples:
+        read_sample(data, row)
+    t_direct = time.perf_counter() - start
+
+    return (1e6 * t_text / n_samples, 1e6 * t_direct / n_samples)
+
+
+if __name__ == '__main__':
+    n_samples = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    t_text, t_direct = benchmark(n_samples)
+    print(f'str + regex: {t_text:.2f} us/sample')
+    print(f'read_sample: {t_direct:.2f} us/sample')
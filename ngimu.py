@@ -9,6 +9,9 @@ Questions:
 
 To be done:
     - interaction with multiple sensors
+
+The decoding of the OSC-packets is also available without a "Sensor", through
+the module-function "decode".
 """
 
 # author:   Thomas Haslwanter & Seb Madgewick
@@ -20,6 +23,102 @@ import math
 import struct
 
 
+def decode(data):
+    """Decode an OSC-packet from the NGIMU
+
+    Parameters
+    ----------
+    data : bytes
+            Bundle (possibly with nested bundles), or single message
+
+    Returns
+    -------
+    messages : list
+            Each message is a list [timestamp, address, value, value, ...].
+            The timestamp is the timetag of the enclosing bundle [s since
+            1900], or -1 for messages outside a bundle.
+    """
+
+    messages = []
+    _decode_packet(data, -1, messages)
+    return messages
+
+
+def _decode_packet(data, timestamp, messages):
+    """Decode a bundle or message, and append the messages to "messages" """
+
+    if data[0] == 35:  # if packet is a bundle ("#" = ASCII 35)
+        timetag, contents = _decode_bundle(data)
+        # convert to seconds since January 1, 1900.
+        timestamp = timetag / pow(2, 32)
+        for content in contents:
+            _decode_packet(content, timestamp, messages)  # call recursively
+
+    if data[0] == 47:  # if packet is a message ("/" = ASCII 47)
+        message = _decode_message(data)
+        message[0] = timestamp
+        messages.append(message)
+
+
+def _decode_bundle(data):
+    """Split a bundle into its timetag and its elements"""
+
+    timetag = int.from_bytes(data[8:16], byteorder='big')  # timetag is uint64 starting at index 8
+    contents = []
+    offset = 16     # all remaining bytes are contiguous bundle elements
+    while offset < len(data):
+        size = int.from_bytes(data[offset:offset+4], byteorder='big')  # element size is uint32
+        contents.append(data[offset+4:offset+4+size])  # followed by "size" bytes of OSC contents
+        offset += 4 + size
+    return timetag, contents
+
+
+def _padded(length):
+    """Length of an OSC-element, including the trailing "\0" characters"""
+    return 4 * math.ceil(length / 4)
+
+
+def _decode_message(data):
+    """Convert an OSC-message into [-1, address, values...]"""
+
+    end = data.index(0)
+    message = [-1, data[0:end].decode("utf-8")]  # timestamp = -1, get address as string up to "\0"
+    start = data.index(44, end)  # type tags and arguments start at ","
+    end = data.index(0, start)   # type tags end at "\0"
+    type_tags = data[start+1:end].decode("utf-8")
+    offset = start + _padded(end + 1 - start)
+
+    # The sensor-data contain only floats: convert them all at once
+    if type_tags == 'f' * len(type_tags):
+        message.extend(struct.unpack_from(f'>{len(type_tags)}f', data, offset))
+        return message
+
+    for type_tag in type_tags:
+        if type_tag == "i":  # argument is uint32
+            message.append(int.from_bytes(data[offset:offset+4], byteorder='big'))
+            offset += 4
+        elif type_tag == "f":  # argument is float
+            message.append(struct.unpack_from('>f', data, offset)[0])
+            offset += 4
+        elif type_tag == "s" or type_tag == "S":  # argument is string
+            end = data.index(0, offset)
+            message.append(data[offset:end].decode("utf-8"))
+            offset += _padded(end + 1 - offset)  # account for trailing "\0" characters
+        elif type_tag == "b":  # argument is blob
+            size = int.from_bytes(data[offset:offset+4], byteorder='big')
+            message.append(data[offset+4:offset+4+size])
+            offset += 4 + _padded(size)  # account for trailing "\0" characters
+        elif type_tag == "T":  # argument is True
+            message.append(True)
+        elif type_tag == "F":  # argument is False
+            message.append(False)
+        else:
+            print("Argument type not supported.", type_tag)
+            break
+
+    return message
+
+
 class Sensor():
     """Routines to interact with an NGIMU-sensor (from XIO technologies)"""
 
@@ -71,6 +170,10 @@ class Sensor():
         self.packetsize = 2048 
         self.messages = []
 
+        # Timetag [s] of the last bundle, and time [s] required for decoding it
+        self.timetag = -1
+        self.decode_time = 0.
+
         # Message to identify NGIMU:
         identify = "/wifi/send/ip\0\0,\0\0\00.0.0.0\0".encode()
         if debug_flag:
@@ -166,7 +269,9 @@ class Sensor():
             else:
                 self.messages = []
                 received = True
+                start = time.perf_counter()
                 self._process_packet(UDP_data)
+                self.decode_time = time.perf_counter() - start
                 
                 # from '/sensors'
                 if selection[:3] == 'dat':
@@ -193,92 +298,21 @@ class Sensor():
         return data
 
 
-    def _process_packet(self, data, timestamp=-1):
-        """Converts the hexadecimal sensor-message into sensor/quaternion signals.
-        Used by "get_data".
-        - First splits the overall (binary) message (="bundle") into two separate
-            bundles (signals & quaternions), using "_process_bundle"
-        - Then converts each of these two (binary) bundles into messages,
-          again using "_process_bundle"
-        - And finally takes these ASCII strings (="message"), and groups them into
-          messages (with "_process_message") with timestamps
+    def _process_packet(self, data):
+        """Converts the binary sensor-message into sensor/quaternion signals,
+        and appends them to "self.messages". Used by "get_data".
 
         Parameters
         ----------
-        data : str
-            binary or ASCII string, containing the NGIMU-message
+        data : bytes
+            binary string, containing the NGIMU-message (see "decode")
 
         """
 
-        if data[0] == 35:  # if packet is a bundle ("#" = ASCII 35)
-            timetag, contents = self._process_bundle(data)
-            # convert to seconds since January 1, 1900.
-            # See https://en.wikipedia.org/wiki/Network_Time_Protocol#Timestamps
-            timestamp = timetag / pow(2, 32) 
-
-            for content in contents:
-                self._process_packet(content, timestamp)  # call recursively
-
-        if data[0] == 47:  # if packet is a message ("#" = ASCII 47)
-            message = self._process_message(data)
-            if timestamp != -1:
-                message[0] = timestamp
-            self.messages.append(message)
-
-        return
-
-
-    def _process_bundle(self, data):
-        """Processes hexadecimal data from the NGIMU"""
-        
-        timetag = int.from_bytes(data[8:16], byteorder='big')  # timetag is uint64 starting at index 8
-        elements = data[16:]  # all remaining bytes are contiguous bundle elements
-        contents = []
-        while len(elements) > 0:
-            size = int.from_bytes(elements[0:4], byteorder='big')  # element size is uint32 starting at index 0
-            contents.append(elements[4: (size + 4)])  # follow size number of bytes are OSC contents
-            elements = elements[(size + 4):]  # skip to next element
-        return timetag, contents
-
-
-    def _process_message(self, data):
-        """Groups ASCII-strings into corresponding values"""
-        
-        message = [-1, data[0:data.index(0)].decode("utf-8")]  # timestamp = -1, get address as string up to "\0"
-        remaining = data[data.index(44):]  # type tags and arguments start at ","
-        type_tags = remaining[0:(remaining.index(0) + 1)].decode("utf-8")  # type tags end at "\0"
-        arguments = remaining[(4 * math.ceil(len(type_tags) / 4)):]  # account for trailing "\0" characters
-        
-        for type_tag in type_tags:
-            if type_tag == ",":  # first character of type tag string
-                continue
-            elif type_tag == "i":  # argument is uint32
-                message.append(int.from_bytes(arguments[0:4], byteorder='big'))
-                arguments = arguments[4:]
-            elif type_tag == "f":  # argument is float
-                float_bytes = bytearray(arguments[0:4])
-                float_bytes.reverse()
-                message.append(struct.unpack('f', float_bytes)[0])
-                arguments = arguments[4:]
-            elif type_tag == "\x00":  # last character of type tag string
-                continue
-            elif type_tag == "s" or type_tag == "S":  # argument is string
-                message.append(arguments[0:arguments.index(0)].decode("utf-8"))
-                # account for trailing "\0" characters
-                arguments = arguments[(4 * math.ceil((len(message[-1]) + 1) / 4)):] 
-            elif type_tag == "b":  # argument is blob
-                size = int.from_bytes(arguments[0:4], byteorder='big')
-                message.append(arguments[4:(4 + size)])
-                arguments = arguments[4 + (4 * math.ceil(size / 4)):]  # account for trailing "\0" characters
-            elif type_tag == "T":  # argument is True
-                message.append(True)
-            elif type_tag == "F":  # argument is False
-                message.append(False)
-            else:
-                print("Argument type not supported.", type_tag)
-                break
-            
-        return message
+        messages = decode(data)
+        if data[0] == 35 and len(messages) > 0:  # bundle
+            self.timetag = messages[-1][0]
+        self.messages.extend(messages)
 
         
 if __name__ == '__main__':
@@ -0,0 +1,225 @@
+"""
+Vectorized conversions of orientation quaternions
+
+All functions work on blocks of quaternions, shape (n, 4), with the scalar
+part first ([q0, qx, qy, qz], as delivered by the NGIMU); a single quaternion,
+shape (4,), is treated as a block of one. Angles are in degrees.
+
+    - to_rotmat : rotation matrices
+    - to_euler : Cardan angles ('nautical'/'Fick', 'Helmholtz') or Euler angles
+    - to_helical : angle and axis of the helical (single-axis) rotation
+    - relative : orientation of one sensor relative to another, e.g. a joint
+    - slerp : spherical linear interpolation between orientations
+
+Example:
+    quats = data[:, 11:15]
+    joint = relative(quats[0], quats)           # relative to the start
+    heading, pitch, roll = to_euler(joint).T
+"""
+
+#   author: Thomas Haslwanter
+#   date:   Oct-2026
+
+import sys
+import time
+import numpy as np
+
+
+SEQUENCES = ['nautical', 'Fick', 'Helmholtz', 'Euler']
+
+
+def _as_block(q):
+    """Quaternions as float-array, shape (n, 4)"""
+    return np.atleast_2d(np.asarray(q, dtype=float))
+
+
+def normalize(q):
+    """Unit quaternions"""
+    q = _as_block(q)
+    return q / np.linalg.norm(q, axis=1, keepdims=True)
+
+
+def conjugate(q):
+    """Inverse of unit quaternions"""
+    return _as_block(q) * np.array([1., -1., -1., -1.])
+
+
+def multiply(p, q):
+    """Quaternion product p * q (p or q can also be a single quaternion)"""
+
+    p, q = _as_block(p), _as_block(q)
+    p0, p1, p2, p3 = p.T
+    q0, q1, q2, q3 = q.T
+    return np.column_stack((p0*q0 - p1*q1 - p2*q2 - p3*q3,
+                            p0*q1 + p1*q0 + p2*q3 - p3*q2,
+                            p0*q2 - p1*q3 + p2*q0 + p3*q1,
+                            p0*q3 + p1*q2 - p2*q1 + p3*q0))
+
+
+def relative(q_ref, q):
+    """Orientation of "q" relative to "q_ref"
+
+    Parameters
+    ----------
+    q_ref : ndarray, shape (4,) or (n, 4)
+            Reference orientation, e.g. of the proximal segment of a joint, or
+            of a resting position
+    q : ndarray, shape (n, 4)
+            Orientation, e.g. of the distal segment
+
+    Returns
+    -------
+    q_rel : ndarray, shape (n, 4)
+            q_ref^-1 * q; for two sensors on either side of a joint, the
+            joint orientation
+    """
+
+    return multiply(conjugate(q_ref), q)
+
+
+def slerp(q_start, q_stop, fraction):
+    """Spherical linear interpolation
+
+    Parameters
+    ----------
+    q_start, q_stop : ndarray, shape (n, 4)
+            Orientations at the start and at the end of the intervals
+    fraction : ndarray, shape (n,)
+            Position in the interval (0 ... 1)
+
+    Returns
+    -------
+    q : ndarray, shape (n, 4)
+            Interpolated unit quaternions, along the shortest rotation
+    """
+
+    q_start, q_stop = normalize(q_start), normalize(q_stop)
+    fraction = np.asarray(fraction, dtype=float)[:, np.newaxis]
+
+    # q and -q are the same orientation: take the shorter way
+    dot = np.sum(q_start * q_stop, axis=1, keepdims=True)
+    q_stop = np.where(dot < 0, -q_stop, q_stop)
+    theta = np.arccos(np.clip(np.abs(dot), 0, 1))
+    sin_theta = np.sin(theta)
+
+    # For (almost) identical orientations, linear interpolation is exact enough
+    small = sin_theta < 1e-6
+    safe = np.where(small, 1., sin_theta)
+    w_start = np.where(small, 1 - fraction, np.sin((1 - fraction) * theta) / safe)
+    w_stop = np.where(small, fraction, np.sin(fraction * theta) / safe)
+    return normalize(w_start * q_start + w_stop * q_stop)
+
+
+def from_axis_angle(axis, angle):
+    """Quaternions for rotations about "axis" (shape (3,) or (n, 3)) by "angle" [deg]"""
+
+    axis = np.atleast_2d(np.asarray(axis, dtype=float))
+    axis = axis / np.linalg.norm(axis, axis=1, keepdims=True)
+    half = np.deg2rad(np.atleast_1d(angle))[:, np.newaxis] / 2
+    return np.column_stack((np.cos(half), np.sin(half) * axis))
+
+
+def to_rotmat(q):
+    """Rotation matrices, shape (n, 3, 3)"""
+
+    q0, q1, q2, q3 = normalize(q).T
+    R = np.empty((len(q0), 3, 3))
+    R[:, 0, 0] = 1 - 2*(q2**2 + q3**2)
+    R[:, 0, 1] = 2*(q1*q2 - q0*q3)
+    R[:, 0, 2] = 2*(q1*q3 + q0*q2)
+    R[:, 1, 0] = 2*(q1*q2 + q0*q3)
+    R[:, 1, 1] = 1 - 2*(q1**2 + q3**2)
+    R[:, 1, 2] = 2*(q2*q3 - q0*q1)
+    R[:, 2, 0] = 2*(q1*q3 - q0*q2)
+    R[:, 2, 1] = 2*(q2*q3 + q0*q1)
+    R[:, 2, 2] = 1 - 2*(q1**2 + q2**2)
+    return R
+
+
+def to_euler(q, sequence='nautical'):
+    """Cardan- or Euler-angles
+
+    Parameters
+    ----------
+    q : ndarray, shape (n, 4)
+    sequence : string
+            One of SEQUENCES:
+            * 'nautical' or 'Fick': R = Rz(theta) * Ry(phi) * Rx(psi)
+            * 'Helmholtz': R = Ry(phi) * Rz(theta) * Rx(psi)
+            * 'Euler': R = Rz(alpha) * Rx(beta) * Rz(gamma)
+
+    Returns
+    -------
+    angles : ndarray, shape (n, 3)
+            [deg]; (theta, phi, psi) for the Cardan-sequences, and
+            (alpha, beta, gamma) for 'Euler'
+    """
+
+    R = to_rotmat(q)
+    if sequence in ('nautical', 'Fick'):
+        angles = (np.arctan2(R[:, 1, 0], R[:, 0, 0]),
+                  np.arcsin(np.clip(-R[:, 2, 0], -1, 1)),
+                  np.arctan2(R[:, 2, 1], R[:, 2, 2]))
+    elif sequence == 'Helmholtz':
+        angles = (np.arcsin(np.clip(R[:, 1, 0], -1, 1)),
+                  np.arctan2(-R[:, 2, 0], R[:, 0, 0]),
+                  np.arctan2(-R[:, 1, 2], R[:, 1, 1]))
+    elif sequence == 'Euler':
+        angles = (np.arctan2(R[:, 0, 2], -R[:, 1, 2]),
+                  np.arccos(np.clip(R[:, 2, 2], -1, 1)),
+                  np.arctan2(R[:, 2, 0], R[:, 2, 1]))
+    else:
+        raise ValueError(f'Do not know sequence {sequence}')
+
+    return np.rad2deg(np.column_stack(angles))
+
+
+def to_helical(q):
+    """Helical angle and axis
+
+    Parameters
+    ----------
+    q : ndarray, shape (n, 4)
+
+    Returns
+    -------
+    angle : ndarray, shape (n,)
+            Rotation angle [deg], between 0 and 180
+    axis : ndarray, shape (n, 3)
+            Unit vector of the rotation axis (zero, if there is no rotation)
+    """
+
+    q = normalize(q)
+    q = q * np.where(q[:, :1] < 0, -1., 1.)     # shortest rotation
+    sin_half = np.linalg.norm(q[:, 1:], axis=1)
+    angle = np.rad2deg(2 * np.arctan2(sin_half, q[:, 0]))
+    axis = np.divide(q[:, 1:], sin_half[:, np.newaxis],
+                     out=np.zeros((len(q), 3)), where=sin_half[:, np.newaxis] > 0)
+    return (angle, axis)
+
+
+def benchmark(n=100000):
+    """Conversion time per quaternion"""
+
+    q = normalize(np.random.randn(n, 4))
+    for name, function in [('relative', lambda q: relative(q[0], q)),
+                           ('to_euler', to_euler),
+                           ('to_helical', to_helical)]:
+        start = time.perf_counter()
+        function(q)
+        print(f'{name:10s}: {1e9 * (time.perf_counter() - start) / n:6.1f} ns/quaternion')
+
+
+if __name__ == '__main__':
+    # Joint angles of a recording (relative to the first sample), or the processing times
+    if len(sys.argv) > 1:
+        import loader
+        data, header = loader.load(sys.argv[1])
+        start = header['columns'].index('Quat 0')
+        angles = to_euler(relative(data[0, start:start+4], data[:, start:start+4]))
+        out_file = sys.argv[1] + '_angles.txt'
+        np.savetxt(out_file, np.column_stack((data[:, 0], angles)), delimiter=',',
+                   header='Time (s), Heading (deg), Pitch (deg), Roll (deg)', comments='')
+        print(f'Angles written to {out_file}')
+    else:
+        benchmark()
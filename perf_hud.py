@@ -0,0 +1,220 @@
+"""
+Performance statistics for the live viewer, and the overlay that displays them
+
+The collection side ("PerfStats") is called from the acquisition loop, and only
+does a few additions and array-assignments per call. All the more expensive
+statistics (rates, percentiles) are only evaluated in "summary", which is
+called by the overlay when - and only when - it is visible.
+"""
+
+#   author: Thomas Haslwanter
+#   date:   Oct-2026
+
+import time
+import datetime
+import numpy as np
+
+from PyQt5 import QtWidgets, QtCore
+
+
+# Offset between the NTP-epoch (1900) of the OSC-timetags, and the Unix-epoch (1970)
+NTP_OFFSET = (datetime.datetime(1970, 1, 1) - datetime.datetime(1900, 1, 1)).total_seconds()
+
+
+class PerfStats():
+    """Cheap counters for packets, decoding, and display updates"""
+
+    def __init__(self, history=512):
+        """
+        Parameters
+        ----------
+        history : integer
+                Number of recent events kept for the rate- and percentile-
+                calculations
+        """
+
+        self.history = history
+
+        # Ring-buffers, filled in place
+        self.arrivals = np.zeros(history)       # arrival times of packets [s]
+        self.decode_times = np.zeros(history)   # decoding time per packet [s]
+        self.latencies = np.zeros(history)      # wall-clock minus timetag [s]
+        self.update_times = np.zeros(history)   # duration of "update_view" [s]
+        self.frames = np.zeros(history)         # times of the display-updates [s]
+
+        self.reset()
+
+
+    def reset(self):
+        """Clear all counters"""
+
+        self.n_packets = 0
+        self.n_dropped = 0
+        self.n_duplicated = 0
+        self.n_updates = 0
+        self.n_frames = 0
+        self.last_timetag = -1
+        self.dt_timetag = 0.
+        self.backlog = 0
+
+
+    def packet(self, timetag, decode_time):
+        """Register one received packet
+
+        Parameters
+        ----------
+        timetag : float
+                OSC-timetag of the packet [s since 1900], or -1 if not available
+        decode_time : float
+                Time required for decoding the packet [s]
+        """
+
+        now = time.time()
+        ptr = self.n_packets % self.history
+        self.arrivals[ptr] = now
+        self.decode_times[ptr] = decode_time
+        self.n_packets += 1
+
+        if timetag == -1:
+            return
+
+        self.latencies[ptr] = now + NTP_OFFSET - timetag
+
+        # Dropped/duplicated packets are detected from the timetags
+        if self.last_timetag != -1:
+            dt = timetag - self.last_timetag
+            if dt <= 0:
+                self.n_duplicated += 1
+                return
+            if self.dt_timetag == 0:
+                self.dt_timetag = dt
+            elif dt > 1.5 * self.dt_timetag:
+                self.n_dropped += int(round(dt / self.dt_timetag)) - 1
+            else:
+                # slow running average of the nominal sample interval
+                self.dt_timetag += 0.01 * (dt - self.dt_timetag)
+
+        self.last_timetag = timetag
+
+
+    def update(self, duration):
+        """Register the duration of one call to "update_view" [s]"""
+
+        self.update_times[self.n_updates % self.history] = duration
+        self.n_updates += 1
+
+
+    def frame(self):
+        """Register one repaint of the display"""
+
+        self.frames[self.n_frames % self.history] = time.time()
+        self.n_frames += 1
+
+
+    def summary(self):
+        """Evaluate the statistics
+
+        Returns
+        -------
+        stats : dictionary
+                sample_rate [Hz], dropped, duplicated, decode_ms, fps,
+                update_ms (50/90/99 percentiles), backlog, latency_ms
+        """
+
+        def _valid(buffer, count):
+            return buffer[:min(count, self.history)]
+
+        def _rate(times, count):
+            valid = _valid(times, count)
+            if len(valid) < 2:
+                return 0.
+            span = valid.max() - valid.min()
+            return (len(valid) - 1) / span if span > 0 else 0.
+
+        stats = {}
+        stats['sample_rate'] = _rate(self.arrivals, self.n_packets)
+        stats['dropped'] = self.n_dropped
+        stats['duplicated'] = self.n_duplicated
+
+        decode = _valid(self.decode_times, self.n_packets)
+        stats['decode_ms'] = 1000 * decode.mean() if len(decode) else 0.
+
+        stats['fps'] = _rate(self.frames, self.n_frames)
+
+        updates = _valid(self.update_times, self.n_updates)
+        if len(updates):
+            stats['update_ms'] = 1000 * np.percentile(updates, [50, 90, 99])
+        else:
+            stats['update_ms'] = np.zeros(3)
+
+        stats['backlog'] = self.backlog
+
+        # The sensor clock is not synchronized with the PC, so only the
+        # latency relative to the fastest packet is meaningful
+        latencies = _valid(self.latencies, self.n_packets)
+        if self.last_timetag != -1 and len(latencies):
+            stats['latency_ms'] = 1000 * (np.median(latencies) - latencies.min())
+        else:
+            stats['latency_ms'] = np.nan
+
+        return stats
+
+
+class PerfOverlay(QtWidgets.QLabel):
+    """Semi-transparent text-overlay, showing the "PerfStats" """
+
+    def __init__(self, stats, parent, interval=500):
+        """
+        Parameters
+        ----------
+        stats : PerfStats
+                Statistics to be displayed
+        parent : QWidget
+                Widget on which the overlay is placed
+        interval : integer
+                Refresh interval of the overlay [ms]
+        """
+
+        super().__init__(parent)
+
+        self.stats = stats
+        self.setStyleSheet('background-color: rgba(0, 0, 0, 160); color: white;'
+                           'font-family: monospace; padding: 4px')
+        self.setAttribute(QtCore.Qt.WA_TransparentForMouseEvents)
+        self.move(10, 10)
+        self.hide()
+
+        # The statistics are only evaluated while the overlay is visible
+        self.timer = QtCore.QTimer()
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.refresh)
+
+
+    def toggle(self):
+        """Show/hide the overlay"""
+
+        if self.isVisible():
+            self.timer.stop()
+            self.hide()
+        else:
+            self.refresh()
+            self.show()
+            self.raise_()
+            self.timer.start()
+
+
+    def refresh(self):
+        """Update the displayed text"""
+
+        s = self.stats.summary()
+        text = (f'Sample rate:  {s["sample_rate"]:6.1f} Hz\n'
+                f'Dropped:      {s["dropped"]:6d}\n'
+                f'Duplicated:   {s["duplicated"]:6d}\n'
+                f'Decode:       {s["decode_ms"]:6.3f} ms\n'
+                f'Render:       {s["fps"]:6.1f} fps\n'
+                f'Update 50/90/99%: {s["update_ms"][0]:.2f} / '
+                f'{s["update_ms"][1]:.2f} / {s["update_ms"][2]:.2f} ms\n'
+                f'Rec. backlog: {s["backlog"]:6d} rows\n'
+                f'Latency:      {s["latency_ms"]:6.1f} ms')
+        self.setText(text)
+        self.adjustSize()
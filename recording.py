@@ -0,0 +1,780 @@
+"""
+Binary, append-only recording format for the Jansenberger data
+
+File layout (all integers little-endian):
+    - magic "JREC", followed by the format version (uint16)
+    - header-length (uint32), followed by a UTF-8 encoded JSON-header with
+      subject, experimentor, date, sample_rate, columns, dtype, time_column,
+      codec, and filters
+    - any number of data-blocks, each consisting of
+      marker "JBLK", number of rows (uint32), number of payload bytes (uint32),
+      CRC32 of the payload (uint32), time of the first and the last row
+      (float64), and the payload
+    - when the recording is closed properly: a block-index (marker "JIDX",
+      number of blocks (uint32), CRC32 of the entries (uint32), and for each
+      block the payload-offset (uint64), number of rows (uint32), number of
+      payload bytes (uint32), and the time of the first and last row (float64)),
+      followed by the offset of the index (uint64) and the end-marker "JEND"
+
+Without compression, the payload holds the rows x columns in C-order, in the
+dtype of the header. With compression ("zlib" or "lzma"), the block is stored
+column by column, optionally preprocessed with the lossless filters
+    - "delta": differences between successive values of the integer
+      bit-pattern of the floats
+    - "shuffle": bytes of equal significance are grouped together
+which make smooth IMU-signals much more compressible.
+
+New blocks are only ever appended, and each block is written with a single
+call, so an interrupted recording still contains all the blocks written before
+the interruption. "recover" truncates such a file to its last valid block, and
+adds the missing index. For reading, the file is memory-mapped, and the blocks
+are returned as views into the file.
+
+The CSV-layout of the previous ".dat"-files can be produced with "export_csv".
+
+To keep the disk-I/O out of the GUI, a "Recorder" collects the incoming rows in
+preallocated blocks, and hands full blocks to a background writer-thread.
+"""
+
+#   author: Thomas Haslwanter
+#   date:   Oct-2026
+
+import os
+import sys
+import json
+import zlib
+import lzma
+import time
+import queue
+import struct
+import threading
+import numpy as np
+
+
+MAGIC = b'JREC'
+VERSION = 3
+BLOCK_MARKER = b'JBLK'
+BLOCK_HEADER = struct.Struct('<4sIIIdd')  # marker, n_rows, n_bytes, crc32, t_first, t_last
+INDEX_MARKER = b'JIDX'
+INDEX_HEADER = struct.Struct('<4sII')    # marker, n_blocks, crc32
+INDEX_DTYPE = np.dtype([('offset', '<u8'), ('n_rows', '<u4'), ('n_bytes', '<u4'),
+                        ('t_first', '<f8'), ('t_last', '<f8')])
+END_MARKER = b'JEND'
+TRAILER = struct.Struct('<Q4s')          # offset of the index, end-marker
+EXTENSION = '.jrec'
+
+# (compress, decompress) for each codec
+CODECS = {'none': (bytes, bytes),
+          'zlib': (lambda raw: zlib.compress(raw, 6), zlib.decompress),
+          'lzma': (lambda raw: lzma.compress(raw, preset=2), lzma.decompress)}
+FILTERS = ['delta', 'shuffle']
+
+# Columns of the "dat_quat" data from the NGIMU
+COLUMNS = ['Time (s)',
+           'Gyroscope X (deg/s)', 'Gyroscope Y (deg/s)', 'Gyroscope Z (deg/s)',
+           'Accelerometer X (g)', 'Accelerometer Y (g)', 'Accelerometer Z (g)',
+           'Magnetometer X (uT)', 'Magnetometer Y (uT)', 'Magnetometer Z (uT)',
+           'Barometer (hPa)',
+           'Quat 0', 'Quat X', 'Quat Y', 'Quat Z']
+
+
+class RecordingWriter():
+    """Append data-blocks to a binary recording"""
+
+    def __init__(self, filename, columns=COLUMNS, subject='', experimentor='',
+                 date='', sample_rate=0., dtype='float64', fsync_interval=5.,
+                 time_column=0, codec='none', filters=FILTERS):
+        """Creates the file, and writes the header
+
+        Parameters
+        ----------
+        filename : string
+                Name of the recording-file
+        columns : list of strings
+                Column names
+        subject : string
+        experimentor : string
+        date : string
+        sample_rate : float
+                Nominal sample rate [Hz]
+        dtype : string
+                'float64' or 'float32'. Note that with 'float32' the timetags
+                (seconds since 1900) are only stored with a resolution of minutes!
+        fsync_interval : float
+                Minimum time [s] between forcing the written blocks onto the
+                disk. Each block is flushed to the operating system right away.
+                "None" leaves the syncing to the operating system.
+        time_column : integer
+                Column with the time, used for the block-index. "None" if the
+                data have no time-column.
+        codec : string
+                Compression of the blocks: 'none', 'zlib', or 'lzma'
+        filters : list of strings
+                Preprocessing before the compression: 'delta' and/or 'shuffle'.
+                Ignored without compression.
+        """
+
+        if np.dtype(dtype) not in (np.float32, np.float64):
+            raise TypeError(f'dtype has to be float32 or float64, not {dtype}')
+        if codec not in CODECS:
+            raise ValueError(f'codec has to be one of {list(CODECS)}, not {codec}')
+        if codec == 'none':
+            filters = []
+        for name in filters:
+            if name not in FILTERS:
+                raise ValueError(f'filters can only contain {FILTERS}, not {name}')
+
+        self.columns = list(columns)
+        self.dtype = np.dtype(dtype).newbyteorder('<')
+        self.header = {'subject': subject,
+                       'experimentor': experimentor,
+                       'date': date,
+                       'sample_rate': float(sample_rate),
+                       'columns': self.columns,
+                       'dtype': np.dtype(dtype).name,
+                       'time_column': time_column,
+                       'codec': codec,
+                       'filters': list(filters)}
+        self.n_rows = 0
+        self.fsync_interval = fsync_interval
+        self.last_sync = time.monotonic()
+        self.blocks = []    # entries of the block-index, see INDEX_DTYPE
+
+        self.fh = open(filename, 'wb')
+        self.name = self.fh.name
+        header = json.dumps(self.header).encode()
+        self.fh.write(MAGIC + struct.pack('<H', VERSION))
+        self.fh.write(struct.pack('<I', len(header)) + header)
+        self.fh.flush()     # a crash before the first block leaves a valid, empty recording
+        self.offset = self.fh.tell()
+
+
+    def write(self, data):
+        """Append one block of data
+
+        Parameters
+        ----------
+        data : ndarray, shape (n, len(columns))
+        """
+
+        data = np.ascontiguousarray(data, dtype=self.dtype)
+        if data.ndim != 2 or data.shape[1] != len(self.columns):
+            raise ValueError(f'Data must have the shape (n, {len(self.columns)}), not {data.shape}')
+        if len(data) == 0:
+            return
+
+        payload = encode(data, self.header['codec'], self.header['filters'])
+        time_column = self.header['time_column']
+        if time_column is None:
+            t_first, t_last = np.nan, np.nan
+        else:
+            t_first, t_last = data[0, time_column], data[-1, time_column]
+
+        self.fh.write(BLOCK_HEADER.pack(BLOCK_MARKER, len(data), len(payload),
+                            zlib.crc32(payload), t_first, t_last) + payload)
+        self.fh.flush()
+
+        self.blocks.append((self.offset + BLOCK_HEADER.size, len(data),
+                            len(payload), t_first, t_last))
+        self.offset += BLOCK_HEADER.size + len(payload)
+        self.n_rows += len(data)
+
+        if self.fsync_interval is not None:
+            now = time.monotonic()
+            if now - self.last_sync > self.fsync_interval:
+                os.fsync(self.fh.fileno())
+                self.last_sync = now
+
+
+    def close(self):
+        """Write the block-index, and close the recording-file"""
+
+        if self.fh.closed:
+            return
+        _write_index(self.fh, self.offset, self.blocks)
+        self.fh.close()
+
+
+    @property
+    def closed(self):
+        return self.fh.closed
+
+
+class Recorder():
+    """Collects rows in blocks, and writes them with a background thread
+
+    The rows are stored in preallocated blocks. A block is handed to the
+    writer-thread - which also does the compression - when it is full
+    ("block_size"), or when its first row is older than "flush_interval".
+
+    Since the handoff-queue is bounded, so is the memory: when the disk falls
+    behind, warnings are issued, and only when the queue is completely full
+    does "append" wait for the writer.
+    """
+
+    def __init__(self, writer, block_size=100, queue_size=16, flush_interval=1.,
+                 warn=print):
+        """
+        Parameters
+        ----------
+        writer : RecordingWriter
+                Opened recording, to which the blocks are written
+        block_size : integer
+                Number of rows per block
+        queue_size : integer
+                Maximum number of blocks waiting for the writer
+        flush_interval : float
+                Maximum time [s] that a row is held before it is handed over
+        warn : function
+                Called with a message when the writer falls behind. This is
+                always called from the thread calling "append"/"close".
+        """
+
+        self.writer = writer
+        self.name = writer.name
+        self.block_size = block_size
+        self.flush_interval = flush_interval
+        self.warn = warn
+
+        # Block-pool: the active block, the one being written, and the queued ones
+        n_columns = len(writer.columns)
+        self.free = queue.Queue()
+        for ii in range(queue_size + 2):
+            self.free.put(np.empty((block_size, n_columns), dtype=writer.dtype))
+        self.queue = queue.Queue(maxsize=queue_size)
+
+        self.block = self.free.get()
+        self.ptr = 0
+        self.block_start = 0.
+        # Each counter is only modified by one thread
+        self.rows_handed = 0        # by "append"
+        self.rows_written = 0       # by the writer-thread
+        self.error = None
+        self.last_warning = 0.
+        self.closed = False
+
+        self.thread = threading.Thread(target=self._write_blocks, daemon=True)
+        self.thread.start()
+
+
+    def append(self, row):
+        """Add one row to the recording"""
+
+        if self.ptr == 0:
+            self.block_start = time.monotonic()
+        self.block[self.ptr] = row
+        self.ptr += 1
+
+        if self.ptr == self.block_size or \
+           time.monotonic() - self.block_start > self.flush_interval:
+            self._hand_over()
+
+
+    def extend(self, rows):
+        """Add several rows, shape (n, len(columns))"""
+
+        for row in rows:
+            self.append(row)
+
+
+    def flush(self):
+        """Hand the rows collected so far over to the writer"""
+
+        if self.ptr > 0:
+            self._hand_over()
+
+
+    def close(self):
+        """Write all remaining rows, stop the writer-thread, and close the file"""
+
+        if self.closed:
+            return
+        self.flush()
+        self.queue.put(None)
+        self.thread.join()
+        self.writer.close()
+        self.closed = True
+        self._check_error()
+
+
+    @property
+    def backlog(self):
+        """Number of rows not yet written to disk"""
+        return self.rows_handed - self.rows_written + self.ptr
+
+
+    def _hand_over(self):
+        """Pass the active block to the writer-thread, and get a fresh one"""
+
+        self._check_error()
+
+        pending = self.queue.qsize()
+        if pending >= self.queue.maxsize * 3 // 4:
+            now = time.monotonic()
+            if now - self.last_warning > 5:
+                self.warn(f'Disk is falling behind: {pending} blocks waiting to be written to {self.name}')
+                self.last_warning = now
+
+        self.rows_handed += self.ptr
+        # Blocks only if the queue is full
+        self.queue.put((self.block, self.ptr))
+        self.block = self.free.get()
+        self.ptr = 0
+
+
+    def _check_error(self):
+        """Report errors from the writer-thread"""
+
+        if self.error is not None:
+            error, self.error = self.error, None
+            self.warn(f'Error writing to {self.name}: {error}')
+
+
+    def _write_blocks(self):
+        """Writer-thread: write the queued blocks, and return them to the pool"""
+
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            block, n_rows = item
+            try:
+                self.writer.write(block[:n_rows])
+            except Exception as error:
+                self.error = error
+            self.rows_written += n_rows
+            self.free.put(block)
+
+
+def open_recorder(filename, columns, block_size=100, warn=print, **header):
+    """Open a recording for the data of a streaming source
+
+    Parameters
+    ----------
+    filename : string
+            Name of the recording-file
+    columns : list of strings
+            Data-columns, e.g. "source.columns"; the time is added as first column
+    block_size : integer
+            Number of rows per block (see "Recorder")
+    warn : function
+            Called with a message when the writer falls behind
+    header : further parameters of "RecordingWriter", e.g. "subject"
+
+    Returns
+    -------
+    recorder : Recorder
+            Append the rows (time, data) with "append" or "extend"
+    """
+
+    writer = RecordingWriter(filename, columns=[COLUMNS[0]] + list(columns), **header)
+    return Recorder(writer, block_size=block_size, warn=warn)
+
+
+class RecordingReader():
+    """Memory-mapped access to a binary recording"""
+
+    def __init__(self, filename):
+        """Reads the header, and locates the data-blocks
+
+        Parameters
+        ----------
+        filename : string
+                Name of the recording-file
+        """
+
+        self.name = filename
+        self.header = read_header(filename)
+        self.columns = self.header['columns']
+        self.dtype = np.dtype(self.header['dtype']).newbyteorder('<')
+
+        if os.path.getsize(filename) == self.header['_data_offset']:
+            self.mm = np.zeros(0, dtype=np.uint8)   # mmap cannot map empty ranges
+        else:
+            self.mm = np.memmap(filename, dtype=np.uint8, mode='r')
+
+        # Files that have been closed properly have an index. For all others
+        # (still being recorded, or interrupted), the block-headers are walked.
+        self.blocks = _read_index(self.mm, self.header['_data_offset'])
+        self.indexed = self.blocks is not None
+        if not self.indexed:
+            self.blocks, _ = _scan_blocks(self.mm, self.header['_data_offset'],
+                                          _row_size(self.header))
+
+        self.n_rows = int(self.blocks['n_rows'].sum())
+
+
+    def block(self, index):
+        """Data of one block. Without compression, this is a view into the
+        memory-mapped file."""
+
+        entry = self.blocks[index]
+        payload = self.mm[entry['offset']:entry['offset'] + entry['n_bytes']]
+        return decode(payload, int(entry['n_rows']), len(self.columns),
+                      self.dtype, self.header['codec'], self.header['filters'])
+
+
+    def read(self):
+        """All the data, as one array of shape (n_rows, len(columns))"""
+
+        return self._concatenate(range(len(self.blocks)))
+
+
+    def read_range(self, t_start, t_stop):
+        """Rows with t_start <= time <= t_stop
+
+        Only the blocks overlapping the requested range are read (and
+        decompressed), based on the block-index.
+        """
+
+        time_column = self.header['time_column']
+        if time_column is None:
+            raise ValueError(f'{self.name} has no time-column')
+
+        selected = np.where((self.blocks['t_last'] >= t_start) &
+                            (self.blocks['t_first'] <= t_stop))[0]
+        data = self._concatenate(selected)
+        times = data[:, time_column]
+        return data[(times >= t_start) & (times <= t_stop)]
+
+
+    def _concatenate(self, indices):
+        """Stack the selected blocks"""
+
+        if len(indices) == 0:
+            return np.zeros((0, len(self.columns)), dtype=self.dtype)
+        return np.vstack([self.block(ii) for ii in indices])
+
+
+def read_header(filename):
+    """Read the header of a recording
+
+    Returns
+    -------
+    header : dictionary
+            subject, experimentor, date, sample_rate, columns, dtype,
+            time_column, codec, filters, and "_data_offset", the position of
+            the first data-block
+    """
+
+    with open(filename, 'rb') as fh:
+        start = fh.read(len(MAGIC) + 2 + 4)
+        if start[:len(MAGIC)] != MAGIC:
+            raise IOError(f'{filename} is not a Jansenberger recording')
+        version = struct.unpack('<H', start[4:6])[0]
+        if version != VERSION:
+            raise IOError(f'Unsupported recording version {version} in {filename}')
+        header_length = struct.unpack('<I', start[6:10])[0]
+        header = json.loads(fh.read(header_length).decode())
+
+    header['_data_offset'] = len(start) + header_length
+    return header
+
+
+def encode(data, codec='none', filters=FILTERS):
+    """Convert a data-block into the (compressed) payload
+
+    Parameters
+    ----------
+    data : ndarray, shape (n_rows, n_columns)
+            Data, with a little-endian float dtype
+    codec : string
+            'none', 'zlib', or 'lzma'
+    filters : list of strings
+            Any of 'delta' and 'shuffle', applied before the compression
+
+    Returns
+    -------
+    payload : bytes
+    """
+
+    if codec == 'none':
+        return data.tobytes()
+
+    # Column by column, since the signals are smooth in time
+    values = np.ascontiguousarray(data.T)
+    if 'delta' in filters:
+        # Differences of the bit-patterns are lossless (unsigned overflow wraps)
+        ints = values.view(f'<u{values.itemsize}')
+        values = np.hstack((ints[:, :1], np.diff(ints, axis=1)))
+    if 'shuffle' in filters:
+        values = values.view(np.uint8).reshape((-1, values.itemsize)).T
+
+    return CODECS[codec][0](np.ascontiguousarray(values).tobytes())
+
+
+def decode(payload, n_rows, n_columns, dtype, codec='none', filters=FILTERS):
+    """Convert the payload back into the data-block (inverse of "encode")
+
+    Parameters
+    ----------
+    payload : bytes or ndarray (uint8)
+    n_rows : integer
+    n_columns : integer
+    dtype : numpy dtype
+            Little-endian float dtype of the data
+    codec : string
+    filters : list of strings
+
+    Returns
+    -------
+    data : ndarray, shape (n_rows, n_columns)
+    """
+
+    if codec == 'none':
+        data = np.frombuffer(payload, dtype=dtype, count=n_rows * n_columns)
+        return data.reshape((n_rows, n_columns))
+
+    raw = np.frombuffer(CODECS[codec][1](payload), dtype=np.uint8)
+    if 'shuffle' in filters:
+        raw = np.ascontiguousarray(raw.reshape((dtype.itemsize, -1)).T)
+    values = raw.view(f'<u{dtype.itemsize}').reshape((n_columns, n_rows))
+    if 'delta' in filters:
+        values = np.cumsum(values, axis=1, dtype=values.dtype)
+
+    return values.view(dtype).T
+
+
+def _row_size(header):
+    """Number of bytes per row, or "None" if the blocks are compressed"""
+
+    if header['codec'] != 'none':
+        return None
+    return len(header['columns']) * np.dtype(header['dtype']).itemsize
+
+
+def _scan_blocks(buffer, offset, row_size, verify=False):
+    """Walk the data-blocks, up to the first incomplete or invalid one
+
+    Parameters
+    ----------
+    buffer : ndarray (uint8)
+            Content of the recording-file
+    offset : integer
+            Position of the first data-block
+    row_size : integer
+            Number of bytes per row, to check the block-size. "None" for
+            compressed blocks.
+    verify : boolean
+            If "True", the CRC32-checksum of each block is checked
+
+    Returns
+    -------
+    blocks : ndarray, dtype INDEX_DTYPE
+            Index-entries of the valid blocks
+    end : integer
+            Position after the last valid block
+    """
+
+    blocks = []
+    while offset + BLOCK_HEADER.size <= len(buffer):
+        marker, n_rows, n_bytes, crc, t_first, t_last = \
+            BLOCK_HEADER.unpack_from(buffer, offset)
+        start = offset + BLOCK_HEADER.size
+        if marker != BLOCK_MARKER or start + n_bytes > len(buffer):
+            break
+        if row_size is not None and n_bytes != n_rows * row_size:
+            break
+        if verify and zlib.crc32(buffer[start:start + n_bytes]) != crc:
+            break
+        blocks.append((start, n_rows, n_bytes, t_first, t_last))
+        offset = start + n_bytes
+
+    return np.array(blocks, dtype=INDEX_DTYPE), offset
+
+
+def _write_index(fh, offset, blocks):
+    """Append the block-index and the trailer at the current file-position
+
+    Parameters
+    ----------
+    fh : file-handle
+            Recording-file, opened for writing
+    offset : integer
+            Current file-position, where the index starts
+    blocks : list or ndarray
+            Index-entries (see INDEX_DTYPE) for each block
+    """
+
+    entries = np.array(blocks, dtype=INDEX_DTYPE).tobytes()
+    fh.write(INDEX_HEADER.pack(INDEX_MARKER, len(blocks), zlib.crc32(entries)) +
+             entries + TRAILER.pack(offset, END_MARKER))
+    fh.flush()
+    os.fsync(fh.fileno())
+
+
+def _read_index(buffer, data_offset):
+    """Block-index of a properly closed recording
+
+    Returns
+    -------
+    blocks : ndarray or None
+            Index-entries (see INDEX_DTYPE) for each block, or "None" if the
+            file has no valid index
+    """
+
+    if len(buffer) < data_offset + INDEX_HEADER.size + TRAILER.size:
+        return None
+    offset, marker = TRAILER.unpack_from(buffer, len(buffer) - TRAILER.size)
+    if marker != END_MARKER or offset < data_offset or \
+       offset + INDEX_HEADER.size > len(buffer) - TRAILER.size:
+        return None
+
+    marker, n_blocks, crc = INDEX_HEADER.unpack_from(buffer, offset)
+    start = offset + INDEX_HEADER.size
+    if marker != INDEX_MARKER or \
+       start + n_blocks * INDEX_DTYPE.itemsize != len(buffer) - TRAILER.size:
+        return None
+    entries = buffer[start:len(buffer) - TRAILER.size]
+    if zlib.crc32(entries) != crc:
+        return None
+
+    return np.frombuffer(entries, dtype=INDEX_DTYPE)
+
+
+def recover(filename):
+    """Repair a recording that has not been closed properly
+
+    Binary recordings are truncated after the last block with a valid
+    checksum, and the block-index is rebuilt. Text-files (the old ".dat"-format)
+    are truncated after the last complete line.
+
+    Parameters
+    ----------
+    filename : string
+            Name of the recording-file
+
+    Returns
+    -------
+    n_rows : integer
+            Number of data-rows in the repaired file
+    """
+
+    buffer = np.fromfile(filename, dtype=np.uint8)
+
+    if bytes(buffer[:len(MAGIC)]) != MAGIC:
+        # Text-file: the header has 4 lines
+        end = bytes(buffer).rfind(b'\n') + 1
+        with open(filename, 'r+b') as fh:
+            fh.truncate(end)
+        return max(bytes(buffer[:end]).count(b'\n') - 4, 0)
+
+    header = read_header(filename)
+    blocks, end = _scan_blocks(buffer, header['_data_offset'], _row_size(header),
+                               verify=True)
+
+    with open(filename, 'r+b') as fh:
+        fh.truncate(end)
+        fh.seek(end)
+        _write_index(fh, end, blocks)
+
+    return int(blocks['n_rows'].sum())
+
+
+def read_recording(filename):
+    """Read all data from a recording
+
+    Returns
+    -------
+    data : ndarray, shape (n_rows, n_columns)
+    header : dictionary
+            see "read_header"
+    """
+
+    reader = RecordingReader(filename)
+    return (reader.read(), reader.header)
+
+
+def export_csv(in_file, out_file=None):
+    """Export a binary recording to the CSV-layout of the ".dat"-files
+
+    Parameters
+    ----------
+    in_file : string
+            Name of the binary recording
+    out_file : string
+            Name of the CSV-file. Default: same name, with the extension ".dat"
+
+    Returns
+    -------
+    out_file : string
+    """
+
+    if out_file is None:
+        out_file = os.path.splitext(in_file)[0] + '.dat'
+
+    reader = RecordingReader(in_file)
+    header = reader.header
+    with open(out_file, 'wb') as fh:
+        fh.write(f'Subject: {header["subject"]}\n'.encode())
+        fh.write(f'Experimentor: {header["experimentor"]}\n'.encode())
+        fh.write(f'Date: {header["date"]}\n'.encode())
+        fh.write((','.join(reader.columns) + '\n').encode())
+        for ii in range(len(reader.blocks)):
+            np.savetxt(fh, reader.block(ii), delimiter=',')
+
+    return out_file
+
+
+def benchmark(data=None, block_size=1000):
+    """Compression ratio and speed of the different codecs and filters
+
+    Parameters
+    ----------
+    data : ndarray, shape (n_rows, n_columns)
+            Data to compress. Default: 10 minutes of simulated, smooth IMU-data
+            at 100 Hz, with the 15 columns of COLUMNS. Like the NGIMU-data,
+            the signals have float32-resolution.
+    block_size : integer
+            Number of rows per block
+
+    Returns
+    -------
+    results : list
+            (codec, filters, ratio, compression [MB/s], decompression [MB/s])
+    """
+
+    if data is None:
+        t = np.arange(60000) / 100
+        rng = np.random.default_rng(1234)
+        data = np.column_stack([3.8e9 + t] +
+                    [np.float32(np.sin(2 * np.pi * (0.2 + 0.1 * ii) * t) +
+                                0.01 * rng.standard_normal(len(t))) for ii in range(14)])
+
+    data = np.ascontiguousarray(data, dtype='<f8')
+    blocks = [data[ii:ii + block_size] for ii in range(0, len(data), block_size)]
+    mega_bytes = data.nbytes / 1e6
+
+    results = []
+    for codec in CODECS:
+        for filters in ([[]] if codec == 'none' else [[], ['delta'], ['shuffle'], FILTERS]):
+            start = time.perf_counter()
+            payloads = [encode(block, codec, filters) for block in blocks]
+            t_encode = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for block, payload in zip(blocks, payloads):
+                decode(payload, len(block), data.shape[1], data.dtype, codec, filters)
+            t_decode = time.perf_counter() - start
+
+            ratio = data.nbytes / sum([len(payload) for payload in payloads])
+            results.append((codec, '+'.join(filters) or '-', ratio,
+                            mega_bytes / t_encode, mega_bytes / t_decode))
+
+    return results
+
+
+if __name__ == '__main__':
+    # Export the recordings given on the command line to CSV, repair them
+    # with "--recover", or compare the codecs with "--benchmark [recording]"
+    if len(sys.argv) > 1 and sys.argv[1] == '--recover':
+        for in_file in sys.argv[2:]:
+            print(f'{in_file}: {recover(in_file)} rows recovered')
+    elif len(sys.argv) > 1 and sys.argv[1] == '--benchmark':
+        data = read_recording(sys.argv[2])[0] if len(sys.argv) > 2 else None
+        print(f'{"codec":6s} {"filters":14s} {"ratio":>6s} {"comp MB/s":>10s} {"decomp MB/s":>12s}')
+        for (codec, filters, ratio, comp, decomp) in benchmark(data):
+            print(f'{codec:6s} {filters:14s} {ratio:6.2f} {comp:10.1f} {decomp:12.1f}')
+    else:
+        for in_file in sys.argv[1:]:
+            print(f'{in_file} -> {export_csv(in_file)}')
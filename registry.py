@@ -0,0 +1,217 @@
+"""
+Indexed registry of the subjects and experimentors
+
+The names are maintained in "subjects.txt" and "experimentors.txt" (one name
+per line, e.g. "Mustermann, Max"). "SubjectRegistry" copies them into an
+SQLite-database, which is only updated when a file has changed, and which
+indexes every word of every name. This allows
+
+    - incremental prefix-search: "must ma" finds "Mustermann, Max"
+    - fuzzy search, when nothing matches the prefixes: "Musterman" also finds
+      "Mustermann, Max" (only words with the same first letter are compared)
+    - lazy loading: the names are fetched page by page (limit/offset), in
+      the order of the file
+
+so that the selection dialog opens instantly, independent of the number of
+names.
+
+Example:
+    registry = SubjectRegistry()
+    registry.sync()
+    print(registry.search('subject', 'must', limit=10))
+"""
+
+#   author: Thomas Haslwanter
+#   date:   Oct-2026
+
+import os
+import re
+import sys
+import time
+import sqlite3
+import difflib
+import unicodedata
+
+
+DB_FILE = 'subjects.sqlite'
+FILES = {'subject': 'subjects.txt', 'experimentor': 'experimentors.txt'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS names (
+    kind TEXT,
+    position INTEGER,
+    name TEXT,
+    PRIMARY KEY (kind, position)
+);
+CREATE TABLE IF NOT EXISTS words (
+    kind TEXT,
+    word TEXT,
+    position INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_word ON words (kind, word);
+CREATE TABLE IF NOT EXISTS files (
+    kind TEXT PRIMARY KEY,
+    path TEXT,
+    size INTEGER,
+    mtime INTEGER
+);
+"""
+
+
+def read_names(filename):
+    """Names in a text-file, one per line (without line-ends and empty lines)"""
+
+    with open(filename, 'r') as fh:
+        return [line.strip() for line in fh if line.strip()]
+
+
+def words(text):
+    """Lower-case words without accents, for the index: "Müller, Max" -> ['muller', 'max']"""
+
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return re.findall(r'\w+', text.lower())
+
+
+class SubjectRegistry():
+    """Subjects and experimentors, with indexed search"""
+
+    def __init__(self, db_file=DB_FILE, files=FILES):
+        """
+        Parameters
+        ----------
+        db_file : string
+                SQLite-database (":memory:" for a temporary one)
+        files : dictionary
+                Text-file for each kind of name
+        """
+
+        self.files = dict(files)
+        self.db = sqlite3.connect(db_file)
+        self.db.executescript(SCHEMA)
+
+
+    def close(self):
+        """Close the database"""
+        self.db.close()
+
+
+    def sync(self):
+        """Re-import the text-files that have changed
+
+        Returns
+        -------
+        changed : list of strings
+                Kinds that have been imported
+        """
+
+        known = {row[0]: tuple(row[1:]) for row in
+                 self.db.execute('SELECT kind, path, size, mtime FROM files')}
+
+        changed = []
+        for kind, path in self.files.items():
+            stat = os.stat(path)
+            if known.get(kind) == (path, stat.st_size, stat.st_mtime_ns):
+                continue
+            names = read_names(path)
+            with self.db:
+                self.db.execute('DELETE FROM names WHERE kind = ?', (kind,))
+                self.db.execute('DELETE FROM words WHERE kind = ?', (kind,))
+                self.db.executemany('INSERT INTO names VALUES (?,?,?)',
+                                    [(kind, ii, name) for ii, name in enumerate(names)])
+                self.db.executemany('INSERT INTO words VALUES (?,?,?)',
+                                    [(kind, word, ii) for ii, name in enumerate(names)
+                                     for word in set(words(name))])
+                self.db.execute('INSERT OR REPLACE INTO files VALUES (?,?,?,?)',
+                                (kind, path, stat.st_size, stat.st_mtime_ns))
+            changed.append(kind)
+        return changed
+
+
+    def count(self, kind):
+        """Number of names of one kind"""
+        return self.db.execute('SELECT COUNT(*) FROM names WHERE kind = ?', (kind,)).fetchone()[0]
+
+
+    def search(self, kind, text='', limit=100, offset=0):
+        """Names that match the search-text
+
+        Parameters
+        ----------
+        kind : string
+                'subject' or 'experimentor'
+        text : string
+                Each word has to be the start of a word of the name. Without
+                words, all names are returned.
+        limit, offset : integer
+                Page of the results
+
+        Returns
+        -------
+        names : list of strings
+                In the order of the file. If no name matches the prefixes, the
+                fuzzy matches are returned instead (see "fuzzy"), best first.
+        """
+
+        query_words = words(text)
+        if not query_words:
+            rows = self.db.execute('SELECT name FROM names WHERE kind = ? ORDER BY position '
+                                   'LIMIT ? OFFSET ?', (kind, limit, offset))
+            return [row[0] for row in rows]
+
+        # One index range per word; the name has to match all of them
+        match = ' INTERSECT '.join(['SELECT position FROM words WHERE kind = ? '
+                                    'AND word >= ? AND word < ?'] * len(query_words))
+        values = [value for word in query_words for value in (kind, word, word + '\uffff')]
+        rows = self.db.execute(f'SELECT name FROM names WHERE kind = ? AND position IN ({match}) '
+                               'ORDER BY position LIMIT ? OFFSET ?',
+                               [kind] + values + [limit, offset])
+        names = [row[0] for row in rows]
+
+        if not names and offset == 0:
+            names = self.fuzzy(kind, text, limit)
+        return names
+
+
+    def fuzzy(self, kind, text, limit=20, cutoff=0.7):
+        """Names with words similar to the longest word of the search-text
+
+        Only words with the same first letter are compared, so that the search
+        stays fast for long lists.
+        """
+
+        query_words = words(text)
+        if not query_words:
+            return []
+        word = max(query_words, key=len)
+        candidates = [row[0] for row in self.db.execute(
+            'SELECT DISTINCT word FROM words WHERE kind = ? AND word >= ? AND word < ?',
+            (kind, word[0], word[0] + '\uffff'))]
+        similar = difflib.get_close_matches(word, candidates, n=limit, cutoff=cutoff)
+
+        names = []
+        for match in similar:
+            rows = self.db.execute('SELECT names.name FROM words JOIN names '
+                                   'ON names.kind = words.kind AND names.position = words.position '
+                                   'WHERE words.kind = ? AND words.word = ? ORDER BY names.position',
+                                   (kind, match))
+            names.extend(row[0] for row in rows if row[0] not in names)
+        return names[:limit]
+
+
+if __name__ == '__main__':
+    # Search the registry: registry.py <text> [subject|experimentor]
+    registry = SubjectRegistry()
+    start = time.perf_counter()
+    changed = registry.sync()
+    if changed:
+        print(f'Imported {", ".join(changed)} in {time.perf_counter() - start:.2f} s')
+
+    text = sys.argv[1] if len(sys.argv) > 1 else ''
+    kind = sys.argv[2] if len(sys.argv) > 2 else 'subject'
+    start = time.perf_counter()
+    names = registry.search(kind, text, limit=20)
+    print(f'{len(names)} of {registry.count(kind)} names in {1000 * (time.perf_counter() - start):.1f} ms:')
+    for name in names:
+        print(f'    {name}')
+    registry.close()
@@ -0,0 +1,159 @@
+"""
+Online counting of exercise repetitions
+
+The selected signal is smoothed with a lowpass-filter, and compared with
+adaptive thresholds: the running mean of the signal, plus/minus a multiple of
+its running mean absolute deviation (both exponential averages). A repetition
+is one full cycle, in which the signal rises above the upper threshold and
+then falls below the lower threshold again.
+
+Each sample costs a fixed number of operations, and only a handful of values
+are stored, so the counter can run indefinitely on the live data.
+
+Example:
+    counter = RepetitionCounter(rate=100)
+    for time, amplitude, duration in counter.process(timestamps, signal):
+        print(f'Repetition {counter.count}: {amplitude:.2f} in {duration:.1f} s')
+"""
+
+#   author: Thomas Haslwanter
+#   date:   Oct-2026
+
+import sys
+import numpy as np
+
+import filters
+
+
+class RepetitionCounter():
+    """Detect repetitions with hysteresis around adaptive thresholds"""
+
+    def __init__(self, rate, cutoff=2., tau=5., k=0.5, min_amplitude=0.05,
+                 min_duration=0.5):
+        """
+        Parameters
+        ----------
+        rate : float
+                Sample rate [Hz]
+        cutoff : float
+                Cutoff frequency [Hz] of the smoothing lowpass-filter
+        tau : float
+                Time constant [s] of the running mean and deviation
+        k : float
+                Thresholds are at mean +/- k * deviation
+        min_amplitude : float
+                Minimum distance between the thresholds (in the units of the
+                signal), so that noise at rest is not counted
+        min_duration : float
+                Minimum duration [s] of a repetition
+        """
+
+        self.rate = rate
+        self.cutoff = cutoff
+        self.alpha = 1 / (tau * rate)
+        self.k = k
+        self.min_amplitude = min_amplitude
+        self.min_duration = min_duration
+        self.reset()
+
+
+    def reset(self):
+        """Start counting from zero"""
+
+        self.lowpass = filters.lowpass(self.cutoff, self.rate, 1)
+        self.count = 0
+        self.mean = None
+        self.deviation = 0.
+        self.high = False           # signal above the upper threshold, in the current cycle
+        self.cycle_start = None     # time when the current cycle started
+        self.cycle_max = -np.inf
+        self.cycle_min = np.inf
+        self.last = None            # (time, amplitude, duration) of the last repetition
+
+
+    def process(self, timestamps, signal):
+        """Process a block of samples
+
+        Parameters
+        ----------
+        timestamps : ndarray, shape (n,)
+        signal : ndarray, shape (n,)
+
+        Returns
+        -------
+        repetitions : list of tuples
+                (time, amplitude, duration) of each repetition completed in
+                this block; the time is the end of the repetition
+        """
+
+        smoothed = self.lowpass.process(np.reshape(signal, (-1, 1)))[:, 0]
+        repetitions = []
+
+        if self.mean is None and len(smoothed) > 0:
+            self.mean = float(smoothed[0])
+            self.cycle_start = float(timestamps[0])
+
+        # Plain Python-floats are faster than numpy-scalars in this loop
+        alpha, k, min_half = self.alpha, self.k, self.min_amplitude / 2
+        mean, deviation = self.mean, self.deviation
+        for time, value in zip(timestamps.tolist(), smoothed.tolist()):
+            mean += alpha * (value - mean)
+            deviation += alpha * (abs(value - mean) - deviation)
+            half_band = max(k * deviation, min_half)
+
+            if value > self.cycle_max:
+                self.cycle_max = value
+            if value < self.cycle_min:
+                self.cycle_min = value
+
+            if not self.high:
+                if value > mean + half_band:
+                    self.high = True
+            elif value < mean - half_band:
+                self.high = False
+                duration = time - self.cycle_start
+                if duration >= self.min_duration:
+                    self.count += 1
+                    self.last = (time, self.cycle_max - self.cycle_min, duration)
+                    repetitions.append(self.last)
+                    # The next cycle starts here
+                    self.cycle_start = time
+                    self.cycle_max = self.cycle_min = value
+
+        self.mean, self.deviation = mean, deviation
+        return repetitions
+
+
+def count_repetitions(timestamps, signal, rate=None, **kwargs):
+    """Offline counting, with the same algorithm as online
+
+    Parameters
+    ----------
+    timestamps : ndarray, shape (n,)
+    signal : ndarray, shape (n,)
+    rate : float
+            Sample rate [Hz]. Default: from the timestamps
+    kwargs : parameters of "RepetitionCounter"
+
+    Returns
+    -------
+    repetitions : ndarray, shape (n_reps, 3)
+            time, amplitude, and duration of each repetition
+    """
+
+    if rate is None:
+        rate = 1 / np.median(np.diff(timestamps))
+    counter = RepetitionCounter(rate, **kwargs)
+    return np.array(counter.process(timestamps, signal)).reshape((-1, 3))
+
+
+if __name__ == '__main__':
+    # Count the repetitions in a recording: repetitions.py <recording> [<channel-name>]
+    import loader
+    data, header = loader.load(sys.argv[1])
+    channel = sys.argv[2] if len(sys.argv) > 2 else header['columns'][6]
+    column = header['columns'].index(channel)
+    reps = count_repetitions(data[:, 0], data[:, column])
+    print(f'{len(reps)} repetitions in "{channel}"')
+    for ii, (time, amplitude, duration) in enumerate(reps):
+        print(f'{ii+1:3d}: {time - data[0, 0]:7.2f} s, amplitude {amplitude:.3f}, duration {duration:.2f} s')
@@ -0,0 +1,215 @@
+"""
+Resampling onto a uniform timebase
+
+The samples are stored in the order in which they arrive, with the OSC-time
+of their bundle. Wi-Fi jitter and dropped packets make the intervals
+irregular, which disturbs filtering and spectral analysis. "Resampler"
+interpolates the samples onto the exact grid t0 + k/rate:
+
+    - sensor-columns linearly
+    - quaternion-columns with SLERP (see "orientation.slerp")
+
+Gaps (intervals longer than "max_gap") are detected and reported. The grid
+points inside a gap are either set to NaN, or interpolated across the gap.
+
+The resampler keeps the last sample of each block, so that the live stream
+can be processed batch by batch. "resample" processes a complete (e.g.
+memory-mapped) recording in one pass, chunk by chunk.
+
+Example:
+    resampler = Resampler(rate=100, quat_columns=[10])
+    t, values = resampler.process(timestamps, data)
+"""
+
+#   author: Thomas Haslwanter
+#   date:   Oct-2026
+
+import sys
+import numpy as np
+
+import orientation
+
+
+CHUNK_SIZE = 2**16      # samples processed at once, by "resample"
+FILL_TYPES = ['nan', 'interpolate']
+
+
+class Resampler():
+    """Incremental resampling onto the grid t0 + k/rate"""
+
+    def __init__(self, rate, quat_columns=(), max_gap=None, fill='nan'):
+        """
+        Parameters
+        ----------
+        rate : float
+                Sample rate of the grid [Hz]
+        quat_columns : list of integers
+                First column of each quaternion (4 columns, [q0, qx, qy, qz])
+        max_gap : float
+                Longest interval [s] that is not considered a gap. Default:
+                5 sample-periods (up to 4 consecutive missing samples)
+        fill : string
+                Grid-points inside gaps are set to 'nan', or are interpolated
+                across the gap ('interpolate', e.g. for the live filters)
+        """
+
+        if fill not in FILL_TYPES:
+            raise ValueError(f'Do not know fill type {fill}')
+        self.rate = rate
+        self.quat_columns = list(quat_columns)
+        self.max_gap = 5 / rate if max_gap is None else max_gap
+        self.fill = fill
+        self.reset()
+
+
+    def reset(self):
+        """Start a new timebase with the next sample"""
+
+        self.t0 = None          # start of the grid
+        self.n_done = 0         # grid-points already delivered
+        self.last = None        # last sample (time, values) of the previous block
+        self.gaps = []          # (t_start, t_stop) of each gap
+        self.n_dropped = 0      # samples that arrived too late, or twice
+
+
+    def process(self, timestamps, data):
+        """Resample a block
+
+        Parameters
+        ----------
+        timestamps : ndarray, shape (n,)
+                [s], in the order of arrival
+        data : ndarray, shape (n, n_columns)
+
+        Returns
+        -------
+        t : ndarray, shape (m,)
+                The new grid-points, up to the last sample of the block
+        values : ndarray, shape (m, n_columns)
+        """
+
+        timestamps = np.asarray(timestamps, dtype=float)
+        data = np.asarray(data, dtype=float).reshape((len(timestamps), -1))
+        n_columns = data.shape[1]
+        empty = (np.zeros(0), np.zeros((0, n_columns)))
+        if len(timestamps) == 0:
+            return empty
+
+        # Samples in time order; a jump backwards (e.g. a restarted stream)
+        # starts a new timebase
+        if self.last is not None and timestamps.max() < self.last[0] - self.max_gap:
+            self.reset()
+        order = np.argsort(timestamps, kind='stable')
+        timestamps, data = timestamps[order], data[order]
+
+        # Late and duplicate samples are dropped
+        keep = np.concatenate(([True], np.diff(timestamps) > 0))
+        if self.last is not None:
+            keep &= timestamps > self.last[0]
+        self.n_dropped += np.count_nonzero(~keep)
+        timestamps, data = timestamps[keep], data[keep]
+        if len(timestamps) == 0:
+            return empty
+
+        if self.last is not None:
+            timestamps = np.concatenate(([self.last[0]], timestamps))
+            data = np.vstack((self.last[1], data))
+
+        if self.t0 is None:
+            self.t0 = timestamps[0]
+        self.last = (timestamps[-1], data[-1].copy())
+
+        intervals = np.diff(timestamps)
+        is_gap = intervals > self.max_gap
+        self.gaps.extend(zip(timestamps[:-1][is_gap].tolist(), timestamps[1:][is_gap].tolist()))
+
+        # Grid-points are calculated from t0, to avoid accumulating errors
+        n_stop = int(np.floor((timestamps[-1] - self.t0) * self.rate + 1e-6)) + 1
+        if n_stop <= self.n_done:
+            return empty
+        t = self.t0 + np.arange(self.n_done, n_stop) / self.rate
+        self.n_done = n_stop
+
+        # Interval of each grid-point, and position in it
+        if len(timestamps) == 1:
+            return (t, np.tile(data[0], (len(t), 1)))
+        index = np.clip(np.searchsorted(timestamps, t, side='right') - 1, 0, len(timestamps) - 2)
+        fraction = np.clip((t - timestamps[index]) / intervals[index], 0, 1)[:, np.newaxis]
+
+        values = data[index] + fraction * (data[index + 1] - data[index])
+        for column in self.quat_columns:
+            quats = slice(column, column + 4)
+            values[:, quats] = orientation.slerp(data[index, quats], data[index + 1, quats],
+                                                 fraction[:, 0])
+
+        if self.fill == 'nan':
+            values[is_gap[index] & (fraction[:, 0] > 0)] = np.nan
+        return (t, values)
+
+
+def resample(timestamps, data, rate, quat_columns=(), max_gap=None, fill='nan',
+             out=None, chunk_size=CHUNK_SIZE):
+    """Resample a complete recording in one pass
+
+    Parameters
+    ----------
+    timestamps : ndarray, shape (n,)
+    data : ndarray, shape (n, n_columns)
+            Can be memory-mapped: it is read chunk by chunk
+    rate, quat_columns, max_gap, fill : see "Resampler"
+    out : string
+            If given, the result is written to this ".npy"-file (and returned
+            memory-mapped), instead of being kept in memory
+    chunk_size : integer
+
+    Returns
+    -------
+    resampled : ndarray, shape (m, 1+n_columns)
+            Time and resampled values
+    gaps : list of tuples
+            (t_start, t_stop) of each gap
+    """
+
+    resampler = Resampler(rate, quat_columns, max_gap, fill)
+    n = len(timestamps)
+    n_columns = np.shape(data)[1]
+    if n == 0:
+        return (np.zeros((0, 1 + n_columns)), [])
+
+    # The grid covers the first to the last sample (with unsorted samples,
+    # it cannot be longer)
+    n_out = int(np.floor((np.max(timestamps) - np.min(timestamps)) * rate + 1e-6)) + 1
+    if out is None:
+        resampled = np.empty((n_out, 1 + n_columns))
+    else:
+        resampled = np.lib.format.open_memmap(out, mode='w+', dtype=float,
+                                              shape=(n_out, 1 + n_columns))
+
+    n_filled = 0
+    for start in range(0, n, chunk_size):
+        t, values = resampler.process(timestamps[start:start + chunk_size],
+                                      data[start:start + chunk_size])
+        resampled[n_filled:n_filled + len(t), 0] = t
+        resampled[n_filled:n_filled + len(t), 1:] = values
+        n_filled += len(t)
+
+    resampled = resampled[:n_filled]
+    if out is not None:
+        resampled.flush()
+    return (resampled, resampler.gaps)
+
+
+if __name__ == '__main__':
+    # Resample a recording: resample.py <recording> [<rate>]
+    # The result is written to "<recording>_resampled.npy"
+    import loader
+    in_file = sys.argv[1]
+    data, header = loader.load(in_file)
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 1 / np.median(np.diff(data[:, 0]))
+    quat_columns = [ii - 1 for (ii, name) in enumerate(header['columns']) if name == 'Quat 0']
+
+    resampled, gaps = resample(data[:, 0], data[:, 1:], rate, quat_columns,
+                               out=in_file + '_resampled.npy')
+    print(f'{len(data)} samples -> {len(resampled)} samples at {rate:.1f} Hz, {len(gaps)} gaps')
+    for t_start, t_stop in gaps:
+        print(f'    gap at {t_start - data[0, 0]:9.3f} s: {1000*(t_stop - t_start):.0f} ms')
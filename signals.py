@@ -0,0 +1,247 @@
+"""
+Derived signals, defined by expressions
+
+The signals that drive the traffic lights are defined in "settings.yaml"
+(key "light_signals", several signals separated by ";"), e.g.
+
+    light_signals: norm(ax, ay, az); helical(q0, qx, qy, qz); abs(lowpass(gz, 2))
+
+An expression is parsed and checked once, and compiled into a function that
+is evaluated on whole blocks of samples. The variables are the sensor-columns
+(see NAMES); the available functions are listed in FUNCTIONS and STATEFUL.
+The stateful functions (filters, and orientations relative to the start) keep
+their own state for each place where they appear in the expression, so that
+consecutive blocks give a continuous signal.
+"""
+
+#   author: Thomas Haslwanter
+#   date:   Oct-2026
+
+import ast
+import sys
+import numpy as np
+
+import filters
+import orientation
+
+
+# Variable names of the sensor-columns
+NAMES = {'Gyroscope X (deg/s)': 'gx', 'Gyroscope Y (deg/s)': 'gy', 'Gyroscope Z (deg/s)': 'gz',
+         'Accelerometer X (g)': 'ax', 'Accelerometer Y (g)': 'ay', 'Accelerometer Z (g)': 'az',
+         'Magnetometer X (uT)': 'mx', 'Magnetometer Y (uT)': 'my', 'Magnetometer Z (uT)': 'mz',
+         'Barometer (hPa)': 'bar',
+         'Quat 0': 'q0', 'Quat X': 'qx', 'Quat Y': 'qy', 'Quat Z': 'qz',
+         'X': 'x', 'Y': 'y', 'Z': 'z'}
+
+
+def find_columns(columns, names):
+    """Indices of the columns with the given variable names
+
+    Parameters
+    ----------
+    columns : list of strings
+            Column names, e.g. "source.columns"
+    names : list of strings
+            Variable names (see NAMES), e.g. ['ax', 'ay', 'az']
+
+    Returns
+    -------
+    indices : list of integers
+
+    Raises
+    ------
+    ValueError : if one of the variables is not among the columns
+    """
+
+    variables = [NAMES.get(name, name) for name in columns]
+    missing = [name for name in names if name not in variables]
+    if missing:
+        raise ValueError(f'No columns for {", ".join(missing)}')
+    return [variables.index(name) for name in names]
+
+
+def norm(*components):
+    """Length of a vector, e.g. norm(ax, ay, az)"""
+    return np.sqrt(sum(np.square(component) for component in components))
+
+
+def tilt(x, y, z):
+    """Angle [deg] between the vector and the vertical, e.g. tilt(ax, ay, az)"""
+    return np.rad2deg(np.arccos(np.clip(z / np.maximum(norm(x, y, z), 1e-12), -1, 1)))
+
+
+FUNCTIONS = {'abs': np.abs, 'sqrt': np.sqrt, 'sin': np.sin, 'cos': np.cos,
+             'arctan2': np.arctan2, 'degrees': np.rad2deg, 'minimum': np.minimum,
+             'maximum': np.maximum, 'clip': np.clip, 'norm': norm, 'tilt': tilt}
+
+# Allowed numbers of arguments (for the ufuncs, a further argument would be
+# the output-array)
+N_ARGUMENTS = {'abs': (1,), 'sqrt': (1,), 'sin': (1,), 'cos': (1,), 'arctan2': (2,),
+               'degrees': (1,), 'minimum': (2,), 'maximum': (2,), 'clip': (3,),
+               'norm': (1, 2, 3, 4), 'tilt': (3,)}
+
+
+class _Filter():
+    """lowpass(x, cutoff) / highpass(x, cutoff)"""
+
+    def __init__(self, kind, rate, cutoff):
+        self.filter = filters.make_filter(kind, rate, n_channels=1, cutoff=cutoff)
+
+    def __call__(self, x):
+        return self.filter.process(np.reshape(x, (-1, 1)))[:, 0]
+
+
+class _Orientation():
+    """helical(q0, qx, qy, qz) / heading(...) / pitch(...) / roll(...):
+    angles [deg] relative to the orientation at the first sample"""
+
+    def __init__(self, kind, rate):
+        self.kind = kind
+        self.q_ref = None
+
+    def __call__(self, q0, qx, qy, qz):
+        quats = np.column_stack((q0, qx, qy, qz))
+        if self.q_ref is None:
+            self.q_ref = quats[0]
+        relative = orientation.relative(self.q_ref, quats)
+        if self.kind == 'helical':
+            return orientation.to_helical(relative)[0]
+        else:
+            return orientation.to_euler(relative)[:, ['heading', 'pitch', 'roll'].index(self.kind)]
+
+
+# Stateful functions: name -> (class, kind, number of constant arguments)
+STATEFUL = {'lowpass': (_Filter, 'lowpass', 1),
+            'highpass': (_Filter, 'highpass', 1),
+            'helical': (_Orientation, 'helical', 0),
+            'heading': (_Orientation, 'heading', 0),
+            'pitch': (_Orientation, 'pitch', 0),
+            'roll': (_Orientation, 'roll', 0)}
+
+ALLOWED_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name,
+                 ast.Constant, ast.Load, ast.Add, ast.Sub, ast.Mult, ast.Div,
+                 ast.Pow, ast.USub, ast.UAdd)
+
+
+class Expression():
+    """A signal-expression, compiled for the given columns"""
+
+    def __init__(self, text, columns, rate):
+        """
+        Parameters
+        ----------
+        text : string
+                Expression, e.g. "norm(ax, ay, az)"
+        columns : list of strings
+                Column names of the data-blocks
+        rate : float
+                Sample rate [Hz], for the filters
+
+        Raises
+        ------
+        ValueError : if the expression is invalid, or uses unknown names
+        """
+
+        self.text = text.strip()
+        self.columns = list(columns)
+        self.rate = rate
+
+        try:
+            tree = ast.parse(self.text, mode='eval')
+        except SyntaxError as error:
+            raise ValueError(f'Invalid signal "{self.text}": {error.msg}')
+
+        variables = {NAMES.get(name, name): ii for (ii, name) in enumerate(self.columns)}
+        self.used = {}
+        for node in ast.walk(tree):
+            if not isinstance(node, ALLOWED_NODES):
+                raise ValueError(f'"{type(node).__name__}" is not allowed in signal "{self.text}"')
+            if isinstance(node, ast.Call) and not isinstance(node.func, ast.Name):
+                raise ValueError(f'Invalid function call in signal "{self.text}"')
+            if (isinstance(node, ast.Call) and node.func.id in N_ARGUMENTS
+                    and len(node.args) not in N_ARGUMENTS[node.func.id]):
+                raise ValueError(f'Wrong number of arguments for "{node.func.id}" in signal "{self.text}"')
+            if isinstance(node, ast.Name) and node.id not in FUNCTIONS and node.id not in STATEFUL:
+                if node.id not in variables:
+                    raise ValueError(f'Unknown name "{node.id}" in signal "{self.text}"')
+                self.used[node.id] = variables[node.id]
+
+        # Stateful calls are replaced by calls of their own instances
+        self.factories = []
+        tree = ast.fix_missing_locations(_StatefulCalls(self).visit(tree))
+
+        self.code = compile(tree, '<signal>', 'eval')
+
+        # Errors that only show up when the expression is evaluated (e.g. wrong
+        # numbers of arguments of the stateful functions) are found with a trial run
+        self.reset()
+        try:
+            self.evaluate(np.ones((2, len(self.columns))))
+        except Exception as error:
+            raise ValueError(f'Invalid signal "{self.text}": {error}')
+        self.reset()
+
+
+    def reset(self):
+        """Restart the filters, and the reference orientations"""
+        self.stateful = [factory() for factory in self.factories]
+
+
+    def evaluate(self, data):
+        """Signal for a block of samples
+
+        Parameters
+        ----------
+        data : ndarray, shape (n, len(columns))
+
+        Returns
+        -------
+        signal : ndarray, shape (n,)
+        """
+
+        namespace = dict(FUNCTIONS)
+        namespace['_stateful'] = self.stateful
+        for name, column in self.used.items():
+            namespace[name] = data[:, column]
+        result = eval(self.code, {'__builtins__': {}}, namespace)
+        return np.broadcast_to(np.asarray(result, dtype=float), (len(data),))
+
+
+class _StatefulCalls(ast.NodeTransformer):
+    """Replace "lowpass(x, 5)" by "_stateful[i](x)", with a separate filter for each call"""
+
+    def __init__(self, expression):
+        self.expression = expression
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        if not (isinstance(node.func, ast.Name) and node.func.id in STATEFUL):
+            return node
+
+        cls, kind, n_constants = STATEFUL[node.func.id]
+        n_signals = len(node.args) - n_constants
+        try:
+            constants = [ast.literal_eval(arg) for arg in node.args[n_signals:]]
+        except ValueError:
+            raise ValueError(f'The parameters of "{node.func.id}" must be numbers')
+        rate = self.expression.rate
+        self.expression.factories.append(lambda: cls(kind, rate, *constants))
+
+        index = len(self.expression.factories) - 1
+        func = ast.Subscript(value=ast.Name(id='_stateful', ctx=ast.Load()),
+                             slice=ast.Constant(value=index), ctx=ast.Load())
+        return ast.Call(func=func, args=node.args[:n_signals], keywords=[])
+
+
+def parse_signals(text, columns, rate):
+    """Expressions from the settings ("expression; expression; ...")"""
+    return [Expression(part, columns, rate) for part in text.split(';') if part.strip()]
+
+
+if __name__ == '__main__':
+    # Evaluate a signal on a recording: signals.py <recording> <expression>
+    import loader
+    data, header = loader.load(sys.argv[1])
+    rate = 1 / np.median(np.diff(data[:, 0]))
+    signal = Expression(sys.argv[2], header['columns'][1:], rate).evaluate(data[:, 1:])
+    print(f'{sys.argv[2]}: min {np.nanmin(signal):.3f}, max {np.nanmax(signal):.3f}, mean {np.nanmean(signal):.3f}')
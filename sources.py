@@ -0,0 +1,258 @@
+"""
+Streaming sources of sensor data
+
+All sources share the same, batch-oriented interface, so that the same
+buffering, display, and recording code can be used for each of them:
+
+    source.start()
+    timestamps, data = source.read()    # everything received since the last call
+    source.stop()
+
+"timestamps" has the shape (n,), and "data" the shape (n, len(source.columns)).
+"read" never blocks; if nothing new has arrived, n is 0.
+
+Available sources:
+    - NGIMUSource : NGIMU-sensor via UDP/OSC (see "ngimu.py")
+    - MetaWearSource : one module (e.g. the accelerometer) of a MetaWear-sensor
+    - ReplaySource : a previous recording, played back in real time
+"""
+
+#   author: Thomas Haslwanter
+#   date:   Oct-2026
+
+import sys
+import time
+import numpy as np
+
+import ngimu
+import loader
+import recording
+from buffers import SampleQueue
+from metawear_adapter import read_sample
+
+
+class Source():
+    """Base class of the streaming sources"""
+
+    columns = []
+    decode_time = 0.        # mean decoding time per sample [s]
+
+    def start(self):
+        """Start the data acquisition"""
+        pass
+
+
+    def read(self):
+        """All samples received since the last call
+
+        Returns
+        -------
+        timestamps : ndarray, shape (n,)
+                Time of each sample [s]
+        data : ndarray, shape (n, n_columns)
+        """
+        raise NotImplementedError
+
+
+    def stop(self):
+        """Stop the data acquisition"""
+        pass
+
+
+    def close(self):
+        """Stop, and release the resources"""
+        self.stop()
+
+
+    def _empty(self):
+        return (np.zeros(0), np.zeros((0, len(self.columns))))
+
+
+class NGIMUSource(Source):
+    """NGIMU-sensor, delivering "/sensors" and "/quaternion" in each bundle
+
+    Columns: gyroscope (3), accelerometer (3), magnetometer (3), barometer,
+    and quaternion (4); the timestamps are the OSC-timetags [s since 1900].
+    """
+
+    columns = recording.COLUMNS[1:]
+
+    def __init__(self, sensor):
+        """
+        Parameters
+        ----------
+        sensor : ngimu.Sensor
+                Connected sensor
+        """
+
+        self.sensor = sensor
+        self.rows = np.empty((64, 1 + len(self.columns)))
+
+
+    def read(self):
+        """Decode all datagrams waiting in the socket"""
+
+        n = 0
+        decode_time = 0.
+        while True:
+            try:
+                packet, addr = self.sensor.socket.recvfrom(self.sensor.packetsize)
+            except OSError:
+                # nothing left, or e.g. a connection-reset (ICMP port-unreachable under Windows)
+                break
+
+            start = time.perf_counter()
+            messages = ngimu.decode(packet)
+            decode_time += time.perf_counter() - start
+
+            if len(messages) < 2 or len(messages[0]) != 12 or len(messages[1]) != 6:
+                continue        # not a complete data-bundle
+
+            if n == len(self.rows):
+                self.rows = np.vstack((self.rows, np.empty_like(self.rows)))
+            self.rows[n, 0] = messages[0][0]
+            self.rows[n, 1:11] = messages[0][2:]
+            self.rows[n, 11:] = messages[1][2:]
+            n += 1
+
+        if n == 0:
+            return self._empty()
+        self.decode_time = decode_time / n
+        block = self.rows[:n].copy()
+        return (block[:, 0], block[:, 1:])
+
+
+    def close(self):
+        self.sensor.close()
+
+
+class MetaWearSource(Source):
+    """One module of a MetaWear-sensor
+
+    The notifications of pymetawear arrive in a thread of the Bluetooth-
+    library. They are only queued there, and collected by "read".
+    Timestamps are the epochs of the samples [s since 1970]. The columns have
+    the same names as the corresponding NGIMU-columns.
+    """
+
+    # Columns of the modules
+    MODULES = {'accelerometer': recording.COLUMNS[4:7],
+               'gyroscope': recording.COLUMNS[1:4]}
+
+    def __init__(self, client, module='accelerometer'):
+        """
+        Parameters
+        ----------
+        client : pymetawear.client.MetaWearClient
+                Connected sensor
+        module : string
+                'accelerometer' or 'gyroscope'
+        """
+
+        self.columns = self.MODULES[module]
+        self.module = getattr(client, module)
+        self.sample = np.empty(4)  # epoch, x, y, z of the latest sample
+        self.queue = SampleQueue(4)
+
+
+    def start(self):
+        self.module.notifications(self._callback)
+
+
+    def stop(self):
+        self.module.notifications(None)
+
+
+    def _callback(self, data):
+        """Sensor-callback: only queue the sample"""
+        self.queue.put(read_sample(data, self.sample))
+
+
+    def read(self):
+        batch = self.queue.drain()
+        return (batch[:, 0], batch[:, 1:])
+
+
+class ReplaySource(Source):
+    """Play back a recording
+
+    The samples are released at the speed at which they have been recorded
+    (or faster/slower, with "speed"), based on their timestamps. When looping,
+    each pass is shifted in time, so that the timestamps keep increasing.
+    """
+
+    def __init__(self, filename, speed=1., loop=False, time_column=0):
+        """
+        Parameters
+        ----------
+        filename : string
+                Text- or binary recording (see "loader.load")
+        speed : float
+                Playback speed, relative to the recording
+        loop : boolean
+                Start again at the end of the recording
+        time_column : integer
+                Column with the timestamps
+        """
+
+        data, header = loader.load(filename)
+        self.header = header
+        self.timestamps = np.asarray(data[:, time_column])
+        self.data = np.delete(data, time_column, axis=1)
+        self.columns = [name for (ii, name) in enumerate(header['columns'])
+                        if ii != time_column]
+
+        # Duration of one pass, including the interval to the next sample
+        if len(self.timestamps) > 1:
+            self.period = (self.timestamps[-1] - self.timestamps[0] +
+                           np.median(np.diff(self.timestamps)))
+        else:
+            self.period = 0.
+
+        self.speed = speed
+        self.loop = loop
+        self.ptr = 0
+        self.offset = 0.        # time-shift of the current pass [s]
+        self.t_start = None
+
+
+    @property
+    def finished(self):
+        return self.ptr == len(self.timestamps) and not self.loop
+
+
+    def start(self):
+        self.ptr = 0
+        self.offset = 0.
+        self.t_start = time.monotonic()
+
+
+    def stop(self):
+        self.t_start = None
+
+
+    def read(self):
+        if self.t_start is None or len(self.timestamps) == 0:
+            return self._empty()
+
+        if self.ptr == len(self.timestamps) and self.loop and self.period > 0:
+            # The next pass continues where the previous one has ended
+            self.ptr = 0
+            self.offset += self.period
+            self.t_start += self.period / self.speed
+
+        elapsed = (time.monotonic() - self.t_start) * self.speed
+        stop = np.searchsorted(self.timestamps, self.timestamps[0] + elapsed, side='right')
+        start, self.ptr = self.ptr, max(stop, self.ptr)
+        return (self.timestamps[start:self.ptr] + self.offset,
+                np.asarray(self.data[start:self.ptr]))
+
+
+if __name__ == '__main__':
+    # Play back the recording given on the command line, and show the batch sizes
+    source = ReplaySource(sys.argv[1])
+    source.start()
+    while not source.finished:
+        time.sleep(0.1)
+        timestamps, data = source.read()
+        print(f'{len(timestamps)} samples, {data.shape[1]} columns')
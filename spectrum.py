@@ -0,0 +1,275 @@
+"""
+Power spectra (Welch), live and offline, e.g. for tremor
+
+"WelchSpectrum" averages the periodograms of the last overlapping segments of
+the live signal. Every segment is transformed only once: a new block of
+samples only adds the segments that it completes, and the oldest ones drop
+out of the average. The window, the scaling, and the frequencies are computed
+once; since the segment-length stays the same, numpy re-uses its FFT-set-up
+from call to call. The band power in configurable frequency bands (see
+"parse_bands") is then a sum over the averaged spectrum.
+
+"spectrogram" computes the periodograms of a complete recording, chunk by
+chunk, so that it also works on memory-mapped data (e.g. from
+"resample.resample"), and can write the result to a memory-mapped file.
+
+Only numpy is used. The signals must have a uniform timebase, see
+"resample.py".
+
+Example:
+    spectrum = WelchSpectrum(rate=100, segment=256, n_channels=1)
+    if spectrum.process(new_data):
+        power = band_power(spectrum.freqs, spectrum.psd, [(3, 7), (7, 12)])
+"""
+
+#   author: Thomas Haslwanter
+#   date:   Oct-2026
+
+import re
+import sys
+import numpy as np
+
+
+WINDOWS = {'hann': np.hanning, 'hamming': np.hamming, 'boxcar': np.ones}
+CHUNK_SIZE = 2**16      # samples processed at once, by "spectrogram"
+
+
+def _setup(rate, segment, window):
+    """Window, scale-factor (one-sided power spectral density), and frequencies"""
+
+    if window not in WINDOWS:
+        raise ValueError(f'Do not know window {window}')
+    taper = WINDOWS[window](segment)
+    scale = 1 / (rate * np.sum(taper**2))
+    freqs = np.fft.rfftfreq(segment, 1 / rate)
+    return (taper, scale, freqs)
+
+
+def periodograms(segments, taper, scale):
+    """Power spectral densities of segments
+
+    Parameters
+    ----------
+    segments : ndarray, shape (n_segments, segment, n_channels)
+    taper : ndarray, shape (segment,)
+            Window
+    scale : float
+            see "_setup"
+
+    Returns
+    -------
+    psd : ndarray, shape (n_segments, n_freqs, n_channels)
+            One-sided; the mean of each segment is removed
+    """
+
+    segments = segments - np.mean(segments, axis=1, keepdims=True)
+    spectra = np.fft.rfft(segments * taper[:, np.newaxis], axis=1)
+    psd = scale * (spectra.real**2 + spectra.imag**2)
+
+    # One-sided: all frequencies except DC (and Nyquist, for even lengths) count twice
+    n_double = psd.shape[1] - 1 if segments.shape[1] % 2 else psd.shape[1] - 2
+    psd[:, 1:1 + n_double] *= 2
+    return psd
+
+
+def _segments(x, segment, step):
+    """View of the overlapping segments of x, shape (n_segments, segment, n_channels)"""
+
+    windows = np.lib.stride_tricks.sliding_window_view(x, segment, axis=0)[::step]
+    return np.swapaxes(windows, 1, 2)
+
+
+class WelchSpectrum():
+    """Running average of the periodograms of the last overlapping segments"""
+
+    def __init__(self, rate, segment=256, overlap=0.5, n_average=8, n_channels=1,
+                 window='hann'):
+        """
+        Parameters
+        ----------
+        rate : float
+                Sample rate [Hz]
+        segment : integer
+                Samples per segment; the frequency resolution is rate/segment
+        overlap : float
+                Overlap of consecutive segments (0 ... <1)
+        n_average : integer
+                Number of segments that are averaged
+        n_channels : integer
+        window : string
+                One of WINDOWS
+        """
+
+        self.rate = rate
+        self.segment = segment
+        self.step = max(1, int(round(segment * (1 - overlap))))
+        self.n_average = n_average
+        self.n_channels = n_channels
+        self.taper, self.scale, self.freqs = _setup(rate, segment, window)
+        self.reset()
+
+
+    def reset(self):
+        """Forget all segments"""
+
+        self.history = np.zeros((0, self.n_channels))   # samples from the start of the next segment
+        self.stored = np.zeros((self.n_average, len(self.freqs), self.n_channels))
+        self.n_stored = 0
+        self.index = 0          # position of the next periodogram in "stored"
+
+
+    def process(self, data):
+        """Add a block of samples
+
+        Parameters
+        ----------
+        data : ndarray, shape (n, n_channels) or (n,)
+
+        Returns
+        -------
+        n_new : integer
+                Number of new segments (0: the spectrum is unchanged)
+        """
+
+        data = np.asarray(data, dtype=float).reshape((-1, self.n_channels))
+        x = np.vstack((self.history, data))
+        if len(x) < self.segment:
+            self.history = x
+            return 0
+
+        n_new = (len(x) - self.segment) // self.step + 1
+        self.history = x[n_new * self.step:]
+
+        # Segments that would drop out of the average right away are skipped
+        first = max(0, n_new - self.n_average)
+        psd = periodograms(_segments(x, self.segment, self.step)[first:n_new],
+                           self.taper, self.scale)
+        rows = (self.index + np.arange(len(psd))) % self.n_average
+        self.stored[rows] = psd
+        self.index = (self.index + len(psd)) % self.n_average
+        self.n_stored = min(self.n_stored + len(psd), self.n_average)
+        return n_new
+
+
+    @property
+    def psd(self):
+        """Averaged power spectral density, shape (n_freqs, n_channels); None without segments"""
+
+        if self.n_stored == 0:
+            return None
+        return np.mean(self.stored[:self.n_stored], axis=0)
+
+
+def parse_bands(text):
+    """Frequency bands from the settings, e.g. "3-7; 7-12" -> [(3., 7.), (7., 12.)]"""
+
+    bands = []
+    for part in text.split(';'):
+        if part.strip():
+            match = re.fullmatch(r'\s*([\d.]+)\s*-\s*([\d.]+)\s*', part)
+            if match is None or float(match.group(1)) >= float(match.group(2)):
+                raise ValueError(f'Invalid frequency band "{part.strip()}"')
+            bands.append((float(match.group(1)), float(match.group(2))))
+    return bands
+
+
+def band_power(freqs, psd, bands):
+    """Power in frequency bands
+
+    Parameters
+    ----------
+    freqs : ndarray, shape (n_freqs,)
+    psd : ndarray, shape (..., n_freqs, n_channels)
+    bands : list of tuples
+            (f_low, f_high) [Hz]; f_low is included, f_high is not
+
+    Returns
+    -------
+    power : ndarray, shape (..., n_bands, n_channels)
+    """
+
+    df = freqs[1] - freqs[0]
+    masks = np.array([(freqs >= low) & (freqs < high) for (low, high) in bands], dtype=float)
+    return df * np.einsum('bf,...fc->...bc', masks, psd)
+
+
+def peak_frequency(freqs, psd, f_min=0., f_max=np.inf):
+    """Frequency with the highest power between f_min and f_max, for each channel"""
+
+    selected = (freqs >= f_min) & (freqs <= f_max)
+    return freqs[selected][np.argmax(psd[..., selected, :], axis=-2)]
+
+
+def spectrogram(data, rate, segment=256, overlap=0.5, window='hann', out=None,
+                chunk_size=CHUNK_SIZE):
+    """Spectrogram of a complete recording, chunk by chunk
+
+    Parameters
+    ----------
+    data : ndarray, shape (n, n_channels)
+            Uniformly sampled; can be memory-mapped
+    rate, segment, overlap, window : see "WelchSpectrum"
+    out : string
+            If given, the spectrogram is written to this ".npy"-file (and
+            returned memory-mapped), instead of being kept in memory
+    chunk_size : integer
+            Approximate number of samples read at once
+
+    Returns
+    -------
+    times : ndarray, shape (n_segments,)
+            Centers of the segments [s], from the first sample
+    freqs : ndarray, shape (n_freqs,)
+    psd : ndarray, shape (n_segments, n_freqs, n_channels)
+    """
+
+    taper, scale, freqs = _setup(rate, segment, window)
+    step = max(1, int(round(segment * (1 - overlap))))
+    n, n_channels = np.shape(data)
+    n_segments = max(0, (n - segment) // step + 1)
+    times = (np.arange(n_segments) * step + segment / 2) / rate
+
+    shape = (n_segments, len(freqs), n_channels)
+    if out is None:
+        psd = np.empty(shape)
+    else:
+        psd = np.lib.format.open_memmap(out, mode='w+', dtype=float, shape=shape)
+
+    per_chunk = max(1, chunk_size // step)
+    for first in range(0, n_segments, per_chunk):
+        last = min(first + per_chunk, n_segments)
+        x = np.asarray(data[first * step:(last - 1) * step + segment], dtype=float)
+        psd[first:last] = periodograms(_segments(x, segment, step), taper, scale)
+
+    if out is not None:
+        psd.flush()
+    return (times, freqs, psd)
+
+
+if __name__ == '__main__':
+    # Spectrogram of a recording: spectrum.py <recording> [<signal>] [<bands>]
+    # The spectrogram is written to "<recording>_spectrogram.npy"
+    import loader
+    import resample
+    import signals
+
+    in_file = sys.argv[1]
+    expression = sys.argv[2] if len(sys.argv) > 2 else 'norm(gx, gy, gz)'
+    bands = parse_bands(sys.argv[3] if len(sys.argv) > 3 else '0.5-3; 3-7; 7-12')
+
+    data, header = loader.load(in_file)
+    rate = 1 / np.median(np.diff(data[:, 0]))
+    columns = header['columns'][1:]
+    quat_columns = [ii for (ii, name) in enumerate(columns) if name == 'Quat 0']
+    uniform, gaps = resample.resample(data[:, 0], data[:, 1:], rate, quat_columns,
+                                      fill='interpolate', out=in_file + '_resampled.npy')
+    signal = signals.Expression(expression, columns, rate).evaluate(uniform[:, 1:])
+
+    segment = int(2**np.round(np.log2(2.56 * rate)))
+    times, freqs, psd = spectrogram(signal[:, np.newaxis], rate, segment,
+                                    out=in_file + '_spectrogram.npy')
+    mean_psd = np.mean(psd, axis=0)
+    print(f'{expression}: {len(times)} segments of {segment / rate:.2f} s, '
+          f'peak at {peak_frequency(freqs, mean_psd, f_min=0.5)[0]:.2f} Hz')
+    for (low, high), power in zip(bands, band_power(freqs, mean_psd, bands)[:, 0]):
+        print(f'    {low:5.1f} - {high:5.1f} Hz: {power:.4g}')
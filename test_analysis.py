@@ -0,0 +1,48 @@
+import numpy as np
+import analysis
+import orientation
+import recording
+from test_loader import write_dat
+
+def session(duration=30., rate=50.):
+    """Recording with repetitions about the x-axis"""
+    t = np.arange(0, duration, 1/rate)
+    angle = 30 * np.sin(2*np.pi*t/3)
+    data = np.zeros((len(t), 15))
+    data[:, 0] = t
+    data[:, 1] = np.gradient(angle, t)                          # gyroscope x
+    data[:, 5:7] = np.column_stack((np.sin(np.deg2rad(angle)), np.cos(np.deg2rad(angle))))
+    data[:, 11:15] = orientation.from_axis_angle([1, 0, 0], angle)
+    return data
+
+def test_summary():
+    data = session()
+    header = {'columns': recording.COLUMNS}
+    result = analysis.analyze(data, header, rep_channel='Accelerometer Y (g)')
+    assert(np.isclose(result['rom_roll'], 60, atol=0.5))
+    assert(np.isclose(result['rom_helical'], 30, atol=0.5))
+    assert(np.isclose(result['peak_angular_velocity'], 20*np.pi, rtol=0.01))
+    assert(result['repetitions'] == 10)
+
+    # Live: in small batches
+    live = analysis.SessionSummary(recording.COLUMNS[1:], rate=50., rep_channel='Accelerometer Y (g)')
+    for ii in range(0, len(data), 9):
+        live.update(data[ii:ii+9, 0], data[ii:ii+9, 1:])
+    for name in analysis.FIELDS:
+        assert(np.isclose(live.result()[name], result[name]))
+
+def test_directory(tmp_path):
+    for ii in range(3):
+        write_dat(str(tmp_path / f'2026101{ii}_10-00-00_test.dat'), session(duration=10.+ii))
+    rows, n_analyzed = analysis.analyze_directory(str(tmp_path), settings={}, n_workers=2)
+    assert(len(rows) == 3 and n_analyzed == 3)
+    assert(np.isclose(rows[2]['duration'], 12 - 0.02))
+
+    # Only changed recordings are analyzed again
+    write_dat(str(tmp_path / '20261010_10-00-00_test.dat'), session(duration=20.))
+    rows, n_analyzed = analysis.analyze_directory(str(tmp_path), settings={}, n_workers=2)
+    assert(n_analyzed == 1)
+    assert(np.isclose(rows[0]['duration'], 20 - 0.02))
+
+    analysis.write_summary(rows, str(tmp_path / 'summary.csv'))
+    assert(len(open(tmp_path / 'summary.csv').readlines()) == 4)
@@ -0,0 +1,95 @@
+import os
+import numpy as np
+import buffers
+
+def test_chunked_buffer():
+    data = np.random.randn(1000, 3)
+    buf = buffers.ChunkedBuffer(3, chunk_size=64, max_chunks=None)
+    for row in data[:500]:
+        buf.append(row)
+    buf.extend(data[500:])
+
+    assert(len(buf) == 1000)
+    assert(np.all(buf.to_array() == data))
+
+def test_spill(tmp_path):
+    data = np.random.randn(1000, 3)
+    buf = buffers.ChunkedBuffer(3, chunk_size=64, max_chunks=2, spill_dir=str(tmp_path))
+    buf.extend(data)
+
+    assert(len(buf.chunks) == 2)
+    assert(len(buf) == 1000)
+    assert(np.all(buf.to_array() == data))
+    assert(len(os.listdir(tmp_path)) == 1)
+    buf.clear()
+    assert(os.listdir(tmp_path) == [])
+
+    # A buffer that is not closed explicitly deletes its file when it is released
+    buf.extend(data)
+    assert(len(os.listdir(tmp_path)) == 1)
+    del buf
+    assert(os.listdir(tmp_path) == [])
+
+def test_sample_queue():
+    import threading
+    queue = buffers.SampleQueue(4)
+    row = np.empty(4)
+
+    def produce():
+        for ii in range(10000):
+            row[:] = ii
+            queue.put(row)
+
+    thread = threading.Thread(target=produce)
+    thread.start()
+    batches = []
+    while thread.is_alive() or len(queue) > 0:
+        batches.append(queue.drain())
+    thread.join()
+    batches.append(queue.drain())
+
+    data = np.vstack(batches)
+    assert(data.shape == (10000, 4))
+    assert(np.all(data[:, 0] == np.arange(10000)))
+
+def test_aligned_buffer():
+    # Two devices with different clocks, sampling a ramp (value = time)
+    rate = 50.
+    t1 = 10 + np.arange(500) / rate
+    t2 = 10.013 + np.arange(480) / 48.
+    aligned = buffers.AlignedBuffer(2, 1, rate)
+
+    # Deliver the data in irregular batches
+    for start in range(0, 500, 37):
+        aligned.add(0, np.column_stack((t1, t1))[start:start+37])
+        aligned.add(1, np.column_stack((t2, t2))[start:start+23])
+    aligned.add(1, np.column_stack((t2, t2))[np.arange(480) >= 14*23])
+
+    data = aligned.to_array()
+    assert(data[0, 0] == t2[0])
+    assert(data[-1, 0] <= min(t1[-1], t2[-1]))
+    assert(np.allclose(np.diff(data[:, 0]), 1/rate))
+    assert(np.allclose(data[:, 1], data[:, 0]))
+    assert(np.allclose(data[:, 2], data[:, 0]))
+
+    # Without storing, the same rows are only returned
+    streamed = buffers.AlignedBuffer(2, 1, rate, store=False)
+    rows = []
+    for start in range(0, 500, 37):
+        rows.append(streamed.add(0, np.column_stack((t1, t1))[start:start+37]))
+        rows.append(streamed.add(1, np.column_stack((t2, t2))[start:start+23]))
+    rows.append(streamed.add(1, np.column_stack((t2, t2))[np.arange(480) >= 14*23]))
+    assert(len(streamed) == 0)
+    assert(np.all(np.vstack(rows) == data))
+
+def test_ring_buffer():
+    data = np.random.randn(1000, 2)
+    ring = buffers.RingBuffer(100, 2)
+    for start in range(0, 1000, 33):
+        ring.extend(data[start:start+33])
+        stop = min(start+33, 1000)
+        assert(np.all(ring.view()[-min(stop, 100):] == data[max(stop-100, 0):stop]))
+
+    ring.extend(data[:250])
+    assert(np.all(ring.view() == data[150:250]))
+    assert(ring.n_total == 1250)
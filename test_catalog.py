@@ -0,0 +1,58 @@
+import os
+import numpy as np
+
+import recording
+from catalog import Catalog
+from test_loader import write_dat
+
+
+def make_recordings(data_dir):
+    data = np.column_stack((np.arange(300) / 100., np.random.randn(300, 14)))
+    rec_file = str(data_dir / '20261019_10-11-12_Mustermann.jrec')
+    writer = recording.RecordingWriter(rec_file, subject='Mustermann, Max',
+                                       experimentor='Doe, John', sample_rate=100)
+    writer.write(data)
+    writer.close()
+    recording.export_csv(rec_file)          # the same session, as CSV
+
+    dat_file = str(data_dir / '20261020_09-00-00_Roe.dat')
+    write_dat(dat_file, data[:100])
+    return (rec_file, dat_file, data)
+
+
+def test_scan(tmp_path):
+    rec_file, dat_file, data = make_recordings(tmp_path)
+    cat = Catalog(str(tmp_path))
+    assert(cat.scan() == (2, 0))
+
+    sessions = cat.sessions()
+    assert([session['path'] for session in sessions] == [rec_file, dat_file])
+    assert(sessions[0]['subject'] == 'Mustermann, Max' and sessions[0]['n_samples'] == 300)
+    assert(np.isclose(sessions[0]['duration'], 2.99))
+    assert(sessions[1]['n_samples'] is None)        # only the header has been read
+    assert(len(cat.sessions(subject='Mustermann, Max')) == 2)
+    assert(len(cat.sessions(subject='Roe, Richard')) == 0)
+    assert(len(cat.sessions(start='2026-10-20')) == 1)
+    assert(len(cat.sessions(stop='2026-10-19')) == 1)
+
+    # Statistics on demand
+    stats = cat.channel_stats(dat_file)
+    assert(np.isclose(stats['Gyroscope X (deg/s)']['mean'], np.mean(data[:100, 1])))
+    assert(cat.sessions(start='2026-10-20')[0]['n_samples'] == 100)
+    cat.close()
+
+
+def test_rescan(tmp_path):
+    rec_file, dat_file, data = make_recordings(tmp_path)
+    cat = Catalog(str(tmp_path))
+    cat.scan(with_stats=True)
+    assert(len(cat.channel_stats(rec_file)) == 15)
+    assert(cat.scan() == (0, 0))
+
+    # Changed and deleted files
+    write_dat(dat_file, data[:50])
+    os.utime(dat_file, ns=(0, 0))
+    os.remove(rec_file)
+    assert(cat.scan() == (2, 1))        # the CSV-export is now a session of its own
+    assert(len(cat.sessions()) == 2)
+    cat.close()
@@ -0,0 +1,30 @@
+import yaml
+
+from config import Config
+
+
+def test_notifications(tmp_path):
+    settings_file = tmp_path / 'settings.yaml'
+    with open(settings_file, 'w') as fh:
+        yaml.dump({'lower_thresh': 0.3, 'upper_thresh': 0.7, 'topColor': 'red'}, fh)
+    settings = Config(str(settings_file))
+
+    everything, thresholds = [], []
+    settings.subscribe(everything.append)
+    settings.subscribe(thresholds.append, keys=['lower_thresh', 'upper_thresh'])
+
+    assert(settings.update({'topColor': 'blue', 'upper_thresh': 0.7}) == {'topColor'})
+    assert(everything == [{'topColor'}] and thresholds == [])
+
+    settings.update({'upper_thresh': 0.8})
+    assert(thresholds == [{'upper_thresh'}])
+    assert(settings['upper_thresh'] == 0.8 and dict(**settings)['topColor'] == 'blue')
+
+    # Reading the file again restores the saved values
+    settings.load()
+    assert(settings['upper_thresh'] == 0.7)
+    assert(everything[-1] == {'topColor', 'upper_thresh'})
+
+    settings.update({'lower_thresh': 0.2})
+    settings.save()
+    assert(Config(str(settings_file))['lower_thresh'] == 0.2)
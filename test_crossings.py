@@ -0,0 +1,44 @@
+import numpy as np
+
+import events
+from crossings import CrossingDetector, detect_crossings, zone_summary
+
+
+def test_interpolation():
+    # Triangle 0 -> 1 -> 0, sampled at 10 Hz: crossings between the samples
+    t = np.arange(21) / 10
+    signal = 1 - np.abs(t - 1)
+    records = detect_crossings(t, signal, lower=0.25, upper=0.75)
+
+    names = [events.KINDS[kind] for kind in records['kind']]
+    assert(names == ['zone', 'lower_rising', 'upper_rising', 'upper_falling',
+                     'lower_falling', 'stop'])
+    assert(np.allclose(records['time'][1:5], [0.25, 0.75, 1.25, 1.75]))
+    assert(np.all(records['value'] == [0, 1, 2, 1, 0, 0]))
+
+
+def test_blockwise():
+    t = np.arange(0, 30, 0.01)
+    signals = np.column_stack((np.abs(np.sin(t)), np.abs(np.cos(2*t))))
+    offline = detect_crossings(t, signals, lower=0.3, upper=0.7)
+
+    detector = CrossingDetector(lower=0.3, upper=0.7, n_signals=2)
+    online = [detector.process(t[ii:ii+13], signals[ii:ii+13]) for ii in range(0, len(t), 13)]
+    online = np.concatenate(online + [detector.stop()])
+    assert(len(online) == len(offline))
+    for channel in [0, 1]:
+        assert(np.allclose(online['time'][online['channel'] == channel],
+                           offline['time'][offline['channel'] == channel]))
+
+
+def test_zone_summary():
+    t = np.arange(0, 30, 0.001)
+    signal = np.abs(np.sin(t))
+    summary = zone_summary(detect_crossings(t, signal, lower=0.3, upper=0.7))[0]
+
+    # Same times as from the samples
+    zones = (signal > 0.3).astype(int) + (signal > 0.7)
+    for zone, name in enumerate(['time_below', 'time_between', 'time_above']):
+        assert(np.isclose(summary[name], 0.001 * np.count_nonzero(zones[:-1] == zone), atol=0.01))
+    assert(summary['excursions_above'] == 10)
+    assert(summary['excursions_below'] == 9)
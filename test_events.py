@@ -0,0 +1,19 @@
+import numpy as np
+
+import events
+
+
+def test_events(tmp_path):
+    filename = str(tmp_path / 'test.jevt')
+    writer = events.EventWriter(filename, channels=['X', 'Y'])
+    writer.write(1.5, 'repetition', 'Y', 0.8, 2.5)
+    writer.write(4.0, 'repetition', 0, 0.7, 2.4)
+    writer.close()
+
+    with open(filename, 'ab') as fh:
+        fh.write(b'\x00' * 5)      # incomplete record
+    data, header = events.read_events(filename)
+    assert(header['channels'] == ['X', 'Y'])
+    assert(len(data) == 2)
+    assert(data['channel'][0] == 1)
+    assert(np.allclose(data['time'], [1.5, 4.0]))
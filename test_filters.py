@@ -0,0 +1,29 @@
+import numpy as np
+import filters
+
+def test_blockwise():
+    # Filtering in irregular blocks must give the same result as in one go
+    data = np.random.randn(1000, 3)
+    for kind in filters.FILTER_TYPES:
+        stage = filters.make_filter(kind, rate=100, n_channels=3)
+        offline = stage.process(data)
+        stage.reset()
+        live = np.vstack([stage.process(block) for block in np.array_split(data, 137)])
+        assert(np.allclose(live, offline))
+
+def test_biquad():
+    data = np.random.randn(500, 1)
+    lp = filters.lowpass(5, 100, 1)
+    reference = lp._simulate(data[:, 0], np.zeros(4))
+    assert(np.allclose(lp.process(data)[:, 0], reference))
+
+    # DC is passed by the lowpass, and removed by the highpass
+    dc = np.ones((2000, 1))
+    assert(np.isclose(filters.lowpass(5, 100, 1).process(dc)[-1, 0], 1))
+    assert(np.abs(filters.highpass(0.5, 100, 1).process(dc)[-1, 0]) < 1e-6)
+
+def test_rms():
+    data = np.random.randn(300, 1)
+    rms = filters.MovingRMS(10, 1).process(data)
+    reference = np.sqrt(np.convolve(np.r_[np.zeros(9), data[:, 0]**2], np.ones(10)/10, 'valid'))
+    assert(np.allclose(rms[:, 0], reference))
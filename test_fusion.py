@@ -0,0 +1,53 @@
+import numpy as np
+import fusion
+import orientation
+
+def static(q_true, n=6000):
+    """Accelerometer and magnetometer readings of a sensor at rest"""
+    R = orientation.to_rotmat(q_true)[0]
+    acc = np.tile(R.T @ [0, 0, 1], (n, 1))
+    mag = np.tile(R.T @ [0.5, 0, -0.8], (n, 1))
+    return (acc, np.zeros((n, 3)), mag)
+
+def test_static():
+    q_true = orientation.from_axis_angle([1, 0.5, 0.3], 40)
+    R_true = orientation.to_rotmat(q_true)[0]
+    acc, gyr, mag = static(q_true)
+    for method in fusion.METHODS:
+        # Gravity only: the tilt is found
+        quats = fusion.fuse(acc, gyr, rate=100, method=method)
+        assert(np.allclose(orientation.to_rotmat(quats[-1])[0][2], R_true[2], atol=1e-2))
+
+        # With the magnetometer, also the heading
+        quats = fusion.fuse(acc, gyr, rate=100, mag=mag, method=method)
+        assert(np.allclose(orientation.to_rotmat(quats[-1])[0], R_true, atol=1e-2))
+
+def test_rotation():
+    # Rotation about the vertical: only the gyroscope contributes
+    n = 100
+    acc = np.tile([0, 0, 1.], (n, 1))
+    gyr = np.tile([0, 0, 90.], (n, 1))
+    for method in fusion.METHODS:
+        quats = fusion.fuse(acc, gyr, rate=100, method=method)
+        assert(np.isclose(orientation.to_euler(quats[-1])[0, 0], 90, atol=0.5))
+
+def test_blockwise():
+    acc = np.random.randn(500, 3) * 0.1 + [0, 0.3, 1]
+    gyr = np.random.randn(500, 3) * 20
+    for method in fusion.METHODS:
+        offline = fusion.fuse(acc, gyr, rate=50, method=method)
+        live = fusion.make_fusion(method, rate=50)
+        blocks = [live.process(acc[ii:ii+7], gyr[ii:ii+7]) for ii in range(0, 500, 7)]
+        assert(np.allclose(np.vstack(blocks), offline))
+
+def test_devices():
+    # Many devices (processed as arrays) give the same result as one after the other
+    n_devices = fusion.MIN_VECTORIZED
+    acc = np.random.randn(200, n_devices, 3) * 0.1 + [0, 0.3, 1]
+    gyr = np.random.randn(200, n_devices, 3) * 20
+    mag = np.random.randn(200, n_devices, 3) * 0.1 + [0.5, 0, -0.8]
+    for method in fusion.METHODS:
+        together = fusion.fuse(acc, gyr, rate=50, mag=mag, method=method)
+        assert(together.shape == (200, n_devices, 4))
+        single = fusion.fuse(acc[:, 3], gyr[:, 3], rate=50, mag=mag[:, 3], method=method)
+        assert(np.allclose(together[:, 3], single))
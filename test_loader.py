@@ -0,0 +1,68 @@
+import os
+import numpy as np
+import loader
+import recording
+
+def write_dat(dat_file, data, complete=True):
+    with open(dat_file, 'wb') as fh:
+        fh.write(b'Subject: Mustermann, Max\n')
+        fh.write(b'Experimentor: Doe, John\n')
+        fh.write(b'Date: Mon Oct 19 10:11:12 2026\n')
+        fh.write((','.join(recording.COLUMNS) + '\n').encode())
+        np.savetxt(fh, data, delimiter=',')
+        if not complete:
+            fh.write(b'1.0,2.0,3')
+
+def test_load_dat(tmp_path):
+    dat_file = str(tmp_path / 'test.dat')
+    data = np.random.randn(500, 15)
+    write_dat(dat_file, data, complete=False)
+
+    loaded, header = loader.load(dat_file)
+    assert(header['subject'] == 'Mustermann, Max')
+    assert(header['columns'] == recording.COLUMNS)
+    assert(np.allclose(loaded, data))
+    assert(os.path.exists(dat_file + '.npy'))
+
+    # The second time, the cache is used
+    cached, header = loader.load(dat_file)
+    assert(isinstance(cached, np.memmap))
+    assert(np.all(cached == loaded))
+
+def test_cache_invalidation(tmp_path):
+    dat_file = str(tmp_path / 'test.dat')
+    write_dat(dat_file, np.zeros((10, 15)))
+    loader.load(dat_file)
+
+    write_dat(dat_file, np.ones((20, 15)))
+    loaded, header = loader.load(dat_file)
+    assert(loaded.shape == (20, 15))
+    assert(np.all(loaded == 1))
+
+def test_small_chunks(tmp_path):
+    dat_file = str(tmp_path / 'test.dat')
+    data = np.random.randn(100, 15)
+    write_dat(dat_file, data)
+
+    header = loader.read_dat_header(dat_file)
+    with open(dat_file, 'rb') as fh:
+        fh.seek(header['_data_offset'])
+        loaded = loader.parse_rows(fh, 15, chunk_size=1000)
+    assert(np.allclose(loaded, data))
+
+def test_irregular_dat(tmp_path):
+    # Empty 'Date:'-line, and an empty line between the data (which numpy's
+    # fast parser rejects with an error)
+    dat_file = str(tmp_path / 'test.dat')
+    data = np.random.randn(20, 15)
+    with open(dat_file, 'wb') as fh:
+        fh.write(b'Subject: Mustermann, Max\nExperimentor: Doe, John\nDate:\n')
+        fh.write((','.join(recording.COLUMNS) + '\n').encode())
+        np.savetxt(fh, data[:10], delimiter=',')
+        fh.write(b'\n')
+        np.savetxt(fh, data[10:], delimiter=',')
+
+    header = loader.read_dat_header(dat_file)
+    assert(header['date'] == '' and header['columns'] == recording.COLUMNS)
+    loaded, header = loader.load(dat_file, use_cache=False)
+    assert(np.allclose(loaded, data))
@@ -0,0 +1,15 @@
+import numpy as np
+
+from metawear_adapter import read_sample, parse_text, FakeMetaWearClient
+
+
+def test_read_sample():
+    client = FakeMetaWearClient()
+    row = np.empty(4)
+    for module in [client.accelerometer, client.gyroscope]:
+        for t in np.arange(0, 10, 0.04):
+            data = module.sample(t)
+            assert(read_sample(data, row) is row)
+            assert(row[0] == data['epoch'] / 1000)
+            # The text-representation is rounded to 3 decimals
+            assert(np.allclose(row[1:], parse_text(data), rtol=0, atol=5e-4))
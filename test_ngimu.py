@@ -15,3 +15,13 @@ def test_getData():
         assert( len(measurement) == length )
     sensor.close()
     
+
+def test_decode():
+    import struct
+    # Bundle with one message "/quaternion" with 4 floats
+    message = b'/quaternion\x00' + b',ffff\x00\x00\x00' + struct.pack('>4f', 1, 0, 0.5, -0.5)
+    timetag = 3786196056 * 2**32
+    bundle = b'#bundle\x00' + timetag.to_bytes(8, 'big') + \
+             len(message).to_bytes(4, 'big') + message
+    messages = ngimu.decode(bundle)
+    assert(messages == [[3786196056, '/quaternion', 1, 0, 0.5, -0.5]])
@@ -0,0 +1,47 @@
+import numpy as np
+import orientation
+
+def rotmat(axis, angle):
+    """Rotation matrix about a coordinate axis (0, 1, 2), angle in deg"""
+    c, s = np.cos(np.deg2rad(angle)), np.sin(np.deg2rad(angle))
+    i, j = [(1, 2), (2, 0), (0, 1)][axis]
+    R = np.eye(3)
+    R[i, i], R[i, j], R[j, i], R[j, j] = c, -s, s, c
+    return R
+
+def test_rotmat():
+    q = orientation.from_axis_angle([0, 0, 1], 30)
+    assert(np.allclose(orientation.to_rotmat(q)[0], rotmat(2, 30)))
+
+def test_euler():
+    q_z = orientation.from_axis_angle([0, 0, 1], 40)
+    q_y = orientation.from_axis_angle([0, 1, 0], 20)
+    q_x = orientation.from_axis_angle([1, 0, 0], -10)
+
+    nautical = orientation.multiply(orientation.multiply(q_z, q_y), q_x)
+    assert(np.allclose(orientation.to_euler(nautical), [[40, 20, -10]]))
+    assert(np.allclose(orientation.to_rotmat(nautical)[0],
+                       rotmat(2, 40) @ rotmat(1, 20) @ rotmat(0, -10)))
+
+    helmholtz = orientation.multiply(orientation.multiply(q_y, q_z), q_x)
+    assert(np.allclose(orientation.to_euler(helmholtz, 'Helmholtz'), [[40, 20, -10]]))
+
+    euler = orientation.multiply(orientation.multiply(q_z, orientation.from_axis_angle([1, 0, 0], 25)), q_z)
+    assert(np.allclose(orientation.to_euler(euler, 'Euler'), [[40, 25, 40]]))
+
+def test_helical():
+    axes = np.random.randn(50, 3)
+    axes /= np.linalg.norm(axes, axis=1, keepdims=True)
+    angles = np.random.uniform(0, 179, 50)
+    q = -orientation.from_axis_angle(axes, angles)    # -q is the same orientation
+    angle, axis = orientation.to_helical(q)
+    assert(np.allclose(angle, angles))
+    assert(np.allclose(axis, axes))
+    assert(np.all(orientation.to_helical([1, 0, 0, 0])[1] == 0))
+
+def test_relative():
+    q_ref = orientation.from_axis_angle([1, 1, 0], 35)
+    q_joint = orientation.from_axis_angle(np.random.randn(20, 3), np.random.uniform(0, 90, 20))
+    q = orientation.multiply(q_ref, q_joint)
+    rel = orientation.relative(q_ref, q)
+    assert(np.allclose(orientation.to_rotmat(rel), orientation.to_rotmat(q_joint)))
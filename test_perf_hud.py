@@ -0,0 +1,36 @@
+import types
+import numpy as np
+
+import perf_hud
+
+
+def test_packets(monkeypatch):
+    clock = types.SimpleNamespace(now=0.)
+    monkeypatch.setattr(perf_hud, 'time', types.SimpleNamespace(time=lambda: clock.now))
+
+    # 100 Hz, packets 50-52 are missing, packet 70 arrives twice
+    stats = perf_hud.PerfStats()
+    t0 = 3.9e9                  # timetag [s since 1900]
+    for ii in range(100):
+        if 50 <= ii <= 52:
+            continue
+        timetag = t0 + ii / 100
+        latency = 0.49 if ii == 0 else 0.5
+        clock.now = timetag - perf_hud.NTP_OFFSET + latency
+        stats.packet(timetag, 0.001)
+        if ii == 70:
+            clock.now += 0.01
+            stats.packet(timetag, 0.001)
+
+    summary = stats.summary()
+    assert(stats.n_packets == 98)
+    assert(summary['dropped'] == 3 and summary['duplicated'] == 1)
+    assert(np.isclose(summary['sample_rate'], 97 / 1.0))    # 98 arrivals within 1 s
+    assert(np.isclose(summary['decode_ms'], 1.))
+    assert(np.isclose(summary['latency_ms'], 10., atol=0.01))
+
+    stats.reset()
+    stats.packet(-1, 0.001)
+    summary = stats.summary()
+    assert(summary['dropped'] == 0 and summary['duplicated'] == 0)
+    assert(np.isnan(summary['latency_ms']))
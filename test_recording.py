@@ -0,0 +1,126 @@
+import os
+import numpy as np
+import recording
+
+def test_write_read(tmp_path):
+    rec_file = str(tmp_path / 'test.jrec')
+    data = np.random.randn(250, 15)
+    data[:,0] = 3.8e9 + np.arange(250)/50
+
+    writer = recording.RecordingWriter(rec_file, subject='Mustermann, Max',
+                                       experimentor='Doe, John', sample_rate=50)
+    writer.write(data[:100])
+    writer.write(data[100:])
+    writer.close()
+
+    read_data, header = recording.read_recording(rec_file)
+    assert(header['subject'] == 'Mustermann, Max')
+    assert(header['columns'] == recording.COLUMNS)
+    assert(np.all(read_data == data))
+
+def test_incomplete_block(tmp_path):
+    rec_file = str(tmp_path / 'test.jrec')
+    data = np.ones((100, 15))
+
+    writer = recording.RecordingWriter(rec_file)
+    writer.write(data)
+    writer.write(data)
+    writer.close()
+
+    # Cut the last block in half
+    with open(rec_file, 'r+b') as fh:
+        fh.truncate(os.path.getsize(rec_file) - 600)
+    reader = recording.RecordingReader(rec_file)
+    assert(reader.n_rows == 100)
+
+def test_export_csv(tmp_path):
+    rec_file = str(tmp_path / 'test.jrec')
+    data = np.random.randn(10, 15)
+
+    writer = recording.RecordingWriter(rec_file, subject='Mustermann, Max')
+    writer.write(data)
+    writer.close()
+
+    csv_file = recording.export_csv(rec_file)
+    with open(csv_file, 'r') as fh:
+        lines = fh.readlines()
+    assert(lines[0] == 'Subject: Mustermann, Max\n')
+    assert(lines[3].startswith('Time (s),Gyroscope X'))
+    assert(np.allclose(np.loadtxt(csv_file, delimiter=',', skiprows=4), data))
+
+def test_recorder(tmp_path):
+    rec_file = str(tmp_path / 'test.jrec')
+    data = np.random.randn(1234, 15)
+
+    writer = recording.RecordingWriter(rec_file)
+    recorder = recording.Recorder(writer, block_size=100, queue_size=2)
+    for row in data:
+        recorder.append(row)
+    recorder.close()
+
+    assert(recorder.backlog == 0)
+    assert(np.all(recording.read_recording(rec_file)[0] == data))
+
+def test_open_recorder(tmp_path):
+    rec_file = str(tmp_path / 'test.jrec')
+    data = np.random.randn(250, 4)
+
+    recorder = recording.open_recorder(rec_file, ['X', 'Y', 'Z'], subject='Doe, John')
+    recorder.extend(data[:120])
+    recorder.extend(data[120:])
+    recorder.close()
+
+    recorded, header = recording.read_recording(rec_file)
+    assert(header['columns'] == ['Time (s)', 'X', 'Y', 'Z'])
+    assert(header['subject'] == 'Doe, John')
+    assert(np.all(recorded == data))
+
+def test_recover(tmp_path):
+    rec_file = str(tmp_path / 'test.jrec')
+    data = np.random.randn(300, 15)
+
+    writer = recording.RecordingWriter(rec_file)
+    for ii in range(3):
+        writer.write(data[ii*100:(ii+1)*100])
+    writer.close()
+    assert(recording.RecordingReader(rec_file).indexed)
+
+    # Simulate a crash: no index, a corrupt 2nd block, and an incomplete 3rd one
+    offset = writer.blocks[1][0]
+    with open(rec_file, 'r+b') as fh:
+        fh.seek(offset)
+        fh.write(b'\x00' * 8)
+        fh.truncate(writer.blocks[2][0] + 100)
+
+    assert(recording.recover(rec_file) == 100)
+    reader = recording.RecordingReader(rec_file)
+    assert(reader.indexed)
+    assert(np.all(reader.read() == data[:100]))
+
+def test_header_flushed(tmp_path):
+    rec_file = str(tmp_path / 'test.jrec')
+    writer = recording.RecordingWriter(rec_file, subject='Doe, John')
+
+    # Before the first block, the file is already a readable recording
+    reader = recording.RecordingReader(rec_file)
+    assert(reader.header['subject'] == 'Doe, John' and reader.n_rows == 0)
+    assert(recording.recover(rec_file) == 0)
+    writer.fh.close()
+
+def test_compression(tmp_path):
+    data = np.random.randn(1000, 15).astype(np.float32).astype(np.float64)
+    data[:,0] = 3.8e9 + np.arange(1000)/100
+
+    for codec in ['zlib', 'lzma']:
+        rec_file = str(tmp_path / f'{codec}.jrec')
+        writer = recording.RecordingWriter(rec_file, codec=codec)
+        for ii in range(10):
+            writer.write(data[ii*100:(ii+1)*100])
+        writer.close()
+
+        reader = recording.RecordingReader(rec_file)
+        assert(np.all(reader.read() == data))
+
+        # Only the 3rd and the 4th block are needed
+        t_start, t_stop = data[250,0], data[349,0]
+        assert(np.all(reader.read_range(t_start, t_stop) == data[250:350]))
@@ -0,0 +1,52 @@
+import os
+
+from registry import SubjectRegistry, read_names
+
+
+def make_registry(tmp_path, subjects):
+    subject_file = tmp_path / 'subjects.txt'
+    experimentor_file = tmp_path / 'experimentors.txt'
+    subject_file.write_text('\n'.join(subjects))        # no newline at the end
+    experimentor_file.write_text('Haslwanter, Thomas\nDoe, John\n')
+    return SubjectRegistry(db_file=str(tmp_path / 'subjects.sqlite'),
+                           files={'subject': str(subject_file),
+                                  'experimentor': str(experimentor_file)})
+
+
+def test_read_names(tmp_path):
+    (tmp_path / 'names.txt').write_text('Doe, John\n\nMustermann, Max')
+    assert(read_names(tmp_path / 'names.txt') == ['Doe, John', 'Mustermann, Max'])
+
+
+def test_search(tmp_path):
+    subjects = ['None', 'Mustermann, Max', 'Müller, Anna'] + \
+               [f'Patient{ii:05d}, Test' for ii in range(20000)]
+    registry = make_registry(tmp_path, subjects)
+    assert(registry.sync() == ['subject', 'experimentor'])
+    assert(registry.sync() == [])
+    assert(registry.count('subject') == len(subjects))
+
+    # Lazy loading, in the order of the file
+    assert(registry.search('subject', limit=3) == subjects[:3])
+    assert(registry.search('subject', limit=2, offset=3) == subjects[3:5])
+
+    # Prefixes of any word, also without accents
+    assert(registry.search('subject', 'max') == ['Mustermann, Max'])
+    assert(registry.search('subject', 'must ma') == ['Mustermann, Max'])
+    assert(registry.search('subject', 'mull') == ['Müller, Anna'])
+    assert(len(registry.search('subject', 'patient0012')) == 10)
+    assert(registry.search('experimentor', 'do') == ['Doe, John'])
+
+    # Fuzzy, if no prefix matches
+    assert(registry.search('subject', 'Musterman') == ['Mustermann, Max'])
+    assert(registry.search('subject', 'Mustremann') == ['Mustermann, Max'])
+
+
+def test_update(tmp_path):
+    registry = make_registry(tmp_path, ['Doe, Jane'])
+    registry.sync()
+    with open(registry.files['subject'], 'a') as fh:
+        fh.write('\nRoe, Richard\n')
+    os.utime(registry.files['subject'], ns=(0, 0))
+    assert(registry.sync() == ['subject'])
+    assert(registry.search('subject', 'r') == ['Roe, Richard'])
@@ -0,0 +1,36 @@
+import numpy as np
+
+from repetitions import RepetitionCounter, count_repetitions
+
+
+def exercise(rate=100., duration=50., period=2.5):
+    """Sinusoidal movement with noise"""
+    t = np.arange(0, duration, 1/rate)
+    signal = 0.8 * np.sin(2*np.pi*t/period) + 0.02 * np.random.randn(len(t))
+    return (t, signal)
+
+
+def test_count():
+    t, signal = exercise()
+    reps = count_repetitions(t, signal)
+    assert(len(reps) == 20)
+    assert(np.all(np.abs(reps[1:, 1] - 1.6) < 0.2))
+    assert(np.all(np.abs(reps[1:, 2] - 2.5) < 0.1))
+
+
+def test_blockwise():
+    t, signal = exercise()
+    offline = count_repetitions(t, signal, rate=100.)
+
+    counter = RepetitionCounter(rate=100.)
+    online = []
+    for ii in range(0, len(t), 7):
+        online.extend(counter.process(t[ii:ii+7], signal[ii:ii+7]))
+    assert(counter.count == len(offline))
+    assert(np.allclose(np.array(online), offline))
+
+
+def test_rest():
+    t = np.arange(0, 20, 0.01)
+    assert(len(count_repetitions(t, 0.01 * np.random.randn(len(t)))) == 0)
+
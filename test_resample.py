@@ -0,0 +1,52 @@
+import numpy as np
+import orientation
+from resample import Resampler, resample
+
+def jittered(rate=100., duration=10., seed=0):
+    """Irregular timestamps: jitter, a dropped packet, and a gap"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(0, duration, 1/rate) + rng.uniform(-0.3, 0.3, int(duration*rate)) / rate
+    t = np.delete(t, [200, 500, 501, 502, 503, 504, 505, 506, 507, 508, 509])
+    t[[50, 51]] = t[[51, 50]]       # arrival out of order
+    return t
+
+def test_linear():
+    t = jittered()
+    data = np.column_stack((np.sin(t), 2*t + 1))
+    resampled, gaps = resample(t, data, rate=100.)
+    assert(np.allclose(np.diff(resampled[:, 0]), 0.01))
+    assert(len(gaps) == 1 and np.isclose(gaps[0][1] - gaps[0][0], 0.11, atol=0.01))
+
+    # Grid-points inside the gap are NaN
+    valid = ~np.isnan(resampled[:, 1])
+    inside = (resampled[:, 0] > gaps[0][0]) & (resampled[:, 0] < gaps[0][1])
+    assert(np.all(valid == ~inside))
+    assert(np.allclose(resampled[valid, 2], 2*resampled[valid, 0] + 1))
+    assert(np.allclose(resampled[valid, 1], np.sin(resampled[valid, 0]), atol=1e-3))
+
+    # The gap can also be interpolated
+    filled, gaps = resample(t, data, rate=100., fill='interpolate')
+    assert(not np.any(np.isnan(filled)))
+
+def test_incremental(tmp_path):
+    t = jittered()
+    data = np.column_stack((np.cos(t), t))
+    offline, gaps = resample(t, data, rate=100., out=str(tmp_path / 'resampled.npy'))
+    assert(isinstance(offline, np.memmap))
+
+    resampler = Resampler(rate=100.)
+    blocks = [resampler.process(t[ii:ii+13], data[ii:ii+13]) for ii in range(0, len(t), 13)]
+    live = np.column_stack((np.concatenate([block[0] for block in blocks]),
+                            np.vstack([block[1] for block in blocks])))
+    assert(np.allclose(live, offline, equal_nan=True))
+    assert(resampler.gaps == gaps)
+
+def test_slerp():
+    t = jittered()
+    angle = 50 * t
+    quats = orientation.from_axis_angle([0, 0, 1], angle)
+    resampled, gaps = resample(t, quats, rate=100., quat_columns=[0], fill='interpolate')
+    heading = orientation.to_euler(resampled[:, 1:])[:, 0]
+    expected = (50 * resampled[:, 0] + 180) % 360 - 180
+    assert(np.allclose(heading, expected, atol=1e-6))
+    assert(np.allclose(np.linalg.norm(resampled[:, 1:], axis=1), 1))
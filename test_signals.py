@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+import yaml
+import filters
+import orientation
+import recording
+from signals import Expression, parse_signals, find_columns
+
+COLUMNS = recording.COLUMNS[1:]
+
+def test_expression():
+    data = np.random.randn(100, len(COLUMNS))
+    signal = Expression('norm(ax, ay, az) - 1', COLUMNS, rate=100).evaluate(data)
+    assert(np.allclose(signal, np.linalg.norm(data[:, 3:6], axis=1) - 1))
+    assert(Expression('2', COLUMNS, rate=100).evaluate(data).shape == (100,))
+
+    for text in ['ax.real', '__import__("os")', 'open("x")', 'bx + 1', 'lowpass(ax, gz)', 'ax[0]',
+                 'tilt(ax, ay)', 'heading(q0)', 'lowpass(ax)', 'norm()', 'abs(ax, ay)']:
+        with pytest.raises(ValueError):
+            Expression(text, COLUMNS, rate=100)
+
+def test_find_columns():
+    assert(find_columns(COLUMNS, ['ax', 'ay', 'az']) == [3, 4, 5])
+    assert(find_columns(COLUMNS, ['q0', 'qx', 'qy', 'qz']) == [10, 11, 12, 13])
+    with pytest.raises(ValueError):
+        find_columns(COLUMNS[:6], ['q0'])
+
+def test_stateful():
+    # Filters keep their state between blocks, separately for each call
+    data = np.random.randn(300, len(COLUMNS))
+    expression = Expression('lowpass(ax, 5) + lowpass(gz, 2)', COLUMNS, rate=100)
+    blocks = np.concatenate([expression.evaluate(block) for block in np.array_split(data, 17)])
+    expected = (filters.lowpass(5, 100, 1).process(data[:, 3:4]) +
+                filters.lowpass(2, 100, 1).process(data[:, 2:3]))[:, 0]
+    assert(np.allclose(blocks, expected))
+
+def test_orientation():
+    angles = np.linspace(0, 60, 50)
+    data = np.zeros((50, len(COLUMNS)))
+    data[:, 10:14] = orientation.from_axis_angle([0, 1, 0], angles)
+    signals = parse_signals('helical(q0, qx, qy, qz); pitch(q0, qx, qy, qz); tilt(ax, ay, 1)',
+                            COLUMNS, rate=100)
+    assert(np.allclose(signals[0].evaluate(data[:25]), angles[:25]))
+    pitch = np.concatenate((signals[1].evaluate(data[:25]), signals[1].evaluate(data[25:])))
+    assert(np.allclose(pitch, angles))
+    assert(np.allclose(signals[2].evaluate(data), 0))
+
+def test_default_lights_filtered():
+    # The default light-signal is smoothed, so that the lights do not flicker
+    with open('settings.yaml', 'r') as fh:
+        settings = yaml.safe_load(fh)
+    light = parse_signals(settings['light_signals'], COLUMNS, rate=100)[0]
+    data = np.zeros((1000, len(COLUMNS)))
+    data[:, 3] = 0.5 + 0.3 * np.where(np.arange(1000) % 2, 1, -1)    # noise at 50 Hz
+    signal = light.evaluate(data)
+    assert(np.ptp(signal[500:]) < 0.01)
+    assert(np.isclose(np.mean(signal[500:]), 0.5, atol=0.01))
@@ -0,0 +1,61 @@
+import time
+import numpy as np
+import recording
+import sources
+import signals
+from metawear_adapter import FakeMetaWearClient
+
+def test_replay(tmp_path):
+    out_file = str(tmp_path / 'replay.jrec')
+    data = np.column_stack((np.arange(200) / 100., np.random.randn(200, 14)))
+    writer = recording.RecordingWriter(out_file)
+    writer.write(data)
+    writer.close()
+
+    source = sources.ReplaySource(out_file, speed=20)
+    assert(source.columns == recording.COLUMNS[1:])
+    source.start()
+    blocks = []
+    while not source.finished:
+        time.sleep(0.01)
+        timestamps, block = source.read()
+        assert(len(timestamps) == len(block))
+        blocks.append(block)
+
+    assert(len(blocks) > 1)
+    assert(np.all(np.vstack(blocks) == data[:, 1:]))
+
+def test_replay_loop(tmp_path):
+    out_file = str(tmp_path / 'replay.jrec')
+    data = np.column_stack((np.arange(200) / 100., np.random.randn(200, 14)))
+    writer = recording.RecordingWriter(out_file)
+    writer.write(data)
+    writer.close()
+
+    # Each pass continues the timebase of the previous one
+    source = sources.ReplaySource(out_file, speed=50, loop=True)
+    source.start()
+    timestamps, blocks = [], []
+    while sum(len(block) for block in blocks) < 500:
+        time.sleep(0.01)
+        t, block = source.read()
+        timestamps.append(t)
+        blocks.append(block)
+
+    timestamps = np.concatenate(timestamps)
+    assert(np.allclose(timestamps, np.arange(len(timestamps)) / 100.))
+    assert(np.all(np.vstack(blocks) == np.tile(data[:, 1:], (4, 1))[:len(timestamps)]))
+
+def test_metawear():
+    client = FakeMetaWearClient()
+    source = sources.MetaWearSource(client, 'accelerometer')
+    assert(signals.find_columns(source.columns, ['ax', 'ay', 'az']) == [0, 1, 2])
+    source.start()
+    time.sleep(0.2)
+    source.stop()
+    time.sleep(0.05)
+    timestamps, block = source.read()
+
+    assert(len(timestamps) > 0)
+    assert(block.shape == (len(timestamps), 3))
+    assert(np.all(np.diff(timestamps) >= 0))
@@ -0,0 +1,36 @@
+import numpy as np
+
+from spectrum import WelchSpectrum, spectrogram, band_power, peak_frequency, parse_bands
+
+
+def tremor(rate=100., duration=60., frequency=5.):
+    """Oscillation of amplitude 1, with a little noise"""
+    t = np.arange(0, duration, 1/rate)
+    return np.sin(2*np.pi*frequency*t) + 0.05 * np.random.randn(len(t))
+
+
+def test_band_power():
+    rate = 100.
+    spectrum = WelchSpectrum(rate, segment=256, n_channels=1)
+    x = tremor(rate)
+    for ii in range(0, len(x), 17):
+        spectrum.process(x[ii:ii+17])
+
+    assert(np.isclose(peak_frequency(spectrum.freqs, spectrum.psd)[0], 5., atol=rate/256))
+    power = band_power(spectrum.freqs, spectrum.psd, parse_bands('0.5-3; 3-7; 7-12'))[:, 0]
+    assert(np.isclose(power[1], 0.5, rtol=0.05))        # variance of the sine
+    assert(power[0] < 0.01 and power[2] < 0.01)
+
+
+def test_live_offline(tmp_path):
+    rate = 100.
+    x = np.column_stack((tremor(rate, frequency=4.), tremor(rate, frequency=9.)))
+
+    spectrum = WelchSpectrum(rate, segment=128, n_average=4, n_channels=2)
+    n_segments = sum(spectrum.process(x[ii:ii+50]) for ii in range(0, len(x), 50))
+
+    times, freqs, psd = spectrogram(x, rate, segment=128, out=str(tmp_path / 'spec.npy'),
+                                    chunk_size=300)
+    assert(len(times) == n_segments)
+    assert(np.allclose(spectrum.psd, np.mean(psd[-4:], axis=0)))
+    assert(np.allclose(np.load(tmp_path / 'spec.npy'), psd))